@@ -7,12 +7,16 @@ class AnomalyDetector:
         self.baselines = {}  # key: endpoint+method+params
         self.threshold = config.get('length_threshold', 0.2)
         self.keyword_patterns = config.get('keyword_patterns', [])
+        # All keyword patterns in one regex, so a body is scanned once
+        self._keyword_re = re.compile(
+            '|'.join(f'(?P<k{i}>{p})' for i, p in enumerate(self.keyword_patterns)), re.I
+        ) if self.keyword_patterns else None
 
     def record_baseline(self, url, method, params, response, body):
         key = self._key(url, method, params)
         self.baselines[key] = {
             'status': response.status,
-            'length': len(body),
+            'length': self._length(response, body),
             'headers': dict(response.headers),
             'keywords': self._extract_keywords(body)
         }
@@ -25,9 +29,10 @@ class AnomalyDetector:
         anomalies = []
         if response.status != base['status']:
             anomalies.append(f"Status {base['status']} -> {response.status}")
-        length_change = abs(len(body) - base['length']) / base['length'] if base['length'] else 0
+        length = self._length(response, body)
+        length_change = abs(length - base['length']) / base['length'] if base['length'] else 0
         if length_change > self.threshold:
-            anomalies.append(f"Length {base['length']} -> {len(body)} ({length_change*100:.1f}% change)")
+            anomalies.append(f"Length {base['length']} -> {length} ({length_change*100:.1f}% change)")
         new_keywords = self._extract_keywords(body) - base['keywords']
         if new_keywords:
             anomalies.append(f"New keywords: {new_keywords}")
@@ -37,9 +42,17 @@ class AnomalyDetector:
         # Simplified: use URL without query as key (ignoring params)
         return url.split('?')[0] + '|' + method
 
+    def _length(self, response, body):
+        # Streamed responses carry their byte length even when the text was capped or skipped
+        length = getattr(response, 'length', None)
+        return len(body) if length is None else length
+
     def _extract_keywords(self, text):
         keywords = set()
-        for pattern in self.keyword_patterns:
-            if re.search(pattern, text, re.I):
-                keywords.add(pattern)
+        if self._keyword_re is None:
+            return keywords
+        for m in self._keyword_re.finditer(text):
+            keywords.add(self.keyword_patterns[int(m.lastgroup[1:])])
+            if len(keywords) == len(self.keyword_patterns):
+                break
         return keywords
@@ -1,18 +1,37 @@
 import random
 import asyncio
-from fake_useragent import UserAgent
+from modules.header_profiles import PROFILES
 
 class AntiBlock:
-    def __init__(self, proxy_manager=None, delay_range=(1, 3)):
+    def __init__(self, proxy_manager=None, delay_range=(1, 3), profiles=PROFILES):
         self.proxy_manager = proxy_manager
         self.delay_range = delay_range
-        self.ua = UserAgent()
+        self.profiles = profiles
+        self._host_profiles = {}  # host -> HeaderProfile, sticky for the host session
 
     async def delay(self):
         await asyncio.sleep(random.uniform(*self.delay_range))
 
-    def get_headers(self):
-        return {'User-Agent': self.ua.random}
+    def get_headers(self, host=None):
+        """Headers for a request to ``host``.
+
+        Each host keeps the same browser profile until ``rotate`` is called,
+        so keep-alive connections and session cookies look like one client.
+        The returned mapping is shared and read-only.
+        """
+        if host is None:
+            return random.choice(self.profiles).headers
+        profile = self._host_profiles.get(host)
+        if profile is None:
+            profile = self._host_profiles[host] = random.choice(self.profiles)
+        return profile.headers
+
+    def rotate(self, host):
+        """Switch ``host`` to a different profile (e.g. after being blocked)."""
+        current = self._host_profiles.get(host)
+        choices = [p for p in self.profiles if p is not current] or self.profiles
+        self._host_profiles[host] = random.choice(choices)
+        return self._host_profiles[host]
 
     def get_proxy(self):
         if self.proxy_manager:
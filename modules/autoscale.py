@@ -0,0 +1,258 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+
+UP, DOWN, HOLD = 'up', 'down', 'hold'
+
+
+def rss_mb():
+    """Resident set size of this process in MB (peak RSS where current is unavailable), or None."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+class WorkerPool:
+    """Scan workers that can be added and retired while the scan runs.
+
+    ``worker(worker_id)`` is the worker coroutine; it calls ``get()`` to
+    take the next item, which blocks on the queue itself (no polling), and
+    ``retiring()`` between items. Shrinking cancels idle workers at once;
+    busy ones finish their item first.
+    """
+
+    def __init__(self, worker, queue):
+        self.worker = worker
+        self.queue = queue
+        self.tasks = {}         # worker id -> task
+        self.idle = set()       # ids of workers waiting on the queue
+        self.retired = set()    # ids asked to stop after their current item
+        self._next_id = 0
+
+    @property
+    def size(self):
+        return len(self.tasks) - len(self.retired)
+
+    def resize(self, n):
+        while self.size < n:
+            worker_id = self._next_id
+            self._next_id += 1
+            task = asyncio.create_task(self.worker(worker_id))
+            self.tasks[worker_id] = task
+            task.add_done_callback(lambda _, worker_id=worker_id: self._gone(worker_id))
+        excess = self.size - n
+        # Idle workers go first: cancelling a queue.get() loses nothing
+        for worker_id in sorted(self.idle, reverse=True)[:excess]:
+            self.retired.add(worker_id)
+            self.tasks[worker_id].cancel()
+            excess -= 1
+        for worker_id in sorted(self.tasks, reverse=True):
+            if excess <= 0:
+                break
+            if worker_id not in self.retired:
+                self.retired.add(worker_id)
+                excess -= 1
+
+    def _gone(self, worker_id):
+        self.tasks.pop(worker_id, None)
+        self.idle.discard(worker_id)
+        self.retired.discard(worker_id)
+
+    def retiring(self, worker_id):
+        return worker_id in self.retired
+
+    async def get(self, worker_id):
+        self.idle.add(worker_id)
+        try:
+            return await self.queue.get()
+        finally:
+            self.idle.discard(worker_id)
+
+    def busy(self):
+        return len(self.tasks) - len(self.idle)
+
+    def cancel(self):
+        for task in list(self.tasks.values()):
+            task.cancel()
+        return list(self.tasks.values())
+
+
+class Autoscaler:
+    """Closed-loop control of a target's scan worker count.
+
+    Every ``interval`` seconds it looks at what happened since the last
+    decision: requests/second, p95 request latency and failure rate (fed
+    by the target's HTTP client through ``record()``), event loop lag
+    (from its own heartbeat) and process RSS. Any of them over its limit
+    shrinks the pool by a quarter; otherwise, while work is queued, the pool
+    grows by a quarter as long as the last increase raised requests/second
+    by at least ``min_gain``; when it stops paying off it holds (or returns
+    to the previous size if throughput dropped) and probes again after
+    ``plateau_hold`` intervals. The pool stays within
+    ``min_workers``..``max_workers``. Every decision is appended to
+    ``log`` as a JSON line, with the metrics behind it.
+
+    Workers only scan while holding a ``scheduler`` slot (a FairScheduler
+    shared across targets), so the ceiling is also capped at its capacity
+    and the pool does not grow while tasks already wait for a slot: more
+    workers would only queue there.
+    """
+
+    def __init__(self, config=None, initial=10, scheduler=None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.scheduler = scheduler
+        self.floor = max(1, config.get('min_workers', 2))
+        ceiling = config.get('max_workers', 50)
+        if scheduler is not None:
+            ceiling = min(ceiling, scheduler.capacity)
+        self.ceiling = max(self.floor, ceiling)
+        self.initial = min(max(initial, self.floor), self.ceiling) if self.enabled else initial
+        self.interval = config.get('interval', 5)
+        self.max_p95 = config.get('max_p95', 15.0)
+        self.latency_growth = config.get('latency_growth', 2.0)
+        self.max_error_rate = config.get('max_error_rate', 0.2)
+        self.max_loop_lag = config.get('max_loop_lag', 0.25)
+        self.max_rss_mb = config.get('max_rss_mb', 2048)
+        self.min_gain = config.get('min_gain', 0.05)
+        self.plateau_hold = config.get('plateau_hold', 3)
+        self.min_samples = config.get('min_samples', 20)
+        self.decisions = []
+        self.pool = None
+        self._latencies = deque(maxlen=4096)
+        self._requests = self._failures = 0
+        self._lag = 0.0
+        self._best_p95 = None
+        self._last_rps = None
+        self._last_action = None
+        self._last_size = None      # pool size before the last increase
+        self._hold = 0
+        self._log = None
+        self._tasks = []
+        self._started = 0.0
+
+    # -- signals -------------------------------------------------------------
+
+    def record(self, elapsed, failed=False):
+        """One request of the target: its latency and whether it failed (timeout, reset, 429/5xx)."""
+        self._latencies.append(elapsed)
+        self._requests += 1
+        self._failures += failed
+
+    async def _heartbeat(self, period=0.1):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(period)
+            self._lag = max(self._lag, time.perf_counter() - start - period)
+
+    def _window(self, elapsed):
+        latencies = sorted(self._latencies)
+        metrics = {
+            'rps': self._requests / elapsed if elapsed > 0 else 0.0,
+            'requests': self._requests,
+            'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+            'error_rate': self._failures / self._requests if self._requests else 0.0,
+            'loop_lag': self._lag,
+            'rss_mb': rss_mb(),
+        }
+        self._latencies.clear()
+        self._requests = self._failures = 0
+        self._lag = 0.0
+        return metrics
+
+    # -- control -------------------------------------------------------------
+
+    def start(self, pool, log_path=None):
+        """Size ``pool`` and, when enabled, start adjusting it (call from inside the loop)."""
+        self.pool = pool
+        pool.resize(self.initial)
+        if not self.enabled:
+            return
+        if log_path is not None:
+            self._log = open(log_path, 'a', buffering=1)
+        self._started = time.monotonic()
+        self._tasks = [asyncio.create_task(self._heartbeat()), asyncio.create_task(self._control())]
+
+    async def _control(self):
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.step(self._window(now - last))
+            last = now
+
+    def step(self, metrics):
+        """Decide on one window of ``metrics``; returns the decision record."""
+        current = self.pool.size
+        action, reason, target = self._decide(metrics, current)
+        if target != current:
+            self.pool.resize(target)
+        decision = {'t': round(time.monotonic() - self._started, 1), 'action': action, 'reason': reason,
+                    'workers': current, 'target': target, 'queued': self.pool.queue.qsize(),
+                    'busy': self.pool.busy(),
+                    **{k: round(v, 4) if isinstance(v, float) else v for k, v in metrics.items()}}
+        self.decisions.append(decision)
+        if self._log is not None:
+            self._log.write(json.dumps(decision) + '\n')
+        self._last_action = action
+        return decision
+
+    def _decide(self, m, current):
+        if m['p95'] is not None and m['requests'] >= self.min_samples:
+            self._best_p95 = m['p95'] if self._best_p95 is None else min(self._best_p95, m['p95'])
+        down = max(self.floor, current - max(1, current // 4))
+        if m['rss_mb'] is not None and m['rss_mb'] > self.max_rss_mb:
+            return DOWN, f"rss {m['rss_mb']:.0f} MB > {self.max_rss_mb}", down
+        if m['loop_lag'] > self.max_loop_lag:
+            return DOWN, f"loop lag {m['loop_lag'] * 1000:.0f} ms > {self.max_loop_lag * 1000:.0f}", down
+        if m['requests'] >= self.min_samples:
+            if m['error_rate'] > self.max_error_rate:
+                return DOWN, f"error rate {m['error_rate']:.0%} > {self.max_error_rate:.0%}", down
+            if m['p95'] > self.max_p95:
+                return DOWN, f"p95 {m['p95']:.2f}s > {self.max_p95}s", down
+            if self._best_p95 and m['p95'] > self._best_p95 * self.latency_growth:
+                return DOWN, f"p95 {m['p95']:.2f}s > {self.latency_growth}x best {self._best_p95:.2f}s", down
+        rps, last_rps = m['rps'], self._last_rps
+        self._last_rps = rps
+        if self.pool.queue.qsize() == 0 or self.pool.busy() < current:
+            return HOLD, "no backlog", current
+        if current >= self.ceiling:
+            return HOLD, "at ceiling", current
+        if self.scheduler is not None and self.scheduler.waiting():
+            return HOLD, f"{self.scheduler.waiting()} tasks waiting for a scan slot", current
+        if self._hold > 0:
+            self._hold -= 1
+            return HOLD, "plateau", current
+        if self._last_action == UP and last_rps is not None and rps < last_rps * (1 + self.min_gain):
+            self._hold = self.plateau_hold
+            if rps < last_rps:
+                # Growing made it worse: go back to the size that did better
+                return DOWN, f"no gain: {rps:.1f} req/s after growing (was {last_rps:.1f})", self._last_size
+            return HOLD, f"plateau: {rps:.1f} req/s after growing (was {last_rps:.1f})", current
+        self._last_size = current
+        return UP, f"backlog {self.pool.queue.qsize()}, {rps:.1f} req/s", min(self.ceiling, current + max(1, current // 4))
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def summary(self):
+        changes = [d for d in self.decisions if d['action'] != HOLD]
+        sizes = [d['target'] for d in self.decisions] or [self.initial]
+        return (f"{len(changes)} resizes over {len(self.decisions)} decisions, "
+                f"workers {min(sizes)}-{max(sizes)} (final {sizes[-1]})")
@@ -0,0 +1,118 @@
+import codecs
+import hashlib
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Content types worth decoding; anything else is only measured and hashed
+DEFAULT_DECODE_TYPES = (
+    'text/', 'application/json', 'application/xml', 'application/xhtml',
+    'application/javascript', 'application/x-javascript', 'application/problem',
+    'application/x-www-form-urlencoded', '+json', '+xml',
+)
+
+
+class StreamMatcher:
+    """Run a compiled regex (or a SignatureMatcher) over text that arrives in chunks.
+
+    A tail of ``overlap`` characters is carried between chunks so matches
+    spanning a chunk boundary are still found; matches are reported once,
+    with offsets into the full decoded text.
+    """
+
+    def __init__(self, pattern, overlap=512, stop_on_match=False):
+        self.pattern = pattern
+        self.overlap = overlap
+        self.stop_on_match = stop_on_match
+        self.matches = []   # (start, end, text)
+        self.done = False
+        self._tail = ''
+        self._offset = 0    # absolute offset of self._tail[0]
+        self._reported = 0  # absolute offset up to which matches were reported
+
+    def feed(self, text, final=False):
+        if self.done or not (text or final):
+            return
+        window = self._tail + text
+        for m in self.pattern.finditer(window):
+            start, end = self._offset + m.start(), self._offset + m.end()
+            if start < self._reported:
+                continue
+            if m.end() == len(window) and not final:
+                # May still grow with the next chunk; it is re-found from the tail
+                break
+            self.matches.append((start, end, m.group(0)))
+            self._reported = end
+            if self.stop_on_match:
+                self.done = True
+                return
+        keep = min(self.overlap, len(window))
+        self._offset += len(window) - keep
+        self._tail = window[len(window) - keep:]
+        # A match fully inside the kept tail was already reported
+        self._reported = max(self._reported, self._offset)
+
+
+def wants_text(content_type, decode_types=DEFAULT_DECODE_TYPES):
+    if not content_type:
+        return True
+    content_type = content_type.lower()
+    return any(t in content_type for t in decode_types)
+
+
+async def read_body(resp, max_bytes=DEFAULT_MAX_BYTES, pattern=None, stop_on_match=False,
+                    decode_types=DEFAULT_DECODE_TYPES):
+    """Stream an aiohttp response body with bounded memory.
+
+    Reads at most ``max_bytes``, hashing and measuring as it goes, decodes
+    only content types some detector can use, and feeds decoded chunks to a
+    StreamMatcher when ``pattern`` is given (optionally stopping at the
+    first hit). Returns a BodyResult.
+    """
+    decode = wants_text(resp.headers.get('Content-Type', ''), decode_types)
+    decoder = codecs.getincrementaldecoder(_charset(resp))(errors='replace') if decode else None
+    matcher = StreamMatcher(pattern, stop_on_match=stop_on_match) if pattern is not None and decode else None
+    digest = hashlib.blake2b(digest_size=8)
+    parts, length, truncated = [], 0, False
+    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+        if length + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - length]
+            truncated = True
+        length += len(chunk)
+        digest.update(chunk)
+        if decoder is not None:
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if matcher is not None:
+                matcher.feed(text)
+                if matcher.done:
+                    truncated = True
+                    break
+        if truncated:
+            break
+    if decoder is not None and not truncated:
+        parts.append(decoder.decode(b'', final=True))
+    if matcher is not None:
+        matcher.feed(parts[-1] if parts and not truncated else '', final=True)
+    return BodyResult(''.join(parts), length, digest.hexdigest(), truncated,
+                      matcher.matches if matcher is not None else [])
+
+
+class BodyResult:
+    __slots__ = ('text', 'length', 'fingerprint', 'truncated', 'matches')
+
+    def __init__(self, text, length, fingerprint, truncated, matches):
+        self.text = text
+        self.length = length
+        self.fingerprint = fingerprint
+        self.truncated = truncated
+        self.matches = matches
+
+
+def _charset(resp):
+    charset = getattr(resp, 'charset', None) or 'utf-8'
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = 'utf-8'
+    return charset
@@ -0,0 +1,239 @@
+import asyncio
+import time
+from collections import Counter, deque
+from modules.signatures import get_library
+
+# Statuses a WAF / rate limiter answers with; block signatures only count on these
+BLOCK_STATUSES = frozenset({403, 406, 429, 503})
+# Block pages carry their markers early; no need to scan a whole body
+BLOCK_SCAN_CHARS = 8192
+
+FAILURES = frozenset({'timeout', 'reset', 'blocked', 'captcha'})
+
+CLOSED, OPEN, HALF_OPEN, DEAD = 'closed', 'open', 'half-open', 'dead'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def classify(response=None, error=None):
+    """Outcome of one request: ok, timeout, reset, blocked, captcha or error."""
+    if error is not None:
+        if isinstance(error, asyncio.TimeoutError):
+            return 'timeout'
+        if isinstance(error, (ConnectionError, OSError)):
+            return 'reset'
+        name = type(error).__name__
+        if 'Disconnect' in name or 'Connect' in name or 'Timeout' in name:
+            # aiohttp's ServerDisconnectedError, ClientConnectorError, ServerTimeoutError, ...
+            return 'timeout' if 'Timeout' in name else 'reset'
+        return 'error'
+    if response.status not in BLOCK_STATUSES:
+        return 'ok'
+    for m in get_library().block_pattern.finditer(response.text[:BLOCK_SCAN_CHARS]):
+        # Signature kinds are 'block' and 'captcha'
+        kind = get_library().block_pattern.signature(m).kind
+        return 'blocked' if kind == 'block' else kind
+    return 'blocked' if response.status == 429 else 'ok'
+
+
+class HostCircuit:
+    """Health of one host: closed -> open -> half-open -> closed (or open again).
+
+    Opens after ``failures`` consecutive failed requests, or when at least
+    ``failure_ratio`` of the last ``window`` requests failed. After
+    ``cooldown`` seconds one task may probe the host (half-open); success
+    closes the circuit, failure reopens it with a doubled cooldown. After
+    ``max_trips`` failed probes the host is considered dead.
+    """
+
+    def __init__(self, host, failures=5, window=20, failure_ratio=0.8, cooldown=30,
+                 max_cooldown=600, max_trips=4):
+        self.host = host
+        self.threshold = failures
+        self.failure_ratio = failure_ratio
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max_trips
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.trips = 0
+        self.consecutive = 0
+        self.recent = deque(maxlen=window)
+        self.outcomes = Counter()
+        self.prober = None          # task allowed through while half-open
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def ready_in(self):
+        """Seconds until a half-open probe is allowed (0 when not open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def permits(self):
+        """Whether a request may be sent now; while half-open only the probe task is running."""
+        return self.state in (CLOSED, HALF_OPEN)
+
+    def try_probe(self, task):
+        """Make ``task`` the half-open probe if the cooldown has passed."""
+        if self.state == OPEN and self.ready_in() == 0:
+            self.state = HALF_OPEN
+            self.prober = task
+            return True
+        return False
+
+    def record(self, outcome):
+        self.outcomes[outcome] += 1
+        failed = outcome in FAILURES
+        self.recent.append(failed)
+        if not failed:
+            self.consecutive = 0
+            if self.state == HALF_OPEN:
+                self._close()
+            return
+        self.consecutive += 1
+        if self.state == HALF_OPEN:
+            self._open(backoff=True)
+        elif self.state == CLOSED and (
+                self.consecutive >= self.threshold or
+                (len(self.recent) == self.recent.maxlen and
+                 sum(self.recent) >= self.failure_ratio * len(self.recent))):
+            self._open()
+
+    def probe_finished(self, task):
+        """The half-open probe task ended without deciding the state: let another try."""
+        if self.state == HALF_OPEN and self.prober is task:
+            self.state = OPEN
+            self.opened_at = time.monotonic() - self.cooldown
+            self.prober = None
+            self._notify()
+
+    def _open(self, backoff=False):
+        if backoff:
+            self.trips += 1
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+        self.prober = None
+        self.recent.clear()
+        if self.trips >= self.max_trips:
+            self.state = DEAD
+        else:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        self._notify()
+
+    def _close(self):
+        self.state = CLOSED
+        self.cooldown = self.base_cooldown
+        self.consecutive = 0
+        self.prober = None
+        self._notify()
+
+    async def wait(self):
+        """Wait until the host can be scanned again; False if it is dead.
+
+        True either because the circuit closed or because the calling task
+        became the half-open probe, which it must then run itself.
+        """
+        task = asyncio.current_task()
+        while True:
+            if self.state == CLOSED:
+                return True
+            if self.state == DEAD:
+                return False
+            if self.try_probe(task):
+                return True
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=self.ready_in() or None)
+            except asyncio.TimeoutError:
+                pass
+
+
+class CircuitBreaker:
+    """Per-host circuits for the HTTP path and the scan workers.
+
+    HttpClient asks ``check()`` before every request and reports each
+    outcome with ``record()``; workers use ``admit()`` to decide whether to
+    run a task now or park it until ``wait()`` says the host is back (or
+    hands the parked task the half-open probe: see ``probing()``).
+    """
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.params = {k: config[k] for k in
+                       ('failures', 'window', 'failure_ratio', 'cooldown', 'max_cooldown', 'max_trips')
+                       if k in config}
+        self.circuits = {}
+        self.skipped = Counter()    # host -> tasks given up on
+        self.refused = Counter()    # host -> requests refused while open
+        self.parked = Counter()     # host -> tasks currently parked
+
+    def circuit(self, host):
+        host = host.lower()
+        circuit = self.circuits.get(host)
+        if circuit is None:
+            circuit = self.circuits[host] = HostCircuit(host, **self.params)
+        return circuit
+
+    def check(self, host):
+        if not self.enabled:
+            return
+        host = host.lower()
+        circuit = self.circuits.get(host)
+        if circuit is not None and not circuit.permits():
+            self.refused[host] += 1
+            raise CircuitOpenError(host)
+
+    def record(self, host, outcome):
+        if self.enabled:
+            self.circuit(host).record(outcome)
+
+    def admit(self, host):
+        """True if a task for ``host`` may run now (possibly as the half-open probe)."""
+        if not self.enabled:
+            return True
+        circuit = self.circuits.get(host.lower())
+        if circuit is None or circuit.state == CLOSED:
+            return True
+        return circuit.try_probe(asyncio.current_task())
+
+    def probing(self, host):
+        """True if the current task holds ``host``'s half-open probe (e.g. handed over by ``wait()``)."""
+        circuit = self.circuits.get(host.lower())
+        return circuit is not None and circuit.state == HALF_OPEN and circuit.prober is asyncio.current_task()
+
+    def finished(self, host):
+        """Called when a task for ``host`` ends, so an undecided probe frees its slot."""
+        circuit = self.circuits.get(host.lower())
+        if circuit is not None:
+            circuit.probe_finished(asyncio.current_task())
+
+    async def wait(self, host):
+        host = host.lower()
+        self.parked[host] += 1
+        try:
+            return await self.circuit(host).wait()
+        finally:
+            self.parked[host] -= 1
+
+    def skip(self, host, count=1):
+        self.skipped[host.lower()] += count
+
+    def summary(self, hosts=None):
+        """Unhealthy hosts (of ``hosts``, default all): state, failed probes, outcomes, skipped work."""
+        out = {}
+        for host, c in self.circuits.items():
+            if hosts is not None and host not in hosts:
+                continue
+            if c.state != CLOSED or c.trips or self.skipped[host] or self.refused[host]:
+                out[host] = {'state': c.state, 'trips': c.trips, 'skipped_tasks': self.skipped[host],
+                             'refused_requests': self.refused[host],
+                             'outcomes': {k: v for k, v in c.outcomes.items() if v}}
+        return out
@@ -1,9 +1,4 @@
 from rich.console import Console
-from rich.live import Live
-from rich.table import Table
-from rich.panel import Panel
-from rich.layout import Layout
-from rich.text import Text
 import threading
 import time
 
@@ -15,7 +10,7 @@ class OmniHunterUI:
         self.findings = []
         self.live = None
         self.running = False
-        self.layout = Layout()
+        self.layout = None
 
     def start(self):
         self.running = True
@@ -29,6 +24,8 @@ class OmniHunterUI:
             self.live.stop()
 
     def _run_ui(self):
+        # Layout widgets are only imported once the live UI actually starts
+        from rich.live import Live
         with Live(self._generate_layout(), refresh_per_second=4, screen=True) as live:
             self.live = live
             while self.running:
@@ -36,6 +33,10 @@ class OmniHunterUI:
                 time.sleep(0.25)
 
     def _generate_layout(self):
+        from rich.layout import Layout
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich.text import Text
         layout = Layout()
         layout.split(
             Layout(name="header", size=3),
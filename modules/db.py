@@ -1,74 +1,183 @@
 import sqlite3
 from pathlib import Path
 
-_conn = None
-_cursor = None
+class Database:
+    """One sqlite results database (one per target)."""
+
+    def __init__(self, db_path):
+        self.path = Path(db_path)
+        self.conn = sqlite3.connect(db_path)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS endpoints (
+                id INTEGER PRIMARY KEY,
+                path TEXT,
+                param TEXT,
+                UNIQUE(path, param)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS findings (
+                id INTEGER PRIMARY KEY,
+                url TEXT,
+                param TEXT,
+                type TEXT,
+                platform TEXT,
+                confidence INTEGER,
+                details TEXT,
+                verified BOOLEAN,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tech_profile (
+                host TEXT,
+                tech TEXT,
+                kind TEXT,
+                hits INTEGER,
+                evidence TEXT,
+                last_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(host, tech)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_state (
+                endpoint TEXT,
+                param TEXT,
+                fingerprint TEXT,
+                scanners TEXT,
+                last_scanned REAL,
+                UNIQUE(endpoint, param)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS finding_state (
+                key TEXT UNIQUE,
+                url TEXT,
+                param TEXT,
+                type TEXT,
+                status TEXT,
+                first_seen REAL,
+                last_seen REAL
+            )
+        ''')
+        # Databases from before incremental scanning lack findings.status
+        columns = {row[1] for row in self.cursor.execute("PRAGMA table_info(findings)")}
+        if 'status' not in columns:
+            self.cursor.execute("ALTER TABLE findings ADD COLUMN status TEXT")
+        self.conn.commit()
+
+    def save_urls(self, urls):
+        for url in urls:
+            try:
+                self.cursor.execute("INSERT OR IGNORE INTO urls (url) VALUES (?)", (url,))
+            except:
+                pass
+        self.conn.commit()
+
+    def save_endpoints(self, endpoints):
+        for path, params in endpoints.items():
+            for param in params:
+                try:
+                    self.cursor.execute("INSERT OR IGNORE INTO endpoints (path, param) VALUES (?, ?)", (path, param))
+                except:
+                    pass
+        self.conn.commit()
+
+    def save_finding(self, finding):
+        self.cursor.execute('''
+            INSERT INTO findings (url, param, type, platform, confidence, details, verified, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            finding['url'],
+            finding.get('param', ''),
+            finding['type'],
+            finding.get('platform', ''),
+            finding.get('confidence', 50),
+            str(finding.get('details', '')),
+            finding.get('verified', False),
+            finding.get('status')
+        ))
+        self.conn.commit()
+
+    def save_tech_profiles(self, rows):
+        """Replace stored profiles with (host, tech, kind, hits, evidence, last_seen) rows."""
+        self.cursor.executemany('''
+            INSERT OR REPLACE INTO tech_profile (host, tech, kind, hits, evidence, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        self.conn.commit()
+
+    def load_tech_profiles(self):
+        # last_seen as epoch seconds; rows written before it was set hold the SQL default timestamp
+        return self.cursor.execute('''
+            SELECT host, tech, kind, hits, evidence,
+                   CASE WHEN typeof(last_seen) = 'text' THEN CAST(strftime('%s', last_seen) AS REAL)
+                        ELSE last_seen END
+            FROM tech_profile
+        ''').fetchall()
+
+    def delete_tech_profiles_before(self, cutoff):
+        """Drop profiles last seen before ``cutoff`` (epoch seconds)."""
+        self.cursor.execute('''
+            DELETE FROM tech_profile
+            WHERE CASE WHEN typeof(last_seen) = 'text' THEN CAST(strftime('%s', last_seen) AS REAL)
+                       ELSE last_seen END < ?
+        ''', (cutoff,))
+        self.conn.commit()
+
+    def save_scan_state(self, rows):
+        """Upsert (endpoint, param, fingerprint, scanners, last_scanned) rows."""
+        self.cursor.executemany('''
+            INSERT OR REPLACE INTO scan_state (endpoint, param, fingerprint, scanners, last_scanned)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        self.conn.commit()
+
+    def load_scan_state(self):
+        return self.cursor.execute(
+            "SELECT endpoint, param, fingerprint, scanners, last_scanned FROM scan_state").fetchall()
+
+    def save_finding_states(self, rows):
+        """Upsert (key, url, param, type, status, first_seen, last_seen) rows."""
+        self.cursor.executemany('''
+            INSERT OR REPLACE INTO finding_state (key, url, param, type, status, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        self.conn.commit()
+
+    def load_finding_states(self):
+        return self.cursor.execute(
+            "SELECT key, url, param, type, status, first_seen, last_seen FROM finding_state").fetchall()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+# Module-level API kept for single-database callers
+_default = None
 
 def init(db_path):
-    global _conn, _cursor
-    _conn = sqlite3.connect(db_path)
-    _cursor = _conn.cursor()
-    _cursor.execute('''
-        CREATE TABLE IF NOT EXISTS urls (
-            id INTEGER PRIMARY KEY,
-            url TEXT UNIQUE
-        )
-    ''')
-    _cursor.execute('''
-        CREATE TABLE IF NOT EXISTS endpoints (
-            id INTEGER PRIMARY KEY,
-            path TEXT,
-            param TEXT,
-            UNIQUE(path, param)
-        )
-    ''')
-    _cursor.execute('''
-        CREATE TABLE IF NOT EXISTS findings (
-            id INTEGER PRIMARY KEY,
-            url TEXT,
-            param TEXT,
-            type TEXT,
-            platform TEXT,
-            confidence INTEGER,
-            details TEXT,
-            verified BOOLEAN,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    _conn.commit()
+    global _default
+    _default = Database(db_path)
+    return _default
 
 def save_urls(urls):
-    for url in urls:
-        try:
-            _cursor.execute("INSERT OR IGNORE INTO urls (url) VALUES (?)", (url,))
-        except:
-            pass
-    _conn.commit()
+    _default.save_urls(urls)
 
 def save_endpoints(endpoints):
-    for path, params in endpoints.items():
-        for param in params:
-            try:
-                _cursor.execute("INSERT OR IGNORE INTO endpoints (path, param) VALUES (?, ?)", (path, param))
-            except:
-                pass
-    _conn.commit()
+    _default.save_endpoints(endpoints)
 
 def save_finding(finding):
-    _cursor.execute('''
-        INSERT INTO findings (url, param, type, platform, confidence, details, verified)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        finding['url'],
-        finding.get('param', ''),
-        finding['type'],
-        finding.get('platform', ''),
-        finding.get('confidence', 50),
-        str(finding.get('details', '')),
-        finding.get('verified', False)
-    ))
-    _conn.commit()
+    _default.save_finding(finding)
 
 def close():
-    if _conn:
-        _conn.close()
+    if _default:
+        _default.close()
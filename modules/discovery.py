@@ -0,0 +1,161 @@
+import html
+from pathlib import Path
+from urllib.parse import urlsplit
+from modules.packed import PackedProber, build_url, make_tag
+
+DEFAULT_WORDLIST = Path(__file__).parent / 'data' / 'wordlists' / 'params.txt'
+
+
+class Fingerprint:
+    """Coarse response fingerprint used to tell a behaviour change from noise."""
+
+    def __init__(self, response, strip=()):
+        text = response.text
+        for s in strip:
+            if s:
+                text = text.replace(s, '')
+        self.status = response.status
+        self.length = len(text)
+        self.lines = text.count('\n')
+        self.words = len(text.split())
+        self.location = response.headers.get('Location', '') if response.headers else ''
+
+    def differs(self, other, tolerance):
+        return (
+            self.status != other.status
+            or self.location != other.location
+            or self.lines != other.lines
+            or abs(self.length - other.length) > tolerance
+            or abs(self.words - other.words) > tolerance // 4
+        )
+
+
+class ParamDiscovery:
+    """Find undocumented params by packing many candidate names per request.
+
+    Every candidate in a batch gets a unique tagged value, so reflected
+    params are attributed directly, unless the endpoint echoes its own URL
+    (canonical links, form actions, pagination): then every tag comes back
+    and only the response diff counts. Batches whose response fingerprint
+    deviates from the endpoint baseline are split in half until the
+    responsible names are isolated, and each of those is confirmed with a
+    request of its own before it is reported. Requests go through the shared
+    HttpClient and therefore respect its per-host rate limit.
+    """
+
+    def __init__(self, http, config=None):
+        config = config or {}
+        self.http = http
+        self.prober = PackedProber(http)
+        self.batch_size = config.get('batch_size', 256)
+        self.max_url_length = config.get('max_url_length', 7000)
+        self.wordlist = self.load_wordlist(config.get('wordlist') or DEFAULT_WORDLIST)
+        self.requests = 0
+        self.found = 0
+
+    def load_wordlist(self, path):
+        names, seen = [], set()
+        with open(path, encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                name = line.strip()
+                if name and not name.startswith('#') and name not in seen:
+                    seen.add(name)
+                    names.append(name)
+        return names
+
+    async def discover(self, endpoint, known_params=()):
+        """Return the hidden params of ``endpoint`` (names from the wordlist only)."""
+        known = set(known_params)
+        candidates = [n for n in self.wordlist if n not in known]
+        try:
+            base = await self._baseline(endpoint)
+        except Exception:
+            return []
+        if base is None:
+            return []
+        baseline, tolerance, echoes = base
+        hits = []
+        for batch in self._batches(endpoint, candidates):
+            hits.extend(await self._test_batch(endpoint, batch, baseline, tolerance, echoes))
+        self.found += len(hits)
+        return hits
+
+    async def discover_all(self, endpoints, targets=()):
+        """Run discovery over ``endpoints`` (url -> params) plus param-less ``targets``.
+
+        Discovered params are merged into a copy of ``endpoints`` which is
+        returned together with the newly found (url, param) pairs.
+        """
+        merged = {ep: list(params) for ep, params in endpoints.items()}
+        for url in targets:
+            merged.setdefault(url, [])
+        new = []
+        for endpoint, params in list(merged.items()):
+            for param in await self.discover(endpoint, params):
+                merged[endpoint].append(param)
+                new.append((endpoint, param))
+        merged = {ep: params for ep, params in merged.items() if params}
+        return merged, new
+
+    def stats(self):
+        per_param = self.requests / self.found if self.found else float(self.requests)
+        return {'requests': self.requests, 'found': self.found, 'requests_per_param': per_param}
+
+    async def _get(self, url):
+        self.requests += 1
+        return await self.http.get(url)
+
+    async def _baseline(self, endpoint):
+        # Two clean requests with a random junk param to measure natural noise,
+        # and to see whether the page echoes the query (then reflection proves nothing)
+        junk = make_tag()
+        first = await self._get(build_url(endpoint, {junk: junk}))
+        second = await self._get(build_url(endpoint, {junk: junk}))
+        a, b = Fingerprint(first, strip=(junk,)), Fingerprint(second, strip=(junk,))
+        if a.status != b.status or a.lines != b.lines:
+            # Too unstable to compare against; skip the endpoint
+            return None
+        return a, abs(a.length - b.length) + 16, junk in first.text
+
+    def _batches(self, endpoint, names):
+        base_len = len(endpoint) + 1
+        batch, length = [], base_len
+        for name in names:
+            # name=omhxxxxxx& is roughly len(name) + 11 bytes
+            cost = len(name) + 11
+            if batch and (len(batch) >= self.batch_size or length + cost > self.max_url_length):
+                yield batch
+                batch, length = [], base_len
+            batch.append(name)
+            length += cost
+        if batch:
+            yield batch
+
+    async def _test_batch(self, endpoint, names, baseline, tolerance, echoes=False):
+        async def changed(subset):
+            self.requests += 1
+            try:
+                result = await self.prober.probe(endpoint, {name: '' for name in subset})
+            except Exception:
+                return False, []
+            # An echoed URL reflects every tag: only the diff can tell then
+            reflected = [] if echoes else result.reflected()
+            query = urlsplit(result.url).query
+            strip = [query, html.escape(query)] + list(result.tags.values())
+            return Fingerprint(result.response, strip=strip).differs(baseline, tolerance), reflected
+
+        differs, reflected = await changed(names)
+        hits = list(reflected)
+        if differs:
+            rest = [n for n in names if n not in hits]
+
+            async def test(subset):
+                return (await changed(subset))[0]
+
+            if rest and await test(rest):
+                # A one-off change (noise) must not become a hidden param: each
+                # isolated name has to change the response again, on its own
+                for name in await self.prober.bisect(rest, test):
+                    if await test([name]):
+                        hits.append(name)
+        return hits
@@ -0,0 +1,248 @@
+import asyncio
+import random
+import string
+import struct
+import time
+
+QTYPE_A = 1
+QTYPE_CNAME = 5
+RCODE_NXDOMAIN = 3
+
+
+def build_query(name, qtype=QTYPE_A, qid=None):
+    qid = random.getrandbits(16) if qid is None else qid
+    header = struct.pack('>HHHHHH', qid, 0x0100, 1, 0, 0, 0)  # RD set, one question
+    qname = b''.join(bytes([len(label)]) + label.encode('idna') for label in name.rstrip('.').split('.') if label)
+    return qid, header + qname + b'\x00' + struct.pack('>HH', qtype, 1)
+
+
+def _read_name(data, offset):
+    labels, jumped, end = [], False, offset
+    for _ in range(128):  # guard against compression loops
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            pointer = ((length & 0x3F) << 8) | data[offset + 1]
+            if not jumped:
+                end = offset + 2
+            offset, jumped = pointer, True
+            continue
+        if length == 0:
+            if not jumped:
+                end = offset + 1
+            return '.'.join(labels).lower(), end
+        labels.append(data[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+        offset += 1 + length
+    raise ValueError("DNS name compression loop")
+
+
+def parse_response(data):
+    """Return (qid, rcode, [(name, type, ttl, value)]) for A and CNAME answers."""
+    qid, flags, qdcount, ancount, _, _ = struct.unpack('>HHHHHH', data[:12])
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = _read_name(data, offset)
+        offset += 4
+    answers = []
+    for _ in range(ancount):
+        name, offset = _read_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack('>HHIH', data[offset:offset + 10])
+        offset += 10
+        if rtype == QTYPE_A and rdlength == 4:
+            answers.append((name, 'A', ttl, '.'.join(str(b) for b in data[offset:offset + 4])))
+        elif rtype == QTYPE_CNAME:
+            answers.append((name, 'CNAME', ttl, _read_name(data, offset)[0]))
+        offset += rdlength
+    return qid, flags & 0x000F, answers
+
+
+def system_nameservers(path='/etc/resolv.conf'):
+    servers = []
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == 'nameserver' and ':' not in parts[1]:
+                    servers.append((parts[1], 53))
+    except OSError:
+        pass
+    return servers or [('8.8.8.8', 53), ('1.1.1.1', 53)]
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, qid, future):
+        self.qid = qid
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if self.future.done() or len(data) < 12:
+            return
+        try:
+            parsed = parse_response(data)
+        except (ValueError, IndexError, struct.error) as e:
+            self.future.set_exception(e)
+            return
+        if parsed[0] == self.qid:
+            self.future.set_result(parsed)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+class DNSResolver:
+    """Minimal asyncio UDP stub resolver with a shared, TTL-bounded cache.
+
+    ``resolve`` returns a frozenset of ('A', ip) / ('CNAME', target)
+    records, empty for NXDOMAIN or no data. Concurrent lookups of the same
+    name share one in-flight query.
+    """
+
+    def __init__(self, nameservers=None, timeout=2.0, retries=2, concurrency=200, min_ttl=30):
+        self.nameservers = [tuple(ns) if not isinstance(ns, str) else (ns, 53) for ns in (nameservers or system_nameservers())]
+        self.timeout = timeout
+        self.retries = retries
+        self.min_ttl = min_ttl
+        self.queries = 0
+        self._cache = {}      # name -> (expires, answer)
+        self._inflight = {}   # name -> Future
+        self._sem = asyncio.Semaphore(concurrency)
+
+    async def resolve(self, name):
+        name = name.rstrip('.').lower()
+        cached = self._cache.get(name)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        pending = self._inflight.get(name)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            answer, ttl = await self._lookup(name)
+            self._cache[name] = (time.monotonic() + max(ttl, self.min_ttl), answer)
+            future.set_result(answer)
+            return answer
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(name, None)
+
+    async def _lookup(self, name):
+        last_error = None
+        for attempt in range(self.retries + 1):
+            ns = self.nameservers[attempt % len(self.nameservers)]
+            try:
+                async with self._sem:
+                    _, rcode, answers = await self._query(name, ns)
+            except (asyncio.TimeoutError, OSError, ValueError) as e:
+                last_error = e
+                continue
+            if rcode not in (0, RCODE_NXDOMAIN):
+                last_error = OSError(f"DNS rcode {rcode} for {name}")
+                continue
+            records = frozenset((rtype, value) for _, rtype, _, value in answers)
+            ttl = min((a[2] for a in answers), default=self.min_ttl)
+            return records, ttl
+        raise last_error or asyncio.TimeoutError()
+
+    async def _query(self, name, ns):
+        loop = asyncio.get_running_loop()
+        qid, packet = build_query(name)
+        future = loop.create_future()
+        self.queries += 1
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _QueryProtocol(qid, future), remote_addr=ns
+        )
+        try:
+            transport.sendto(packet)
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            transport.close()
+
+
+def _random_label():
+    return 'omh-' + ''.join(random.choices(string.ascii_lowercase + string.digits, k=12))
+
+
+class HostFilter:
+    """Resolve discovered subdomains and drop the junk before HTTP probing.
+
+    Hosts that do not resolve are dropped. Every parent zone (up to the
+    target apex) is probed once with random labels; hosts whose answer is
+    covered by a zone's wildcard answer are pruned. Hosts sharing an
+    identical answer set are collapsed to ``max_per_answer`` representatives.
+    """
+
+    def __init__(self, resolver, apex, max_per_answer=10, wildcard_probes=2):
+        self.resolver = resolver
+        self.apex = apex.lower().rstrip('.')
+        self.max_per_answer = max_per_answer
+        self.wildcard_probes = wildcard_probes
+        self.stats = {'input': 0, 'unresolved': 0, 'wildcard': 0, 'collapsed': 0, 'kept': 0}
+        self._wildcards = {}  # zone -> Future[frozenset]
+        self._per_answer = {}
+
+    async def wildcard_answer(self, zone):
+        if zone not in self._wildcards:
+            self._wildcards[zone] = asyncio.ensure_future(self._probe_zone(zone))
+        return await self._wildcards[zone]
+
+    async def _probe_zone(self, zone):
+        results = await asyncio.gather(
+            *(self.resolver.resolve(f"{_random_label()}.{zone}") for _ in range(self.wildcard_probes)),
+            return_exceptions=True
+        )
+        answers = [r for r in results if not isinstance(r, Exception)]
+        if len(answers) == self.wildcard_probes and all(answers):
+            return frozenset().union(*answers)
+        return frozenset()
+
+    def _zones(self, host):
+        labels = host.split('.')
+        for i in range(1, len(labels)):
+            zone = '.'.join(labels[i:])
+            if zone != self.apex and not zone.endswith('.' + self.apex):
+                break
+            yield zone
+
+    async def _check(self, host):
+        try:
+            answer = await self.resolver.resolve(host)
+        except Exception:
+            # Resolution failure is not proof of absence; let httpx decide
+            return host, None
+        if not answer:
+            self.stats['unresolved'] += 1
+            return None
+        for zone in self._zones(host):
+            wildcard = await self.wildcard_answer(zone)
+            if wildcard and (answer <= wildcard or answer & {r for r in wildcard if r[0] == 'CNAME'}):
+                self.stats['wildcard'] += 1
+                return None
+        return host, answer
+
+    async def filter(self, hosts):
+        """Async generator yielding surviving hosts as soon as they resolve."""
+        tasks = []
+        for host in dict.fromkeys(h.strip().lower().rstrip('.') for h in hosts if h.strip()):
+            self.stats['input'] += 1
+            tasks.append(asyncio.ensure_future(self._check(host)))
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result is None:
+                    continue
+                host, answer = result
+                if answer is not None and self.max_per_answer:
+                    seen = self._per_answer.get(answer, 0)
+                    if seen >= self.max_per_answer:
+                        self.stats['collapsed'] += 1
+                        continue
+                    self._per_answer[answer] = seen + 1
+                self.stats['kept'] += 1
+                yield host
+        finally:
+            for t in tasks:
+                t.cancel()
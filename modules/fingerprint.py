@@ -0,0 +1,227 @@
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+from modules.signatures import get_library
+
+DAY = 86400
+
+# Techs that name an access layer rather than an engine
+GENERIC_DBMS = frozenset({'sql'})
+
+# Engines worth probing when only the stack is known (no DB error seen yet)
+LIKELY_DBMS = {
+    'php': ('mysql', 'postgresql', 'sqlite'),
+    'wordpress': ('mysql',),
+    'joomla': ('mysql',),
+    'magento': ('mysql',),
+    'drupal': ('mysql', 'postgresql'),
+    'laravel': ('mysql', 'postgresql', 'sqlite'),
+    'codeigniter': ('mysql', 'postgresql'),
+    'aspnet': ('mssql',),
+    'asp': ('mssql', 'access'),
+    'iis': ('mssql',),
+    'django': ('postgresql', 'mysql', 'sqlite'),
+    'rails': ('postgresql', 'mysql', 'sqlite'),
+    'coldfusion': ('mssql', 'mysql', 'oracle'),
+}
+
+# Kinds that say the host runs server-side code
+DYNAMIC_KINDS = frozenset({'language', 'framework', 'cms', 'dbms', 'database', 'stacktrace'})
+
+# Scanners that need server-side code behind the endpoint
+SERVER_SIDE_SCANNERS = frozenset({'sqli', 'sqli_packed', 'ssrf', 'business_logic'})
+
+# httpx (wappalyzer) names that differ from ours
+HTTPX_ALIASES = {
+    'microsoft asp.net': 'aspnet', 'asp.net': 'aspnet', 'microsoft iis': 'iis', 'iis': 'iis',
+    'amazon s3': 'amazon_s3', 'github pages': 'github_pages', 'ruby on rails': 'rails',
+    'node.js': 'nodejs', 'microsoft sql server': 'mssql', 'apache http server': 'apache',
+    'amazon cloudfront': 'cloudfront', 'next.js': 'nextjs', 'apache tomcat': 'tomcat',
+    'google cloud storage': 'google_storage', 'azure blob storage': 'azure_blob',
+}
+
+
+class TechProfiles:
+    """Per-host technology profiles built passively from responses already fetched.
+
+    Sources are httpx's JSON records, baseline responses (headers, cookie
+    names, body signatures), the URL paths gathered during recon and every
+    signature hit scanners report. Profiles are loaded from and saved to the
+    target's DB, so a re-run starts with what earlier runs learned.
+
+    Also remembers which signatures a clean baseline response already shows
+    per endpoint, so an error page that is always there is not mistaken for
+    an injected one.
+    """
+
+    def __init__(self, db=None, config=None):
+        config = config or {}
+        self.db = db
+        # 0 / null disables decay or expiry
+        self.half_life = (config.get('half_life_days', 30) or 0) * DAY
+        self.max_age = (config.get('max_age_days', 180) or 0) * DAY
+        # Decayed observations below this no longer pick the payload DBMS
+        self.min_weight = config.get('min_weight', 1.0) or 0
+        self.now = time.time()
+        self.techs = defaultdict(Counter)     # host -> tech -> observations
+        self.kinds = {}                       # tech -> kind
+        self.evidence = {}                    # (host, tech) -> first evidence seen
+        self.last_seen = {}                   # (host, tech) -> when last observed
+        self.stored = {}                      # (host, tech) -> (count, last_seen) as loaded
+        self.baseline = defaultdict(set)      # endpoint -> signature ids
+        self.content_types = {}               # endpoint -> baseline Content-Type
+        self.pruned = Counter()               # scanner -> runs skipped as not applicable
+        if db is not None:
+            for host, tech, kind, count, evidence, last_seen in db.load_tech_profiles():
+                last_seen = last_seen or self.now
+                age = max(0.0, self.now - last_seen)
+                if self.max_age and age > self.max_age:
+                    continue
+                self.stored[(host, tech)] = (count, last_seen)
+                if self.half_life:
+                    count *= 0.5 ** (age / self.half_life)
+                self._add(host, tech, kind, evidence, count, last_seen)
+
+    @staticmethod
+    def _host(url):
+        if '//' not in url:
+            return url.lower()
+        return urlsplit(url).netloc.lower()
+
+    @staticmethod
+    def _endpoint(url):
+        return url.split('?', 1)[0]
+
+    def _add(self, host, tech, kind, evidence, count=1, last_seen=None):
+        self.techs[host][tech] += count
+        self.kinds.setdefault(tech, kind)
+        self.evidence.setdefault((host, tech), evidence)
+        self.last_seen[(host, tech)] = self.now if last_seen is None else last_seen
+
+    def record(self, url, hits):
+        """Signature hits from any response of ``url``'s host."""
+        host = self._host(url)
+        for h in hits:
+            self._add(host, h.tech, h.kind, h.text[:200])
+
+    def record_baseline(self, url, hits, response=None):
+        self.baseline[self._endpoint(url)].update(h.signature.id for h in hits)
+        self.record(url, hits)
+        if response is not None:
+            self.observe_response(url, response)
+
+    def baseline_ids(self, url):
+        return self.baseline.get(self._endpoint(url), ())
+
+    def observe_response(self, url, response):
+        """Headers and cookie names of a response."""
+        host, lib = self._host(url), get_library()
+        headers = response.headers
+        for where in lib.passive:
+            if where.startswith('header:'):
+                value = headers.get(where[7:])
+                if value:
+                    for sig in lib.match_field(where, value):
+                        self._add(host, sig.tech, sig.kind, f"{where[7:]}: {value}"[:200])
+        for cookie in headers.getall('Set-Cookie', ()) if hasattr(headers, 'getall') else ():
+            name = cookie.split('=', 1)[0].strip()
+            for sig in lib.match_field('cookie', name):
+                self._add(host, sig.tech, sig.kind, f"cookie {name}")
+        content_type = headers.get('Content-Type')
+        if content_type:
+            self.content_types[self._endpoint(url)] = content_type.lower()
+
+    def observe_httpx(self, record):
+        """One httpx ``-json -td`` record."""
+        url = record.get('url')
+        if not url:
+            return
+        host, lib = self._host(url), get_library()
+        webserver = record.get('webserver')
+        if webserver:
+            for sig in lib.match_field('header:server', webserver):
+                self._add(host, sig.tech, sig.kind, f"server: {webserver}")
+        for name in record.get('tech') or ():
+            tech = name.split(':', 1)[0].strip().lower()
+            tech = HTTPX_ALIASES.get(tech, tech.replace(' ', '_'))
+            kind = self.kinds.get(tech) or lib.kinds.get(tech, 'other')
+            self._add(host, tech, kind, f"httpx: {name}")
+
+    def observe_urls(self, urls):
+        """URL paths gathered during recon: one pass of each rule per host."""
+        paths = defaultdict(list)
+        for url in urls:
+            parts = urlsplit(url)
+            paths[parts.netloc.lower()].append(parts.path)
+        rules = get_library().passive.get('url', ())
+        for host, host_paths in paths.items():
+            joined = '\n'.join(host_paths)
+            for regex, sig in rules:
+                m = regex.search(joined)
+                if m:
+                    self._add(host, sig.tech, sig.kind, f"path {m.group(0)}")
+
+    def profile(self, url):
+        """``{tech: observations}`` for the host of ``url``."""
+        return dict(self.techs.get(self._host(url), {}))
+
+    def dbms(self, url):
+        """Payload DBMS context for ``url``'s host.
+
+        A single engine when one was seen (DB errors, passive hints), a set
+        of the engines plausible for the detected stack otherwise, or None
+        when nothing is known. Techs whose decayed weight fell below
+        ``min_weight`` count as unknown.
+        """
+        counts = {tech: n for tech, n in self.techs.get(self._host(url), {}).items() if n >= self.min_weight}
+        if not counts:
+            return None
+        engines = get_library().engines - GENERIC_DBMS
+        ranked = [(n, tech) for tech, n in counts.items() if tech in engines]
+        if ranked:
+            return max(ranked)[1]
+        # The most specific stack wins (WordPress narrows PHP to MySQL); conflicting
+        # stacks, e.g. a PHP app behind IIS, keep the union
+        stacks = [set(LIKELY_DBMS[tech]) for tech in counts if tech in LIKELY_DBMS]
+        if not stacks:
+            return None
+        return frozenset(set.intersection(*stacks) or set.union(*stacks))
+
+    def is_static(self, url):
+        """True when the host is static hosting with no sign of server-side code."""
+        counts = self.techs.get(self._host(url))
+        if not counts:
+            return False
+        kinds = {self.kinds.get(t) for t in counts}
+        return 'static' in kinds and not kinds & DYNAMIC_KINDS
+
+    def applicable(self, scanner, endpoint):
+        """Whether ``scanner`` can find anything at ``endpoint`` given what is known."""
+        if scanner in SERVER_SIDE_SCANNERS and self.is_static(endpoint):
+            ok = False
+        elif scanner == 'xss':
+            # Reflections in JSON, images, plain text, ... are not script execution
+            content_type = self.content_types.get(self._endpoint(endpoint))
+            ok = content_type is None or any(t in content_type for t in ('html', 'xml', 'javascript'))
+        else:
+            ok = True
+        if not ok:
+            self.pruned[scanner] += 1
+        return ok
+
+    def save(self):
+        if self.db is None:
+            return
+        rows = []
+        for host, counts in self.techs.items():
+            for tech, n in counts.items():
+                last_seen = self.last_seen.get((host, tech), self.now)
+                if last_seen != self.now:
+                    # Not seen this run: keep the stored count, decay stays relative to last_seen
+                    n = self.stored[(host, tech)][0]
+                rows.append((host, tech, self.kinds.get(tech, 'unknown'), round(n, 3),
+                             self.evidence.get((host, tech), ''), last_seen))
+        self.db.save_tech_profiles(rows)
+        if self.max_age:
+            self.db.delete_tech_profiles_before(self.now - self.max_age)
+
@@ -0,0 +1,107 @@
+# Bundled, offline browser header profiles.
+#
+# Each profile is a coherent set of headers a real browser sends on a
+# top-level navigation (the User-Agent matches its Client Hints, Accept and
+# Accept-Language). They are built once at import time into immutable
+# mappings and handed out as-is, so picking one costs a dict lookup.
+from importlib.util import find_spec
+from types import MappingProxyType
+
+_NAV_ACCEPT_CHROMIUM = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7"
+_NAV_ACCEPT_FIREFOX = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8"
+_NAV_ACCEPT_SAFARI = "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+# Browsers offer brotli, but aiohttp can only decode it with Brotli (or brotlicffi)
+# installed; without a decoder a br response would fail with ContentEncodingError
+_ACCEPT_ENCODING = "gzip, deflate, br" if find_spec("brotli") or find_spec("brotlicffi") else "gzip, deflate"
+
+
+def _chromium(ua, brand, version, platform, mobile=False, lang="en-US,en;q=0.9"):
+    return {
+        "User-Agent": ua,
+        "Accept": _NAV_ACCEPT_CHROMIUM,
+        "Accept-Language": lang,
+        "Accept-Encoding": _ACCEPT_ENCODING,
+        "sec-ch-ua": f'"{brand}";v="{version}", "Chromium";v="{version}", "Not_A Brand";v="24"',
+        "sec-ch-ua-mobile": "?1" if mobile else "?0",
+        "sec-ch-ua-platform": f'"{platform}"',
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-User": "?1",
+        "Upgrade-Insecure-Requests": "1",
+    }
+
+
+def _firefox(ua, lang="en-US,en;q=0.5"):
+    return {
+        "User-Agent": ua,
+        "Accept": _NAV_ACCEPT_FIREFOX,
+        "Accept-Language": lang,
+        "Accept-Encoding": _ACCEPT_ENCODING,
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-User": "?1",
+        "Upgrade-Insecure-Requests": "1",
+    }
+
+
+def _safari(ua, lang="en-US,en;q=0.9"):
+    return {
+        "User-Agent": ua,
+        "Accept": _NAV_ACCEPT_SAFARI,
+        "Accept-Language": lang,
+        "Accept-Encoding": _ACCEPT_ENCODING,
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+    }
+
+
+class HeaderProfile:
+    """An immutable, named set of browser headers."""
+    __slots__ = ('name', 'headers')
+
+    def __init__(self, name, headers):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'headers', MappingProxyType(dict(headers)))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("HeaderProfile is immutable")
+
+    def __repr__(self):
+        return f"HeaderProfile({self.name!r})"
+
+
+_RAW = {
+    "chrome-win": _chromium(
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        "Google Chrome", "124", "Windows"),
+    "chrome-mac": _chromium(
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        "Google Chrome", "124", "macOS"),
+    "chrome-linux": _chromium(
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+        "Google Chrome", "123", "Linux"),
+    "chrome-android": _chromium(
+        "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
+        "Google Chrome", "124", "Android", mobile=True),
+    "edge-win": _chromium(
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0",
+        "Microsoft Edge", "124", "Windows"),
+    "chrome-win-gb": _chromium(
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+        "Google Chrome", "123", "Windows", lang="en-GB,en;q=0.9"),
+    "firefox-win": _firefox(
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0"),
+    "firefox-mac": _firefox(
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0"),
+    "firefox-linux": _firefox(
+        "Mozilla/5.0 (X11; Linux x86_64; rv:124.0) Gecko/20100101 Firefox/124.0"),
+    "safari-mac": _safari(
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15"),
+    "safari-ios": _safari(
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1"),
+}
+
+PROFILES = tuple(HeaderProfile(name, headers) for name, headers in _RAW.items())
@@ -0,0 +1,248 @@
+import asyncio
+import contextvars
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from modules.scope import OutOfScopeError
+from modules.circuit import classify, CircuitOpenError, FAILURES
+from modules.body import read_body, DEFAULT_MAX_BYTES, DEFAULT_DECODE_TYPES
+
+
+class BudgetExceededError(Exception):
+    """Raised when a target has used up its request budget."""
+
+
+# Tally of the scan task the current asyncio task belongs to (see track_requests)
+_tally = contextvars.ContextVar('omnihunter_request_tally', default=None)
+
+
+class RequestTally:
+    """What became of the requests one scan task made through a TargetHttpClient.
+
+    ``refused`` requests were never sent (circuit open, budget used up);
+    ``failed`` ones timed out, were reset, or came back blocked. Scanners
+    swallow both, so only a tally without either means every payload was
+    actually tested.
+    """
+    __slots__ = ('sent', 'refused', 'failed')
+
+    def __init__(self):
+        self.sent = self.refused = self.failed = 0
+
+    @property
+    def complete(self):
+        return not (self.refused or self.failed)
+
+
+@contextmanager
+def track_requests():
+    """Count the requests of the current task (and the tasks it spawns) in a new RequestTally."""
+    tally = RequestTally()
+    token = _tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _tally.reset(token)
+
+
+class Response:
+    """HTTP response handed to scanners and detectors.
+
+    ``text`` holds at most the client's body cap (empty for content types
+    no detector decodes); ``length`` and ``fingerprint`` cover the bytes
+    read, and ``matches`` holds hits of the pattern passed to ``get``.
+    """
+    __slots__ = ('url', 'status', 'headers', 'text', 'elapsed', 'length', 'fingerprint', 'truncated', 'matches')
+
+    def __init__(self, url, status, headers, text, elapsed, length=None, fingerprint=None,
+                 truncated=False, matches=()):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.text = text
+        self.elapsed = elapsed
+        self.length = len(text) if length is None else length
+        self.fingerprint = fingerprint
+        self.truncated = truncated
+        self.matches = list(matches)
+
+
+def _client_timeout(total):
+    import aiohttp
+    return aiohttp.ClientTimeout(total=total)
+
+
+class HostRateLimiter:
+    """Per-host token bucket: at most ``rate`` requests/second, bursts up to ``burst``."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self._buckets = {}  # host -> (tokens, last_refill)
+        self._locks = {}
+
+    async def acquire(self, host):
+        if not self.rate:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            tokens, last = self._buckets.get(host, (self.burst, time.monotonic()))
+            now = time.monotonic()
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / self.rate)
+                now = time.monotonic()
+                tokens = 1
+            self._buckets[host] = (tokens - 1, now)
+
+
+class HttpClient:
+    """Shared HTTP path for request-based scanners.
+
+    Keeps one aiohttp session (and its connection pool) for the whole scan,
+    applies AntiBlock headers/proxies, enforces the per-host rate limit and
+    counts requests per host so request budgets can be reported. A block
+    page or captcha switches the host to another header profile. With a
+    ``scope`` set, out-of-scope URLs raise OutOfScopeError before any I/O;
+    with a ``breaker`` set, every outcome feeds the host's circuit and
+    requests to a host whose circuit is open raise CircuitOpenError.
+    """
+
+    def __init__(self, anti_block, timeout=10, rate_limit=None, scope=None,
+                 max_body=DEFAULT_MAX_BYTES, decode_types=DEFAULT_DECODE_TYPES, breaker=None):
+        self.anti_block = anti_block
+        self.scope = scope
+        self.breaker = breaker
+        self.max_body = max_body
+        self.decode_types = tuple(decode_types)
+        self.timeout = timeout
+        self.limiter = HostRateLimiter(rate_limit)
+        self.requests = Counter()
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp  # deferred: keeps it off the startup path
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def get(self, url, timeout=None, headers=None, allow_redirects=True, match=None, stop_on_match=False):
+        """GET ``url``; ``match`` is a compiled regex run over the body as it streams in."""
+        if self.scope is not None and not self.scope.in_scope(url):
+            raise OutOfScopeError(url)
+        host = urlsplit(url).netloc
+        if self.breaker is not None:
+            self.breaker.check(host)
+        await self.limiter.acquire(host)
+        self.requests[host] += 1
+        start = time.monotonic()
+        try:
+            async with self._get_session().get(
+                url,
+                headers=headers or self.anti_block.get_headers(host),
+                proxy=self.anti_block.get_proxy(),
+                timeout=_client_timeout(timeout or self.timeout),
+                allow_redirects=allow_redirects,
+            ) as resp:
+                body = await read_body(resp, self.max_body, pattern=match, stop_on_match=stop_on_match,
+                                       decode_types=self.decode_types)
+                response = Response(str(resp.url), resp.status, resp.headers, body.text,
+                                    time.monotonic() - start, body.length, body.fingerprint,
+                                    body.truncated, body.matches)
+        except Exception as e:
+            if self.breaker is not None:
+                self.breaker.record(host, classify(error=e))
+            raise
+        outcome = classify(response)
+        if outcome in ('blocked', 'captcha'):
+            # This browser profile got flagged: look like another client from now on
+            self.anti_block.rotate(host)
+        if self.breaker is not None:
+            self.breaker.record(host, outcome)
+        return response
+
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    def for_target(self, scope=None, max_requests=None, recorder=None, monitor=None):
+        """Per-target view sharing this client's pool and rate limiter."""
+        return TargetHttpClient(self, scope=scope, max_requests=max_requests, recorder=recorder, monitor=monitor)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            # Give the connector a tick to release SSL transports
+            await asyncio.sleep(0)
+
+
+class TargetHttpClient:
+    """A target's view of a shared HttpClient.
+
+    Requests share the underlying session, connection pool and per-host
+    rate limiter, but scope, request accounting and the request budget are
+    per target. With a ``recorder`` (a TrafficRecorder) every exchange that
+    reached the network is logged for later replay; a ``monitor`` (the
+    target's Autoscaler) gets each request's latency and failure. Inside
+    ``track_requests()`` every request is also counted in the caller's
+    RequestTally.
+    """
+
+    def __init__(self, shared, scope=None, max_requests=None, recorder=None, monitor=None, tag_seed=None):
+        self.shared = shared
+        self.scope = scope
+        self.max_requests = max_requests
+        self.recorder = recorder
+        self.monitor = monitor
+        # PackedProber tag seed: a recording stores it, a replay passes it back
+        self.tag_seed = recorder.tag_seed if recorder is not None else tag_seed
+        self.requests = Counter()
+
+    @property
+    def exhausted(self):
+        return bool(self.max_requests) and self.total_requests() >= self.max_requests
+
+    async def get(self, url, **kwargs):
+        tally = _tally.get()
+        if self.scope is not None and not self.scope.in_scope(url):
+            raise OutOfScopeError(url)
+        if self.exhausted:
+            if tally is not None:
+                tally.refused += 1
+            raise BudgetExceededError(url)
+        self.requests[urlsplit(url).netloc] += 1
+        if self.recorder is None and self.monitor is None and tally is None:
+            return await self.shared.get(url, **kwargs)
+        start = time.monotonic()
+        try:
+            response = await self.shared.get(url, **kwargs)
+        except OutOfScopeError:
+            raise
+        except CircuitOpenError:
+            if tally is not None:
+                tally.refused += 1
+            raise
+        except Exception as e:
+            if tally is not None:
+                tally.failed += 1
+            if self.recorder is not None:
+                self.recorder.record(url, error=e)
+            if self.monitor is not None:
+                self.monitor.record(time.monotonic() - start, failed=True)
+            raise
+        if tally is not None:
+            tally.sent += 1
+            if classify(response) in FAILURES:
+                tally.failed += 1
+        if self.recorder is not None:
+            self.recorder.record(url, response)
+        if self.monitor is not None:
+            self.monitor.record(response.elapsed, failed=response.status == 429 or response.status >= 500)
+        return response
+
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    async def close(self):
+        # The shared client outlives its targets
+        pass
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import re
+import time
+from collections import Counter
+
+# Tokens that change between requests of an unchanged page (ids, counters,
+# timestamps, CSRF tokens, nonces); stripped before fingerprinting
+_VOLATILE = re.compile(r'[A-Za-z0-9+/_=-]{20,}|\d+')
+
+NEW, PERSISTING, FIXED = 'new', 'persisting', 'fixed'
+
+DAY = 86400
+
+
+def surface_fingerprint(response):
+    """Fingerprint of what an endpoint exposes, stable across reloads of the same page.
+
+    Status, content type and the body with volatile tokens removed; bodies
+    that were not decoded fall back to the raw body hash.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    content_type = (response.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+    digest.update(f"{response.status}|{content_type}|".encode())
+    if response.text:
+        digest.update(_VOLATILE.sub('', response.text).encode('utf-8', 'replace'))
+    elif response.fingerprint:
+        digest.update(response.fingerprint.encode())
+    return digest.hexdigest()
+
+
+def finding_key(finding):
+    endpoint = finding['url'].split('?', 1)[0]
+    return f"{finding['type']}|{endpoint}|{finding.get('param', '')}"
+
+
+class ScanHistory:
+    """What earlier runs of a target tested and found, kept in its DB.
+
+    Every run records, per (endpoint, param), the endpoint's surface
+    fingerprint, the scanners that ran and when; and, per finding, whether
+    it is new, persisting or fixed. With ``enabled`` (``--incremental``)
+    ``plan()`` uses that history to queue only params that are new, whose
+    endpoint changed, that were not yet tested by every scanner now
+    configured, or whose last test is older than ``stale_after_days``
+    (oldest first, at most ``max_stale_per_run`` of them); everything else
+    is skipped. A full run still writes history, so the next incremental
+    run has something to compare with.
+
+    Each scan task fingerprints its endpoint as part of the scan (one
+    request per endpoint and run, unless a baseline already did), so the
+    stored fingerprint is that of the page the scanners saw.
+
+    A finding is fixed when its (endpoint, param) was tested to completion
+    this run and did not report it again; params that were skipped keep
+    their findings' status.
+    """
+
+    def __init__(self, db, config=None):
+        config = config or {}
+        self.db = db
+        self.enabled = config.get('enabled', False)
+        self.stale_after = config.get('stale_after_days', 7) * DAY
+        self.max_stale = config.get('max_stale_per_run')
+        self.refresh_fingerprints = config.get('fingerprint', True)
+        self.now = time.time()
+        self.state = {}           # (endpoint, param) -> (fingerprint, scanners, last_scanned)
+        for endpoint, param, fingerprint, scanners, last_scanned in db.load_scan_state():
+            self.state[(endpoint, param)] = (fingerprint, scanners or '', last_scanned or 0.0)
+        self.findings = {row[0]: row for row in db.load_finding_states()}
+        self.fingerprints = {}    # endpoint -> surface fingerprint this run
+        self.pending = {}         # endpoint -> fingerprint request in flight
+        self.scanned = {}         # (endpoint, param) -> scanners, tested to completion this run
+        self.seen = {}            # finding key -> (status, endpoint, param, type) this run
+        self.stats = Counter()
+
+    def observe(self, endpoint, response):
+        """Fingerprint ``endpoint`` from a clean response fetched anyway (e.g. its baseline)."""
+        self.fingerprints[endpoint] = surface_fingerprint(response)
+
+    async def fingerprint(self, http, endpoint):
+        """Fetch and store ``endpoint``'s fingerprint unless this run already has it.
+
+        Concurrent callers for the same endpoint share one request; a failed
+        fetch raises, and the next caller tries again.
+        """
+        if not self.refresh_fingerprints or endpoint in self.fingerprints:
+            return
+        pending = self.pending.get(endpoint)
+        if pending is None:
+            pending = self.pending[endpoint] = asyncio.ensure_future(self._fetch(http, endpoint))
+        await asyncio.shield(pending)
+
+    async def _fetch(self, http, endpoint):
+        try:
+            self.observe(endpoint, await http.get(endpoint, timeout=10))
+            self.stats['fingerprinted'] += 1
+        finally:
+            del self.pending[endpoint]
+
+    async def refresh(self, http, endpoints, concurrency=10):
+        """Fetch a fingerprint for each endpoint that does not have one yet."""
+        if not self.refresh_fingerprints:
+            return
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(endpoint):
+            async with semaphore:
+                try:
+                    await self.fingerprint(http, endpoint)
+                except Exception:
+                    pass
+
+        await asyncio.gather(*(fetch(ep) for ep in endpoints if ep not in self.fingerprints))
+
+    def plan(self, endpoints, scanners):
+        """``{endpoint: [params]}`` to scan this run; ``scanners`` names the configured scanners."""
+        wanted = set(scanners.split(','))
+        due, stale = {}, []
+        for endpoint, params in endpoints.items():
+            current = self.fingerprints.get(endpoint)
+            for param in params:
+                previous = self.state.get((endpoint, param))
+                if not self.enabled:
+                    reason = 'full'
+                elif previous is None:
+                    reason = 'new'
+                elif not wanted <= set(previous[1].split(',')):
+                    reason = 'scanners'
+                elif current and previous[0] and current != previous[0]:
+                    reason = 'changed'
+                elif self.now - previous[2] >= self.stale_after:
+                    stale.append((previous[2], endpoint, param))
+                    continue
+                else:
+                    self.stats['unchanged'] += 1
+                    continue
+                self.stats[reason] += 1
+                due.setdefault(endpoint, []).append(param)
+        stale.sort()
+        limit = len(stale) if self.max_stale is None else self.max_stale
+        for _, endpoint, param in stale[:limit]:
+            due.setdefault(endpoint, []).append(param)
+        self.stats['stale'] += min(limit, len(stale))
+        self.stats['deferred'] += len(stale) - min(limit, len(stale))
+        return due
+
+    def mark_scanned(self, endpoint, params, scanners):
+        for param in params if isinstance(params, list) else [params]:
+            self.scanned[(endpoint, param)] = scanners
+
+    def finding_status(self, finding):
+        """new or persisting, compared with the findings still open after the last run."""
+        key = finding_key(finding)
+        if key not in self.seen:
+            previous = self.findings.get(key)
+            status = PERSISTING if previous is not None and previous[4] != FIXED else NEW
+            self.seen[key] = (status, finding['url'].split('?', 1)[0], finding.get('param', ''), finding['type'])
+        return self.seen[key][0]
+
+    def fixed(self):
+        """Findings open before this run whose (endpoint, param) was re-tested without finding them."""
+        out = []
+        for key, (_, url, param, type_, status, _, _) in self.findings.items():
+            if status == FIXED or key in self.seen:
+                continue
+            if (url.split('?', 1)[0], param) in self.scanned:
+                out.append({'url': url, 'param': param, 'type': type_, 'status': FIXED})
+        return out
+
+    def save(self, fixed=()):
+        now = time.time()
+        self.db.save_scan_state(
+            (endpoint, param, self.fingerprints.get(endpoint) or self.state.get((endpoint, param), (None,))[0],
+             scanners, now)
+            for (endpoint, param), scanners in self.scanned.items()
+        )
+        rows = []
+        for key, (status, url, param, type_) in self.seen.items():
+            previous = self.findings.get(key)
+            first_seen = previous[5] if previous is not None and status == PERSISTING else now
+            rows.append((key, url, param, type_, status, first_seen, now))
+        for finding in fixed:
+            key = finding_key(finding)
+            previous = self.findings[key]
+            rows.append((key, previous[1], previous[2], previous[3], FIXED, previous[5], previous[6]))
+        self.db.save_finding_states(rows)
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['new']} new, {s['changed']} changed, {s['scanners']} with new scanners, "
+                f"{s['stale']} stale re-tests; {s['unchanged']} unchanged skipped"
+                + (f", {s['deferred']} stale deferred" if s['deferred'] else ''))
@@ -1,11 +1,11 @@
 # Simplified interactsh client
-import requests
 import uuid
 import time
 
 class Interactsh:
     def __init__(self, server="oast.pro"):
         self.server = server
+        import requests
         self.session = requests.Session()
         self.correlation_id = str(uuid.uuid4())[:20]
 
@@ -1,4 +1,3 @@
-import requests
 import asyncio
 
 class NotificationManager:
@@ -27,6 +26,7 @@ class NotificationManager:
     async def _send_telegram(self, message):
         url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
         data = {'chat_id': self.telegram_chat_id, 'text': message, 'parse_mode': 'Markdown'}
+        import aiohttp
         try:
             async with aiohttp.ClientSession() as session:
                 await session.post(url, json=data)
@@ -37,6 +37,7 @@ class NotificationManager:
         if not self.slack_webhook:
             return
         data = {'text': message}
+        import aiohttp
         try:
             async with aiohttp.ClientSession() as session:
                 await session.post(self.slack_webhook, json=data)
@@ -46,6 +47,7 @@ class NotificationManager:
     async def _send_generic(self, finding):
         if not self.generic_webhook:
             return
+        import aiohttp
         try:
             async with aiohttp.ClientSession() as session:
                 await session.post(self.generic_webhook, json=finding)
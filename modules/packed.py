@@ -0,0 +1,95 @@
+import hashlib
+import secrets
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote
+
+TAG_PREFIX = 'omh'
+
+
+def make_tag(seed=None, *key):
+    """A tag for one injected value: random, or derived from ``seed`` and ``key``.
+
+    A recorded run seeds its tags (the seed is stored with the recording),
+    so a replay builds the same URLs and finds their recorded responses.
+    """
+    if seed is None:
+        return TAG_PREFIX + secrets.token_hex(3)
+    return TAG_PREFIX + hashlib.blake2b(repr((seed,) + key).encode(), digest_size=3).hexdigest()
+
+
+def build_url(endpoint, values):
+    """Return ``endpoint`` with ``values`` set as query params (other params are kept)."""
+    parts = urlsplit(endpoint)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in values]
+    query.extend(values.items())
+    return urlunsplit(parts._replace(query=urlencode(query, quote_via=quote, safe='')))
+
+
+class ProbeResult:
+    def __init__(self, url, response, tags):
+        self.url = url
+        self.response = response
+        self.tags = tags  # param -> tag
+
+    def reflected(self):
+        """Params whose tag came back in the response body."""
+        text = self.response.text
+        return [param for param, tag in self.tags.items() if tag in text]
+
+    def tags_near(self, start, end, window=200):
+        """Params whose tag appears around ``text[start:end]`` (e.g. inside a DB error)."""
+        chunk = self.response.text[max(0, start - window):end + window]
+        return [param for param, tag in self.tags.items() if tag in chunk]
+
+
+class PackedProber:
+    """Probe every param of an endpoint with a single request.
+
+    Each param gets its own payload, optionally prefixed with a unique tag so
+    reflections and error messages can be attributed back to it. Signals that
+    carry no tag (response delay, an error that does not echo input) are
+    narrowed down with ``bisect``.
+    """
+
+    def __init__(self, http):
+        self.http = http
+        self.seed = getattr(http, 'tag_seed', None)
+        self.requests = 0
+
+    async def probe(self, endpoint, payloads, tagged=True, timeout=None, **kwargs):
+        """Send one request with ``payloads`` (param -> payload) injected together.
+
+        Extra keyword arguments (``match``, ``stop_on_match``) go to the HTTP client.
+        """
+        tags = {}
+        if tagged:
+            tags = {param: make_tag(self.seed, endpoint, param, payload) for param, payload in payloads.items()}
+        values = {param: tags.get(param, '') + payload for param, payload in payloads.items()}
+        url = build_url(endpoint, values)
+        self.requests += 1
+        response = await self.http.get(url, timeout=timeout, **kwargs)
+        return ProbeResult(url, response, tags)
+
+    async def reflected_params(self, endpoint, params):
+        """One harmless tagged request telling which params are reflected."""
+        result = await self.probe(endpoint, {param: '' for param in params})
+        return set(result.reflected())
+
+    async def bisect(self, params, test):
+        """Find the params responsible for a signal seen on the whole ``params`` set.
+
+        ``test(subset)`` is an async predicate that re-sends the probe with
+        only ``subset`` injected. The caller has already observed the signal
+        on ``params``. Both halves are tested, since the signal may be noise
+        of the full request (a 414, a length change from the long query)
+        that neither half reproduces; so every param returned from a set of
+        several was positive on a request of its own.
+        """
+        params = list(params)
+        if len(params) <= 1:
+            return params
+        mid = len(params) // 2
+        hits = []
+        for half in (params[:mid], params[mid:]):
+            if await test(half):
+                hits.extend(await self.bisect(half, test))
+        return hits
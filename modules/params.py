@@ -1,27 +1,151 @@
-from urllib.parse import urlparse, parse_qs
+import heapq
 import re
+from bisect import insort
+from urllib.parse import urlparse, parse_qs
+from modules.scope import Scope
+
+# Path segments that are variable whatever the corpus says, most specific first
+SEGMENT_TYPES = (
+    ('{uuid}', r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'),
+    ('{date}', r'(?:19|20)\d\d[-_][01]\d(?:[-_][0-3]\d)?'),
+    ('{int}', r'-?\d+'),
+    ('{hash}', r'(?=.*\d)[0-9a-f]{16,}'),
+    # Long hyphenated titles ("blue-cotton-shirt-xl-42"); short ones are left to cardinality learning
+    ('{slug}', r'(?=.*\d)[a-z0-9]+(?:[-_][a-z0-9]+){2,}|[a-z0-9]+(?:[-_][a-z0-9]+){4,}'),
+)
+# All of them in one regex; the matching group names the placeholder
+_SEGMENT_RE = re.compile('|'.join(f"(?P<t{i}>{pattern})" for i, (_, pattern) in enumerate(SEGMENT_TYPES)), re.I)
+_SEGMENT_NAMES = {f"t{i}": name for i, (name, _) in enumerate(SEGMENT_TYPES)}
+VAR = '{var}'
+# A position with this many times max_literals distinct values is variable regardless
+# of the ratio, which bounds memory on huge corpora
+LITERAL_CAP = 20
+
+
+def segment_type(segment):
+    """Placeholder for a variable-looking path segment (extension kept), or None."""
+    if segment.isalpha():
+        # Plain words are the common case and never a placeholder
+        return None
+    stem, dot, ext = segment.rpartition('.')
+    if not dot or not ext.isalnum() or len(ext) > 5:
+        stem, dot, ext = segment, '', ''
+    m = _SEGMENT_RE.fullmatch(stem)
+    if m is None:
+        return None
+    return _SEGMENT_NAMES[m.lastgroup] + dot + ext
+
+
+class _Node:
+    __slots__ = ('children', 'literals', 'visits', 'collapsed', 'template')
+
+    def __init__(self):
+        self.children = {}      # segment or placeholder -> _Node
+        self.literals = 0       # literal (non-placeholder) children
+        self.visits = 0         # paths that continued below this node
+        self.collapsed = False  # too many literals seen here: every literal now goes to {var}
+        self.template = None    # _Template of paths ending here
+
+
+class _Template:
+    __slots__ = ('urls', 'params')
+
+    def __init__(self):
+        self.urls = 0
+        # param -> representative endpoints: the ``keep`` smallest, so the choice does not
+        # depend on URL order and stays the same from run to run (see --incremental)
+        self.params = {}
+
+    def add(self, endpoint, params, keep):
+        self.urls += 1
+        for param in params:
+            self._keep(self.params.setdefault(param, []), endpoint, keep)
+
+    def merge(self, other, keep):
+        self.urls += other.urls
+        for param, reps in other.params.items():
+            mine = self.params.setdefault(param, [])
+            for endpoint in reps:
+                self._keep(mine, endpoint, keep)
+
+    @staticmethod
+    def _keep(reps, endpoint, keep):
+        if len(reps) < keep:
+            if endpoint not in reps:
+                insort(reps, endpoint)
+        elif endpoint < reps[-1] and endpoint not in reps:
+            insort(reps, endpoint)
+            reps.pop()
+
+
+class _DistinctCount:
+    """Distinct items, exact up to ``k`` and estimated (k minimum values) beyond, in O(k) memory."""
+
+    def __init__(self, k=4096):
+        self.k = k
+        self.heap = []          # negated hashes: max-heap of the k smallest
+        self.members = set()
+
+    def add(self, item):
+        h = hash(item) & 0xFFFFFFFFFFFFFFFF   # per-process str hash; only needs to be uniform
+        if h in self.members:
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, -h)
+        elif h < -self.heap[0]:
+            self.members.discard(-heapq.heapreplace(self.heap, -h))
+        else:
+            return
+        self.members.add(h)
+
+    def estimate(self):
+        if len(self.heap) < self.k:
+            return len(self.heap)
+        return int((self.k - 1) * 2 ** 64 / -self.heap[0])
+
 
 class ParamExtractor:
-    def __init__(self, urls, scope_regex=None):
+    """Endpoints and their interesting params from the recon URL corpus.
+
+    With templating on (the default), paths are grouped into templates in
+    one streaming pass: segments that look like IDs, UUIDs, hashes, dates or
+    slugs become placeholders, and a path position that shows more than
+    ``max_literals`` distinct literal values is learned to be variable too
+    (``/shop/blue-shirt`` ... ``/shop/red-hat`` -> ``/shop/{var}``) as long
+    as new values keep turning up (at least ``literal_ratio`` of the paths
+    through that position brought a new one), so a few dozen busy top-level
+    directories stay apart. Only ``representatives`` endpoints are kept per
+    template and param, so
+    ``/product/123/view?id=1`` and a thousand siblings cost a few scan tasks
+    instead of a thousand. Memory grows with the number of templates, not
+    with the number of URLs.
+    """
+
+    def __init__(self, urls, scope=None, config=None):
+        config = config or {}
         self.urls = urls
-        self.scope_regex = scope_regex
+        # Accepts a compiled Scope or any scope config value (legacy regex string included)
+        self.scope = Scope.from_config(scope) if scope is not None else None
+        self.templating = config.get('templates', True)
+        self.keep = config.get('representatives', 3)
+        self.max_literals = config.get('max_literals', 50)
+        self.literal_ratio = config.get('literal_ratio', 0.1)
+        self.roots = {}         # scheme://netloc -> _Node
+        self._names = {}        # param name -> interesting by name alone
+        self.stats = {}
         self.junk_params = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'fbclid', 'gclid', '_ga', '_gl', 'mc_cid', 'mc_eid', '_bta_tid', '_bta_c', 'trk', 'trkCampaign', 'trkContent', 'trkInfo', 'trkPage', 'trkModule', 'trkModulePosition', 'trkReferer', 'trkSource', 'trkCampaignId', 'trkContentId', 'trkInfoId', 'trkModuleId', 'trkModulePositionId', 'trkRefererId', 'trkSourceId'}
 
     def extract(self):
+        if self.templating:
+            return self._extract_templates()
         endpoints = {}
         for url in self.urls:
-            if self.scope_regex and not re.match(self.scope_regex, url):
+            if self.scope and not self.scope.in_scope(url):
                 continue
             parsed = urlparse(url)
             query = parse_qs(parsed.query)
             path = parsed.scheme + "://" + parsed.netloc + parsed.path
-            solid_params = []
-            for param, values in query.items():
-                if param.lower() in self.junk_params:
-                    continue
-                # Keep params that look interesting
-                if self._is_interesting_param(param, values):
-                    solid_params.append(param)
+            solid_params = self._solid_params(query)
             if solid_params:
                 if path not in endpoints:
                     endpoints[path] = set()
@@ -31,6 +155,126 @@ class ParamExtractor:
             endpoints[path] = list(endpoints[path])
         return endpoints
 
+    def _solid_params(self, query):
+        solid_params = []
+        for param, values in query.items():
+            if param.lower() in self.junk_params:
+                continue
+            # Keep params that look interesting
+            by_name = self._names.get(param)
+            if by_name is None:
+                by_name = self._names[param] = self._is_interesting_param(param, ())
+            if by_name or self._is_interesting_param(param, values):
+                solid_params.append(param)
+        return solid_params
+
+    def _extract_templates(self):
+        seen = with_params = 0
+        pairs = _DistinctCount()
+        for url in self.urls:
+            seen += 1
+            if '?' not in url:
+                continue
+            if self.scope and not self.scope.in_scope(url):
+                continue
+            head, _, query = url.partition('#')[0].partition('?')
+            solid_params = self._solid_params(parse_qs(query))
+            if not solid_params:
+                continue
+            with_params += 1
+            scheme, _, rest = head.partition('://')
+            netloc, slash, path = rest.partition('/')
+            path = slash + path
+            # Scheme and host are case-insensitive: HTTPS://Example.com/x is the same template
+            userinfo, at, hostport = netloc.rpartition('@')
+            base = scheme.lower() + "://" + userinfo + at + hostport.lower()
+            endpoint = base + path
+            for param in solid_params:
+                pairs.add(endpoint + '\x00' + param)
+            node = self.roots.get(base)
+            if node is None:
+                node = self.roots[base] = _Node()
+            for segment in path.split('/')[1:]:
+                node = self._child(node, segment)
+            if node.template is None:
+                node.template = _Template()
+            node.template.add(endpoint, solid_params, self.keep)
+
+        endpoints = {}
+        templates = 0
+        for _, template in self.templates():
+            templates += 1
+            for param, reps in template.params.items():
+                for endpoint in reps:
+                    endpoints.setdefault(endpoint, []).append(param)
+        tasks = sum(map(len, endpoints.values()))
+        raw = pairs.estimate()
+        self.stats = {
+            'urls': seen, 'urls_with_params': with_params, 'templates': templates,
+            'raw_tasks': raw, 'tasks': tasks, 'endpoints': len(endpoints),
+            'reduction': raw / tasks if tasks else 1.0,
+        }
+        return endpoints
+
+    def _child(self, node, segment):
+        node.visits += 1
+        key = segment_type(segment)
+        if key is None:
+            if node.collapsed:
+                key = VAR
+            elif (segment not in node.children and node.literals >= self.max_literals
+                  and (node.literals >= self.literal_ratio * node.visits
+                       or node.literals >= self.max_literals * LITERAL_CAP)):
+                self._collapse(node)
+                key = VAR
+            else:
+                key = segment
+        child = node.children.get(key)
+        if child is None:
+            child = node.children[key] = _Node()
+            if not key.startswith('{'):
+                node.literals += 1
+        return child
+
+    def _collapse(self, node):
+        """Fold every literal child of ``node`` into its {var} child."""
+        node.collapsed = True
+        var = node.children.get(VAR)
+        if var is None:
+            var = node.children[VAR] = _Node()
+        for key in [k for k in node.children if not k.startswith('{')]:
+            self._merge(var, node.children.pop(key))
+        node.literals = 0
+
+    def _merge(self, dst, src):
+        dst.visits += src.visits
+        if src.template is not None:
+            if dst.template is None:
+                dst.template = src.template
+            else:
+                dst.template.merge(src.template, self.keep)
+        for key, child in src.children.items():
+            if dst.collapsed and not key.startswith('{'):
+                key = VAR
+            if key in dst.children:
+                self._merge(dst.children[key], child)
+            else:
+                dst.children[key] = child
+                if not key.startswith('{'):
+                    dst.literals += 1
+        if src.collapsed and not dst.collapsed:
+            self._collapse(dst)
+
+    def templates(self):
+        """``(template URL, _Template)`` for every learned template."""
+        stack = [(base, node) for base, node in self.roots.items()]
+        while stack:
+            prefix, node = stack.pop()
+            if node.template is not None:
+                yield prefix, node.template
+            for key, child in node.children.items():
+                stack.append((prefix + '/' + key, child))
+
     def _is_interesting_param(self, param, values):
         # Heuristics: check name and values
         interesting_keywords = ['id', 'file', 'redirect', 'url', 'page', 'path', 'doc', 'view', 'dir', 'show', 'cat', 'action', 'mode', 'type', 'name', 'user', 'profile', 'order', 'sort', 'filter', 'search', 'query', 'return', 'next', 'prev', 'refer', 'callback', 'data', 'json', 'xml', 'template', 'include', 'load', 'read', 'import', 'export', 'download', 'upload', 'img', 'image', 'icon', 'avatar', 'profile_pic', 'photo', 'picture', 'file_name', 'file_path']
@@ -1,25 +1,219 @@
-# Simple payload loader – you can expand this to read from files
-def get_sqli_payloads(category):
-    if category == 'time_based':
-        return [
-            "' OR SLEEP(5)--",
-            "'; WAITFOR DELAY '00:00:05'--",
-            "1 AND SLEEP(5)",
-            "1'; SELECT pg_sleep(5)--"
-        ]
-    elif category == 'error_based':
-        return [
-            "'",
-            "\"",
-            "1' AND 1=1--",
-            "1' AND 1=2--"
-        ]
-    return []
-
-def get_xss_payloads():
-    return [
-        "<script>alert(1)</script>",
-        "\"><script>alert(1)</script>",
-        "'><script>alert(1)</script>",
-        "<img src=x onerror=alert(1)>"
-    ]
+# Payload engine – tagged payload packs loaded lazily from disk.
+#
+# A pack is a file named after its family (sqli.tsv, xss.tsv, ...). Each
+# non-comment line is "<tags>\t<payload>", where tags are comma separated
+# key=value pairs (values may be '|' separated alternatives, or 'any').
+# Plain .txt wordlists are accepted too; every line is then an untagged
+# payload of the family named by the file stem.
+#
+# Packs are memory-mapped and only indexed the first time their family is
+# requested, so large wordlists cost nothing until they are used.
+import base64
+import html
+import mmap
+import os
+import re
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
+
+BUILTIN_DIR = Path(__file__).parent / 'data' / 'payloads'
+
+NUMERIC_PARAM_RE = re.compile(r'(^|_)(id|page|num|count|limit|offset|year|qty|amount|size|pid|uid)$', re.I)
+
+ENCODERS = {
+    'raw': lambda p: p,
+    'url': lambda p: quote(p, safe=''),
+    'double_url': lambda p: quote(quote(p, safe=''), safe=''),
+    'html': lambda p: html.escape(p, quote=True),
+    'base64': lambda p: base64.b64encode(p.encode()).decode(),
+}
+
+
+class PayloadPack:
+    """A single memory-mapped pack file with a lazily built tag index."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._mm = None
+        self._starts = None        # payload start offset per line
+        self._ends = None          # payload end offset per line
+        self._tagset_ids = None    # tagset id per line
+        self._tagsets = []         # interned {key: frozenset(values)} dicts
+
+    def __len__(self):
+        self._ensure_index()
+        return len(self._starts)
+
+    def _ensure_index(self):
+        if self._starts is not None:
+            return
+        self._starts, self._ends, self._tagset_ids = array('Q'), array('Q'), array('I')
+        if self.path.stat().st_size == 0:
+            return
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        tagged = self.path.suffix == '.tsv'
+        interned = {}
+        pos, size = 0, len(mm)
+        while pos < size:
+            end = mm.find(b'\n', pos)
+            if end == -1:
+                end = size
+            line_end = end - 1 if end > pos and mm[end - 1:end] == b'\r' else end
+            if line_end > pos and mm[pos:pos + 1] != b'#':
+                start, raw_tags = pos, b''
+                if tagged:
+                    tab = mm.find(b'\t', pos, line_end)
+                    if tab != -1:
+                        raw_tags, start = mm[pos:tab], tab + 1
+                if start < line_end:
+                    tagset_id = interned.get(raw_tags)
+                    if tagset_id is None:
+                        tagset_id = interned[raw_tags] = len(self._tagsets)
+                        self._tagsets.append(_parse_tags(raw_tags.decode()))
+                    self._starts.append(start)
+                    self._ends.append(line_end)
+                    self._tagset_ids.append(tagset_id)
+            pos = end + 1
+
+    def payload(self, i):
+        return self._mm[self._starts[i]:self._ends[i]].decode('utf-8', 'replace')
+
+    def matching(self, context):
+        """Yield (tags, payload) pairs compatible with ``context``, in file order."""
+        self._ensure_index()
+        ok = [_compatible(tags, context) for tags in self._tagsets]
+        for i, tagset_id in enumerate(self._tagset_ids):
+            if ok[tagset_id]:
+                yield self._tagsets[tagset_id], self.payload(i)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._starts = None
+
+
+def _parse_tags(raw):
+    tags = {}
+    for item in raw.split(','):
+        if '=' in item:
+            key, value = item.split('=', 1)
+            tags[key.strip()] = frozenset(v.strip().lower() for v in value.split('|'))
+    return tags
+
+
+def _compatible(tags, context):
+    for key, wanted in context.items():
+        if wanted is None or key not in tags or 'any' in tags[key]:
+            continue
+        wanted = {wanted} if isinstance(wanted, str) else set(wanted)
+        if not wanted:
+            continue
+        if not tags[key] & {w.lower() for w in wanted}:
+            return False
+    return True
+
+
+class PayloadCorpus:
+    """All payload packs from the built-in directory plus any extra ``dirs``.
+
+    Packs of the same family from several directories are concatenated,
+    built-in first.
+    """
+
+    def __init__(self, dirs=None):
+        self.packs = {}
+        for d in [BUILTIN_DIR] + [Path(os.path.expanduser(p)) for p in (dirs or [])]:
+            if not d.is_dir():
+                continue
+            for path in sorted(d.iterdir()):
+                if path.suffix in ('.tsv', '.txt'):
+                    self.packs.setdefault(path.stem, []).append(PayloadPack(path))
+        self._select = lru_cache(maxsize=1024)(self._select_uncached)
+
+    def select(self, family, limit=None, encoding='raw', first_per=None, **context):
+        """Return payloads of ``family`` that fit the target context.
+
+        Context keys are matched against pack tags (``technique``, ``dbms``,
+        ``ctx``, ...). Unknown (None) context values do not constrain the
+        selection. With ``first_per`` set to a tag key (or a tuple of keys),
+        only the highest-priority payload for each value (combination) of
+        that tag is kept, which is how an unknown DBMS is covered with one
+        probe per engine instead of every variant. Results are cached per
+        distinct context.
+        """
+        key = tuple(sorted((k, v if v is None or isinstance(v, str) else tuple(sorted(v)))
+                           for k, v in context.items()))
+        return self._select(family, key, limit, encoding, first_per)
+
+    def _select_uncached(self, family, context_key, limit, encoding, first_per):
+        context = dict(context_key)
+        out, seen, groups = [], set(), set()
+        for pack in self.packs.get(family, []):
+            for tags, payload in pack.matching(context):
+                if payload in seen:
+                    continue
+                if first_per:
+                    group = (tuple(tags.get(k) for k in first_per) if isinstance(first_per, tuple)
+                             else tags.get(first_per))
+                    if group in groups:
+                        continue
+                    groups.add(group)
+                seen.add(payload)
+                out.append(encode(payload, encoding))
+                if limit and len(out) >= limit:
+                    return tuple(out)
+        return tuple(out)
+
+
+@lru_cache(maxsize=65536)
+def encode(payload, encoding):
+    return ENCODERS[encoding](payload)
+
+
+def param_context(param, value=None):
+    """Guess the injection context ('numeric' or 'string') of a parameter."""
+    if value is not None:
+        return 'numeric' if value.lstrip('-').isdigit() else 'string'
+    if NUMERIC_PARAM_RE.search(param):
+        return 'numeric'
+    return None
+
+
+_corpus = None
+
+
+def configure(dirs=None):
+    global _corpus
+    _corpus = PayloadCorpus(dirs)
+    return _corpus
+
+
+def get_corpus():
+    if _corpus is None:
+        configure()
+    return _corpus
+
+
+def select_payloads(family, limit=None, encoding='raw', first_per=None, **context):
+    return list(get_corpus().select(family, limit=limit, encoding=encoding, first_per=first_per, **context))
+
+
+def get_sqli_payloads(category, dbms=None, ctx=None, limit=None):
+    # ``dbms`` is one known engine, a set of plausible ones, or None. Unless the
+    # engine is known, one probe per engine beats every variant of each; when the
+    # param type is unknown too, each engine keeps one probe per context, so
+    # numeric params not recognised by name still get '1 AND SLEEP(5)'.
+    if isinstance(dbms, str):
+        first_per = None
+    else:
+        first_per = 'dbms' if ctx else ('dbms', 'ctx')
+    return select_payloads('sqli', limit=limit, first_per=first_per, technique=category, dbms=dbms, ctx=ctx)
+
+
+def get_xss_payloads(ctx=None, limit=None):
+    return select_payloads('xss', limit=limit, ctx=ctx)
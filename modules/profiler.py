@@ -0,0 +1,326 @@
+import asyncio
+import contextvars
+import heapq
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+# (phase name, wall start, loop-thread CPU start) of the phase the current task runs in
+_phase = contextvars.ContextVar('omnihunter_phase', default=None)
+
+IDLE = '<idle>'
+NO_PHASE = '<none>'
+
+
+class TaskStats:
+    __slots__ = ('count', 'wall', 'cpu', 'max_wall', 'max_cpu', 'errors')
+
+    def __init__(self):
+        self.count = 0
+        self.wall = self.cpu = self.max_wall = self.max_cpu = 0.0
+        self.errors = 0
+
+    def add(self, wall, cpu, failed):
+        self.count += 1
+        self.wall += wall
+        self.cpu += cpu
+        self.max_wall = max(self.max_wall, wall)
+        self.max_cpu = max(self.max_cpu, cpu)
+        self.errors += failed
+
+
+class _Timed:
+    """Awaitable that drives ``coro`` step by step, charging loop CPU per step."""
+
+    __slots__ = ('coro', 'profiler', 'key', 'label')
+
+    def __init__(self, coro, profiler, key, label):
+        self.coro = coro
+        self.profiler = profiler
+        self.key = key
+        self.label = label
+
+    def __await__(self):
+        coro, clock = self.coro, time.thread_time
+        cpu, start = 0.0, time.perf_counter()
+        value, error, failed = None, None, False
+        try:
+            while True:
+                t = clock()
+                try:
+                    future = coro.send(value) if error is None else coro.throw(error)
+                except StopIteration as stop:
+                    return stop.value
+                except BaseException:
+                    failed = True
+                    raise
+                finally:
+                    cpu += clock() - t
+                try:
+                    value, error = (yield future), None
+                except BaseException as e:  # cancellation etc. goes into the coroutine
+                    value, error = None, e
+        finally:
+            self.profiler._task_done(self.key, self.label, time.perf_counter() - start, cpu, failed)
+
+
+class Profiler:
+    """Low-overhead asyncio profiler for ``--profile`` runs.
+
+    A sampler thread wakes every ``sample_interval`` seconds, records the
+    loop thread's Python stack (collapsed, per phase) and watches a
+    heartbeat the loop refreshes every ``heartbeat`` seconds: when the
+    heartbeat is late by more than ``lag_threshold`` a callback is blocking
+    the loop, and the stack it is stuck in is kept as a stall.
+
+    Phases are set with ``phase(name)`` from the coroutine that drives them;
+    tasks created afterwards inherit the phase through a context variable,
+    so samples and stalls are attributed even when phases of several
+    targets overlap. ``timed()`` wraps a coroutine to account its wall time
+    and the loop CPU it used.
+
+    A disabled Profiler costs nothing: ``phase()`` is a no-op and
+    ``timed()`` returns the coroutine unchanged.
+    """
+
+    def __init__(self, enabled=False, sample_interval=0.01, heartbeat=0.05, lag_threshold=0.1,
+                 max_stalls=20, slowest=10):
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        self.heartbeat = heartbeat
+        self.lag_threshold = lag_threshold
+        self.max_stalls = max_stalls
+        self.slowest_n = slowest
+        self.samples = Counter()            # (phase, collapsed stack) -> samples
+        self.phase_wall = Counter()
+        self.phase_cpu = Counter()
+        self.stalls = []                    # heap of (duration, seq, phase, stack)
+        self.stall_stacks = Counter()       # (phase, collapsed stack) -> stalls
+        self.lags = []                      # heartbeat lateness, seconds
+        self.tasks = defaultdict(TaskStats)
+        self.slowest = []                   # heap of (wall, seq, key, label, cpu)
+        self._seq = 0
+        self._loop = None
+        self._loop_thread = None
+        self._last_beat = 0.0
+        self._handle = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._stall = None                  # [duration, phase, stack] of the stall in progress
+        self._started = 0.0
+        self._previous_factory = None       # loop task factory to restore on stop()
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self):
+        """Start sampling the running loop (call from inside it)."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._started = time.perf_counter()
+        previous = self._previous_factory = self._loop.get_task_factory()
+
+        def task_factory(loop, coro, **kwargs):
+            # Tasks remember the phase they were created in
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            context = kwargs.get('context')
+            task._omh_phase = (context.get(_phase) if context is not None else _phase.get())
+            return task
+
+        self._loop.set_task_factory(task_factory)
+        self._last_beat = time.perf_counter()
+        self._beat()
+        self._thread = threading.Thread(target=self._sample_loop, name='omnihunter-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.set_task_factory(self._previous_factory)
+        self._finish_stall()
+
+    # -- phases and coroutine accounting -------------------------------------
+
+    def phase(self, name):
+        """Switch the calling task (and tasks it creates from now on) to phase ``name``."""
+        if not self.enabled:
+            return
+        now, cpu = time.perf_counter(), time.thread_time()
+        current = _phase.get()
+        if current is not None:
+            self.phase_wall[current[0]] += now - current[1]
+            self.phase_cpu[current[0]] += cpu - current[2]
+        _phase.set((name, now, cpu) if name is not None else None)
+        task = asyncio.current_task()
+        if task is not None:
+            task._omh_phase = _phase.get()
+
+    def timed(self, key, coro, label=None):
+        """Await ``coro`` accounting wall and loop-CPU time under ``key``."""
+        if not self.enabled:
+            return coro
+        return _Timed(coro, self, key, label)
+
+    def _task_done(self, key, label, wall, cpu, failed):
+        self.tasks[key].add(wall, cpu, failed)
+        if label is not None:
+            self._seq += 1
+            item = (wall, self._seq, key, label, cpu)
+            if len(self.slowest) < self.slowest_n:
+                heapq.heappush(self.slowest, item)
+            elif wall > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, item)
+
+    # -- watchdog ------------------------------------------------------------
+
+    def _beat(self):
+        now = time.perf_counter()
+        late = now - self._last_beat - self.heartbeat
+        self.lags.append(max(0.0, late))
+        if len(self.lags) > 100000:
+            # Keep memory flat on long runs: thin out the history
+            self.lags = self.lags[::2]
+        self._last_beat = now
+        self._handle = self._loop.call_later(self.heartbeat, self._beat)
+
+    def _sample_loop(self):
+        frames = sys._current_frames
+        while not self._stop.wait(self.sample_interval):
+            frame = frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            phase = self._current_phase()
+            stack = self._collapse(frame)
+            self.samples[(phase, stack)] += 1
+            stalled = time.perf_counter() - self._last_beat - self.heartbeat
+            if stalled > self.lag_threshold and stack != IDLE:
+                if self._stall is None:
+                    self._stall = [stalled, phase, self._format(frame)]
+                    self.stall_stacks[(phase, stack)] += 1
+                else:
+                    self._stall[0] = stalled
+            elif self._stall is not None:
+                self._finish_stall()
+            del frame
+
+    def _finish_stall(self):
+        if self._stall is None:
+            return
+        duration, phase, stack = self._stall
+        self._stall = None
+        self._seq += 1
+        item = (duration, self._seq, phase, stack)
+        if len(self.stalls) < self.max_stalls:
+            heapq.heappush(self.stalls, item)
+        elif duration > self.stalls[0][0]:
+            heapq.heapreplace(self.stalls, item)
+
+    def _current_phase(self):
+        # Read from the sampler thread: the loop's current task, if any
+        task = asyncio.tasks._current_tasks.get(self._loop)
+        phase = getattr(task, '_omh_phase', None) if task is not None else None
+        return phase[0] if phase else NO_PHASE
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)[:-3]}:{code.co_name}")
+            frame = frame.f_back
+        if names and names[0] == 'selectors:select':
+            return IDLE
+        return ';'.join(reversed(names))
+
+    @staticmethod
+    def _format(frame):
+        lines = []
+        while frame is not None:
+            code = frame.f_code
+            lines.append(f"  {code.co_filename}:{frame.f_lineno} in {code.co_name}")
+            frame = frame.f_back
+        return '\n'.join(reversed(lines))
+
+    # -- output ----------------------------------------------------------------
+
+    def folded(self):
+        """Collapsed stacks ("phase;frame;...;frame count") for flamegraph.pl / speedscope."""
+        for (phase, stack), n in sorted(self.samples.items()):
+            yield f"{phase};{stack} {n}"
+
+    def summary(self):
+        lines = []
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        lags = sorted(self.lags)
+        busy = Counter()
+        total = Counter()
+        for (phase, stack), n in self.samples.items():
+            total[phase] += n
+            if stack != IDLE:
+                busy[phase] += n
+        lines.append(f"OmniHunter profile: {elapsed:.1f}s wall, {sum(total.values())} samples "
+                     f"every {self.sample_interval * 1000:.0f} ms")
+        if lags:
+            lines.append(f"Event loop lag: p50 {_pct(lags, 50) * 1000:.1f} ms, p99 {_pct(lags, 99) * 1000:.1f} ms, "
+                         f"max {lags[-1] * 1000:.1f} ms; {len(self.stalls)} stalls over "
+                         f"{self.lag_threshold * 1000:.0f} ms kept")
+        lines.append('')
+        lines.append(f"{'phase':<24}{'wall s':>10}{'loop cpu s':>12}{'busy %':>9}")
+        for phase in sorted(set(self.phase_wall) | set(total), key=lambda p: -self.phase_wall.get(p, 0)):
+            share = 100 * busy[phase] / total[phase] if total[phase] else 0.0
+            lines.append(f"{phase:<24}{self.phase_wall.get(phase, 0):>10.2f}"
+                         f"{self.phase_cpu.get(phase, 0):>12.2f}{share:>9.1f}")
+        if self.tasks:
+            lines.append('')
+            lines.append(f"{'coroutine':<24}{'count':>8}{'wall s':>10}{'max s':>9}{'cpu s':>9}{'max cpu':>9}{'errors':>8}")
+            for key, st in sorted(self.tasks.items(), key=lambda kv: -kv[1].wall):
+                lines.append(f"{key:<24}{st.count:>8}{st.wall:>10.2f}{st.max_wall:>9.2f}"
+                             f"{st.cpu:>9.3f}{st.max_cpu:>9.3f}{st.errors:>8}")
+        if self.slowest:
+            lines.append('')
+            lines.append("Slowest tasks:")
+            for wall, _, key, label, cpu in sorted(self.slowest, reverse=True):
+                lines.append(f"  {wall:8.2f}s wall {cpu:7.3f}s cpu  {key} {label}")
+        if self.stalls:
+            lines.append('')
+            lines.append("Longest event loop stalls:")
+            for duration, _, phase, stack in sorted(self.stalls, reverse=True):
+                lines.append(f"- {duration * 1000:.0f} ms blocked in phase {phase}:")
+                lines.append(stack)
+        busiest = Counter({k: n for k, n in self.samples.items() if k[1] != IDLE}).most_common(10)
+        if busiest:
+            lines.append('')
+            lines.append("Hottest stacks (leaf frames):")
+            for (phase, stack), n in busiest:
+                leaf = ';'.join(stack.split(';')[-3:])
+                lines.append(f"  {n:6d}  [{phase}] {leaf}")
+        return lines
+
+    def write(self, directory):
+        """Write profile_summary.txt and profile.folded to ``directory``; returns their paths."""
+        paths = []
+        for name, lines in (('profile_summary.txt', self.summary()), ('profile.folded', self.folded())):
+            path = os.path.join(directory, name)
+            tmp = path + '.part'
+            with open(tmp, 'w') as f:
+                for line in lines:
+                    f.write(line + '\n')
+            os.replace(tmp, path)
+            paths.append(path)
+        return paths
+
+
+def _pct(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
@@ -1,8 +1,6 @@
-import aiohttp
 import asyncio
 import random
 from typing import List, Dict
-import requests
 from rich.console import Console
 
 console = Console()
@@ -24,6 +22,7 @@ class ProxyManager:
             'https://www.proxy-list.download/api/v1/get?type=http',
             'https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt'
         ]
+        import aiohttp
         all_proxies = []
         for src in sources:
             try:
@@ -49,6 +48,7 @@ class ProxyManager:
         console.log(f"[green]Proxy pool: {len(self.proxies)} working proxies[/]")
 
     async def _test_proxy(self, proxy):
+        import aiohttp
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(self.test_url, proxy=proxy['http'], timeout=5) as resp:
@@ -1,14 +1,49 @@
 import asyncio
+import json
 import subprocess
+from rich.console import Console
 from modules.anti_block import AntiBlock
 from modules.proxy_manager import ProxyManager
+from modules.dns_resolver import DNSResolver, HostFilter
+from modules.scope import Scope
 import re
 
+console = Console()
+
+
+async def read_lines(stream):
+    """Lines of an asyncio ``stream``; a line longer than the stream's limit is skipped whole.
+
+    (``async for line in stream`` raises ValueError on such a line and ends the loop.)
+    """
+    skipping = False
+    while True:
+        try:
+            line = await stream.readuntil(b'\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial and not skipping:
+                yield e.partial
+            return
+        except asyncio.LimitOverrunError as e:
+            # Drop what is buffered of the oversized line, then its tail up to the newline
+            await stream.readexactly(e.consumed)
+            if not skipping:
+                console.print("[yellow][!] Skipped an oversized output line[/]")
+            skipping = True
+            continue
+        if skipping:
+            skipping = False
+            continue
+        yield line
+
+
 class Recon:
-    def __init__(self, target, config):
+    def __init__(self, target, config, anti_block=None, scope=None):
         self.target = target
         self.config = config
-        self.anti_block = AntiBlock(proxy_manager=ProxyManager(use_free=config['proxy']['use_free']))
+        self.scope = scope or Scope.from_config(config.get('scope'), target)
+        # Share the caller's AntiBlock (and its proxy pool) when given
+        self.anti_block = anti_block or AntiBlock(proxy_manager=ProxyManager(use_free=config['proxy']['use_free']))
 
     async def get_subdomains(self):
         """Run multiple subdomain discovery tools and return unique subdomains."""
@@ -23,27 +58,73 @@ class Recon:
             stdout, _ = await proc.communicate()
             for line in stdout.decode().splitlines():
                 line = line.strip()
-                if line:
+                if line and self.scope.host_in_scope(line):
                     subs.add(line)
         return list(subs)
 
-    async def get_live_urls(self, subdomains):
-        """Use httpx to filter live hosts."""
+    async def get_live_urls(self, subdomains, on_record=None):
+        """Resolve and prune hosts, then stream the survivors through httpx.
+
+        ``on_record`` gets every in-scope httpx JSON record (status, server,
+        detected tech) for passive fingerprinting.
+        """
         if not subdomains:
             return []
-        input_data = "\n".join(subdomains).encode()
         proc = await asyncio.create_subprocess_shell(
-            f"httpx -silent -status-code -content-length -follow-redirects",
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            "httpx -silent -json -follow-redirects -td",
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            limit=1024 * 1024  # httpx JSON lines can be long
         )
-        stdout, _ = await proc.communicate(input=input_data)
+
+        async def feed():
+            # Hosts go to httpx as soon as they survive DNS, not after all resolve
+            try:
+                async for host in self.resolved_hosts(subdomains):
+                    proc.stdin.write(f"{host}\n".encode())
+                    await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                proc.stdin.close()
+
+        feeder = asyncio.create_task(feed())
         live = []
-        for line in stdout.decode().splitlines():
-            parts = line.split()
-            if parts:
-                live.append(parts[0])
+        async for line in read_lines(proc.stdout):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            if record.get('url') and self.scope.in_scope(record['url']):
+                live.append(record['url'])
+                if on_record is not None:
+                    on_record(record)
+        await feeder
+        await proc.wait()
         return live
 
+    async def resolved_hosts(self, subdomains):
+        """Yield subdomains that resolve and are not wildcard/duplicate answers."""
+        subdomains = self.scope.filter_hosts(subdomains)
+        dns_cfg = self.config.get('dns', {})
+        if not dns_cfg.get('enabled', True):
+            for sub in subdomains:
+                yield sub
+            return
+        resolver = DNSResolver(
+            nameservers=dns_cfg.get('nameservers') or None,
+            timeout=dns_cfg.get('timeout', 2),
+            concurrency=dns_cfg.get('concurrency', 200)
+        )
+        host_filter = HostFilter(resolver, self.target, max_per_answer=dns_cfg.get('max_hosts_per_answer', 10))
+        async for host in host_filter.filter(subdomains):
+            yield host
+        stats = host_filter.stats
+        console.print(f"[green][+] DNS: {stats['kept']}/{stats['input']} hosts kept "
+                      f"({stats['unresolved']} unresolved, {stats['wildcard']} wildcard, "
+                      f"{stats['collapsed']} duplicate answers) with {resolver.queries} queries[/]")
+
     async def gather_urls(self, live_urls):
         """Collect URLs from various sources."""
         urls = set()
@@ -85,4 +166,5 @@ class Recon:
                 if line.startswith("[url]") or line.startswith("[link]"):
                     u = line.split(' - ')[-1].strip()
                     urls.add(u)
-        return list(urls)
+        urls.discard('')
+        return self.scope.filter(urls)
@@ -0,0 +1,278 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+# Incremental-scan finding status -> SARIF result.baselineState
+SARIF_BASELINE = {'new': 'new', 'persisting': 'unchanged', 'fixed': 'absent'}
+
+
+class LineFormat:
+    """Plain one-record-per-line output (URL lists, endpoint lists)."""
+    suffix = '.txt'
+
+    def header(self, meta):
+        return ''
+
+    def record(self, item):
+        return f"{item}\n"
+
+    def footer(self, meta):
+        return ''
+
+
+class TextFormat(LineFormat):
+    suffix = '.txt'
+
+    def header(self, meta):
+        return (
+            f"OmniHunter Scan Results for {meta.get('target', '')}\n"
+            f"Date: {meta.get('started', datetime.now())}\n"
+            f"Platform: {meta.get('platform', 'unknown')}\n"
+            + "=" * 50 + "\n\n"
+        )
+
+    def record(self, finding):
+        return (
+            f"[{datetime.now()}] {finding['type']} - {finding['url']}\n"
+            f"Type: {finding['type']}\n"
+            f"URL: {finding['url']}\n"
+            f"Param: {finding.get('param', '')}\n"
+            f"Confidence: {finding.get('confidence', 'N/A')}%\n"
+            f"Verified: {finding.get('verified', False)}\n"
+            + (f"Status: {finding['status']}\n" if finding.get('status') else "")
+            + "-" * 30 + "\n"
+        )
+
+
+class JSONLFormat(LineFormat):
+    suffix = '.jsonl'
+
+    def record(self, finding):
+        return json.dumps(finding, default=str) + "\n"
+
+
+class CSVFormat(LineFormat):
+    suffix = '.csv'
+    fields = ['timestamp', 'type', 'url', 'param', 'confidence', 'verified', 'platform', 'status', 'details']
+
+    def header(self, meta):
+        return self._row(self.fields)
+
+    def record(self, finding):
+        row = dict(finding, timestamp=datetime.now().isoformat())
+        return self._row([str(row.get(f, '')) for f in self.fields])
+
+    def _row(self, values):
+        buf = io.StringIO()
+        csv.writer(buf).writerow(values)
+        return buf.getvalue()
+
+
+class SARIFFormat(LineFormat):
+    """SARIF 2.1.0, streamed as one result object per line inside the results array."""
+    suffix = '.sarif'
+
+    def __init__(self):
+        self._first = True
+
+    def header(self, meta):
+        self._first = True
+        head = json.dumps({
+            "version": "2.1.0",
+            "$schema": SARIF_SCHEMA,
+            "runs": [{
+                "tool": {"driver": {"name": "OmniHunter", "informationUri": "https://github.com/0xbashar/recon"}},
+                "properties": {"target": meta.get('target', ''), "platform": meta.get('platform', 'unknown')},
+                "results": [],
+            }],
+        })
+        # Cut the document open right inside the empty results array
+        return head[:head.rindex('[]') + 1] + "\n"
+
+    def record(self, finding):
+        result = {
+            "ruleId": finding['type'],
+            "level": "error" if finding.get('verified') else "warning",
+            "message": {"text": f"{finding['type']} via parameter '{finding.get('param', '')}'"},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": finding['url']}}}],
+            "properties": {
+                "confidence": finding.get('confidence'),
+                "param": finding.get('param', ''),
+                "details": finding.get('details', ''),
+            },
+        }
+        if finding.get('status') in SARIF_BASELINE:
+            result["baselineState"] = SARIF_BASELINE[finding['status']]
+            if finding['status'] == 'fixed':
+                result["level"] = "none"
+        sep = "" if self._first else ","
+        self._first = False
+        return sep + json.dumps(result, default=str) + "\n"
+
+    def footer(self, meta):
+        return "]}]}\n"
+
+
+FORMATS = {
+    'text': TextFormat,
+    'jsonl': JSONLFormat,
+    'csv': CSVFormat,
+    'sarif': SARIFFormat,
+}
+
+
+class ReportWriter:
+    """Buffered writer for a single report file.
+
+    Records are rendered into an in-memory buffer and handed to a dedicated
+    writer thread in chunks, so the event loop never blocks on disk I/O. Data
+    goes to ``<path>.part`` (each handed-off chunk reaches the OS at once, so
+    a crash of the process loses only what is still buffered) and is fsynced
+    every ``fsync_interval`` seconds; ``close`` writes the footer and
+    atomically renames it over ``path``, so the final report is either
+    complete or absent.
+    """
+
+    def __init__(self, path, fmt, meta=None, buffer_size=500, fsync_interval=5.0):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + '.part')
+        self.fmt = fmt
+        self.meta = meta or {}
+        self.buffer_size = buffer_size
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._buffer = []
+        self._fh = None
+        self._last_sync = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report')
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.tmp_path, 'w', encoding='utf-8')
+        self._buffer.append(self.fmt.header(self.meta))
+        return self
+
+    async def write(self, record):
+        self._buffer.append(self.fmt.record(record))
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size or self._sync_due():
+            await self.flush()
+
+    async def write_many(self, records):
+        for record in records:
+            await self.write(record)
+
+    async def flush(self):
+        chunk, fsync = self._take_chunk()
+        if chunk or fsync:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._write_chunk, chunk, fsync)
+
+    async def close(self):
+        if self._fh is None:
+            return
+        self._buffer.append(self.fmt.footer(self.meta))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._finalize, ''.join(self._buffer))
+        self._buffer = []
+        self._executor.shutdown(wait=True)
+
+    def close_sync(self):
+        """Finish the report from outside the event loop (e.g. after Ctrl+C)."""
+        if self._fh is None:
+            return
+        self._executor.shutdown(wait=True)
+        self._buffer.append(self.fmt.footer(self.meta))
+        self._finalize(''.join(self._buffer))
+        self._buffer = []
+
+    def _sync_due(self):
+        return time.monotonic() - self._last_sync >= self.fsync_interval
+
+    def _take_chunk(self):
+        chunk = ''.join(self._buffer)
+        self._buffer = []
+        fsync = self._sync_due()
+        if fsync:
+            self._last_sync = time.monotonic()
+        return chunk, fsync
+
+    def _write_chunk(self, chunk, fsync):
+        if chunk:
+            self._fh.write(chunk)
+            # In the OS page cache now: survives the process dying, fsync covers the machine
+            self._fh.flush()
+        if fsync:
+            os.fsync(self._fh.fileno())
+
+    def _finalize(self, tail):
+        fh, self._fh = self._fh, None
+        fh.write(tail)
+        fh.flush()
+        os.fsync(fh.fileno())
+        fh.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class ReportManager:
+    """Fan findings out to every configured report format.
+
+    ``report`` config keys: ``formats`` (subset of text/jsonl/csv/sarif),
+    ``buffer_size`` and ``fsync_interval``. Every format is written next to
+    ``output_file`` with its own suffix (``-o results.jsonl`` gives
+    ``results.txt``, ``results.jsonl``, ...), so no two writers share a file.
+    """
+
+    def __init__(self, output_file, config=None, meta=None):
+        config = config or {}
+        self.output_file = Path(output_file)
+        self.formats = config.get('formats', ['text', 'jsonl'])
+        self.buffer_size = config.get('buffer_size', 500)
+        self.fsync_interval = config.get('fsync_interval', 5.0)
+        self.meta = meta or {}
+        self.writers = []
+
+    def paths(self):
+        """Final path of each format: ``output_file``'s stem plus the format's suffix."""
+        return {name: self.output_file.with_suffix(FORMATS[name].suffix) for name in dict.fromkeys(self.formats)}
+
+    def open(self):
+        self.meta.setdefault('started', datetime.now())
+        for name, path in self.paths().items():
+            self.writers.append(self._writer(path, FORMATS[name]()).open())
+        return self
+
+    async def add_finding(self, finding):
+        # Findings are rare and must not sit in a buffer until the next one: hand each
+        # to the writer threads at once
+        for writer in self.writers:
+            await writer.write(finding)
+            await writer.flush()
+
+    async def write_lines(self, path, lines):
+        """Stream a plain list (URLs, endpoints) to its own atomically replaced file."""
+        for name, report_path in self.paths().items():
+            if Path(path).resolve() == report_path.resolve():
+                raise ValueError(f"{path} is also the {name} report; choose another output file name")
+        writer = self._writer(path, LineFormat()).open()
+        await writer.write_many(lines)
+        await writer.close()
+        return writer.count
+
+    async def close(self):
+        for writer in self.writers:
+            await writer.close()
+
+    def close_sync(self):
+        for writer in self.writers:
+            writer.close_sync()
+
+    def _writer(self, path, fmt):
+        return ReportWriter(path, fmt, self.meta, buffer_size=self.buffer_size, fsync_interval=self.fsync_interval)
@@ -6,15 +6,18 @@ Each scanner module exports an async 'scan' function that takes:
     endpoint: str - The URL to test
     param: str - The parameter name to fuzz
     anti_block: AntiBlock - For rate limiting and proxy rotation
-    **kwargs - Additional scanner-specific arguments
+    **kwargs - Additional scanner-specific arguments; request-based scanners
+               send through kwargs['http'] (a shared HttpClient)
 
 Returns a dict with finding details or None.
+
+Packed scanners (``*_packed``) take a list of params instead of one and
+return a list of findings; they test all params of an endpoint per request.
 """
 
-from .sqli import scan as sqli
+from .sqli import scan as sqli, scan_packed as sqli_packed
 from .xss import scan as xss
 from .ssrf import scan as ssrf
-from .idor import scan as idor
 from .business_logic import scan as business_logic
 
-__all__ = ['sqli', 'xss', 'ssrf', 'idor', 'business_logic']
+__all__ = ['sqli', 'sqli_packed', 'xss', 'ssrf', 'business_logic']
@@ -1,6 +1,3 @@
-import asyncio
-import aiohttp
-
 async def scan(endpoint, param, anti_block, anomaly, **kwargs):
     """Use anomaly detector to find business logic flaws."""
     # This scanner is called after baseline collection.
@@ -10,12 +7,10 @@ async def scan(endpoint, param, anti_block, anomaly, **kwargs):
     # For simplicity, assume param takes numeric values; we'll try +1
     test_url = base_url + f"{param}=999999"  # Arbitrary change
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(test_url, headers=anti_block.get_headers(), proxy=anti_block.get_proxy()) as resp:
-                text = await resp.text()
-                is_anomaly, reasons = anomaly.detect(endpoint, 'GET', param, resp, text)
-                if is_anomaly:
-                    return {'url': test_url, 'param': param, 'type': 'Business Logic', 'details': reasons, 'confidence': 50}
+        resp = await kwargs['http'].get(test_url)
+        is_anomaly, reasons = anomaly.detect(endpoint, 'GET', param, resp, resp.text)
+        if is_anomaly:
+            return {'url': test_url, 'param': param, 'type': 'Business Logic', 'details': reasons, 'confidence': 50}
     except:
         pass
     return None
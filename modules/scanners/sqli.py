@@ -1,27 +1,135 @@
-import asyncio
-import aiohttp
-import re
-from modules.payloads import get_sqli_payloads
+from modules.payloads import get_sqli_payloads, param_context
+from modules.packed import PackedProber, build_url
+from modules.signatures import get_library, sql_errors
+
+TIME_THRESHOLD = 5
+
+def _error_finding(url, param, hit, details=None):
+    return {
+        'url': url, 'param': param, 'type': 'SQLi (error)', 'confidence': 80, 'tech': hit.tech,
+        'details': f"{hit.tech} error: {hit.text}" + (f" ({details})" if details else '')
+    }
+
+def _observe(hints, url, matches):
+    """Map streamed matches to signature hits and feed them to the run's tech hints."""
+    hits = get_library().hits(matches)
+    if hints is not None:
+        hints.record(url, hits)
+    return hits
 
 async def scan(endpoint, param, anti_block, **kwargs):
-    """Lightweight SQLi detection with time/error based payloads."""
-    payloads = get_sqli_payloads('time_based')  # Load from payloads module
-    base_url = endpoint + ('' if '?' in endpoint else '?')
-    for payload in payloads:
-        test_url = f"{base_url}{param}={payload}"
+    """Lightweight SQLi detection with error and time based payloads.
+
+    Every response is matched against the error signature library while it
+    streams; DBMS errors not already present on the baseline are findings,
+    and whatever technology the errors reveal narrows the time-based
+    payloads that follow.
+    """
+    http = kwargs['http']
+    hints = kwargs.get('hints')
+    ignore = hints.baseline_ids(endpoint) if hints is not None else ()
+    lib = get_library()
+    ctx = param_context(param)
+
+    for payload in get_sqli_payloads('error_based', dbms=kwargs.get('dbms'), ctx=ctx):
+        test_url = build_url(endpoint, {param: payload})
         try:
-            async with aiohttp.ClientSession() as session:
-                start = asyncio.get_event_loop().time()
-                async with session.get(test_url, headers=anti_block.get_headers(), proxy=anti_block.get_proxy(), timeout=10) as resp:
-                    text = await resp.text()
-                elapsed = asyncio.get_event_loop().time() - start
-                # Time-based detection
-                if elapsed > 5:
-                    return {'url': test_url, 'param': param, 'type': 'SQLi (time-based)', 'confidence': 70}
-                # Error-based detection
-                if re.search(r"SQL syntax|mysql_fetch|ORA-[0-9]{5}|PostgreSQL.*ERROR|Microsoft OLE DB", text, re.I):
-                    return {'url': test_url, 'param': param, 'type': 'SQLi (error)', 'confidence': 80}
-        except:
-            pass
+            resp = await http.get(test_url, timeout=10, match=lib.pattern)
+        except Exception:
+            continue
+        errors = sql_errors(_observe(hints, endpoint, resp.matches), ignore)
+        if errors:
+            return _error_finding(test_url, param, errors[0])
+        await anti_block.delay()
+
+    # Only payloads matching the param type and the known (or plausible) DBMS
+    dbms = (hints.dbms(endpoint) if hints is not None else None) or kwargs.get('dbms')
+    for payload in get_sqli_payloads('time_based', dbms=dbms, ctx=ctx):
+        test_url = build_url(endpoint, {param: payload})
+        try:
+            # Reading stops at the first SQL error signature (unless the baseline already has one)
+            resp = await http.get(test_url, timeout=10, match=lib.sql_pattern, stop_on_match=not ignore)
+        except Exception:
+            continue
+        if resp.elapsed > TIME_THRESHOLD:
+            return {'url': test_url, 'param': param, 'type': 'SQLi (time-based)', 'confidence': 70}
+        errors = sql_errors(_observe(hints, endpoint, resp.matches), ignore)
+        if errors:
+            return _error_finding(test_url, param, errors[0])
         await anti_block.delay()
     return None
+
+def _rounds(params, technique, dbms):
+    """Per-param payload lists zipped into rounds: round i sends each param its i-th payload."""
+    per_param = {p: get_sqli_payloads(technique, dbms=dbms, ctx=param_context(p)) for p in params}
+    depth = max((len(v) for v in per_param.values()), default=0)
+    for i in range(depth):
+        yield {p: v[i] for p, v in per_param.items() if i < len(v)}
+
+async def scan_packed(endpoint, params, anti_block, **kwargs):
+    """Packed SQLi probing: all params of an endpoint share each request.
+
+    Error-based rounds tag every param so a DB error that echoes input is
+    attributed directly; time-based rounds (and errors without an echoed
+    tag) are bisected over the param set. Returns a list of findings.
+    """
+    prober = PackedProber(kwargs['http'])
+    hints = kwargs.get('hints')
+    ignore = hints.baseline_ids(endpoint) if hints is not None else ()
+    lib = get_library()
+    dbms = kwargs.get('dbms')
+    findings, hit = [], set()
+
+    def finding(param, payload, vtype, confidence, error=None):
+        hit.add(param)
+        url = build_url(endpoint, {param: payload})
+        if error is not None:
+            findings.append(_error_finding(url, param, error, 'packed probe'))
+        else:
+            findings.append({'url': url, 'param': param, 'type': vtype,
+                             'confidence': confidence, 'details': 'packed probe'})
+
+    for payloads in _rounds(params, 'error_based', dbms):
+        payloads = {p: v for p, v in payloads.items() if p not in hit}
+        if not payloads:
+            continue
+        try:
+            result = await prober.probe(endpoint, payloads, match=lib.pattern)
+        except Exception:
+            continue
+        errors = sql_errors(_observe(hints, endpoint, result.response.matches), ignore)
+        if errors:
+            culprits = result.tags_near(errors[0].start, errors[0].end)
+            if not culprits:
+                async def erroring(subset, payloads=payloads):
+                    try:
+                        r = await prober.probe(endpoint, {p: payloads[p] for p in subset},
+                                               match=lib.sql_pattern, stop_on_match=not ignore)
+                    except Exception:
+                        return False
+                    return bool(sql_errors(lib.hits(r.response.matches), ignore))
+                culprits = await prober.bisect(list(payloads), erroring)
+            for param in culprits:
+                finding(param, payloads[param], 'SQLi (error)', 80, errors[0])
+        await anti_block.delay()
+
+    # Errors seen so far may have revealed the DBMS
+    dbms = (hints.dbms(endpoint) if hints is not None else None) or dbms
+    for payloads in _rounds(params, 'time_based', dbms):
+        payloads = {p: v for p, v in payloads.items() if p not in hit}
+        if not payloads:
+            continue
+
+        async def delayed(subset, payloads=payloads):
+            try:
+                r = await prober.probe(endpoint, {p: payloads[p] for p in subset}, tagged=False, timeout=10)
+            except Exception:
+                return False
+            return r.response.elapsed > TIME_THRESHOLD
+
+        if await delayed(list(payloads)):
+            for param in await prober.bisect(list(payloads), delayed):
+                finding(param, payloads[param], 'SQLi (time-based)', 70)
+        await anti_block.delay()
+
+    return findings
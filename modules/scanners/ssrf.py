@@ -1,6 +1,5 @@
 import asyncio
 import uuid
-import aiohttp
 from modules.interactsh import Interactsh
 
 async def scan(endpoint, param, anti_block, **kwargs):
@@ -11,8 +10,7 @@ async def scan(endpoint, param, anti_block, **kwargs):
     base_url = endpoint + ('' if '?' in endpoint else '?')
     test_url = f"{base_url}{param}={callback_url}"
     try:
-        async with aiohttp.ClientSession() as session:
-            await session.get(test_url, headers=anti_block.get_headers(), proxy=anti_block.get_proxy(), timeout=5)
+        await kwargs['http'].get(test_url, timeout=5)
     except:
         pass
     await asyncio.sleep(5)  # Wait for potential callback
@@ -0,0 +1,190 @@
+import ipaddress
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+
+class OutOfScopeError(Exception):
+    """Raised when a request targets a URL outside the program scope."""
+
+
+class _Node:
+    __slots__ = ('children', 'exact', 'wildcard')
+
+    def __init__(self):
+        self.children = {}
+        self.exact = None     # None: no rule; []: whole host; [paths]: path prefixes
+        self.wildcard = None  # same, for any subdomain below this node
+
+
+def _merge(current, paths):
+    if current == [] or paths is None:
+        return []
+    return (current or []) + paths
+
+
+def _path_match(path, prefixes):
+    """Whether ``path`` is one of ``prefixes`` or below one ('/v2' covers '/v2/x', not '/v2x')."""
+    return any(path == p or path.startswith(p + '/') for p in prefixes)
+
+
+class _RuleSet:
+    """One side (include or exclude) of a scope: host trie, CIDRs and regexes."""
+
+    def __init__(self, rules):
+        self.root = _Node()
+        self.networks = []
+        regexes = []
+        self.count = 0
+        for rule in rules:
+            rule = str(rule).strip()
+            if not rule:
+                continue
+            self.count += 1
+            if rule.startswith('re:'):
+                regexes.append(rule[3:])
+            elif len(rule) > 2 and rule.startswith('/') and rule.endswith('/'):
+                regexes.append(rule[1:-1])
+            else:
+                self._add(rule)
+        # All regex rules are matched in one pass through a single alternation
+        self.regex = re.compile('|'.join(f'(?:{r})' for r in regexes), re.I) if regexes else None
+
+    def _add(self, rule):
+        if '://' in rule:
+            rule = rule.split('://', 1)[1]
+        try:
+            self.networks.append(ipaddress.ip_network(rule, strict=False))
+            return
+        except ValueError:
+            pass
+        host, _, path = rule.partition('/')
+        host = host.lower().rstrip('.').split(':')[0]
+        # Stored without the trailing slash; see _path_match
+        paths = ['/' + path.rstrip('/')] if path.strip('/') else None
+        wildcard = host.startswith('*.')
+        if wildcard:
+            host = host[2:]
+        node = self.root
+        for label in reversed(host.split('.')):
+            node = node.children.setdefault(label, _Node())
+        if wildcard:
+            node.wildcard = _merge(node.wildcard, paths)
+        else:
+            node.exact = _merge(node.exact, paths)
+
+    def host_paths(self, host):
+        """Path restrictions for ``host``: None (no match), [] (any path) or prefixes."""
+        labels = host.split('.')
+        node, result = self.root, None
+        for i, label in enumerate(reversed(labels)):
+            node = node.children.get(label)
+            if node is None:
+                return result
+            if node.wildcard is not None and i < len(labels) - 1:
+                result = node.wildcard if result is None else _merge(result, node.wildcard)
+        if node.exact is not None:
+            result = node.exact if result is None else _merge(result, node.exact)
+        return result
+
+    def ip_match(self, host):
+        if not self.networks:
+            return False
+        try:
+            ip = ipaddress.ip_address(host.strip('[]'))
+        except ValueError:
+            return False
+        return any(ip in net for net in self.networks)
+
+
+class Scope:
+    """Compiled program scope.
+
+    Rules are strings: ``example.com`` (exact host), ``*.example.com``
+    (any subdomain, not the apex), ``example.com/api`` or
+    ``*.example.com/v2`` (path prefix), ``10.0.0.0/8`` (CIDR or single IP)
+    and ``re:<regex>`` or ``/<regex>/`` (matched against the full URL).
+    Host rules live in a reversed-label trie and all regexes are joined into
+    one pattern, so a decision is a handful of dict lookups plus at most one
+    regex search; per-host results are cached.
+    """
+
+    def __init__(self, include=None, exclude=None):
+        self.include = _RuleSet(include or [])
+        self.exclude = _RuleSet(exclude or [])
+        self.rejected = 0
+        self._host = lru_cache(maxsize=65536)(self._host_decision)
+
+    @classmethod
+    def from_config(cls, scope, target=None):
+        """Build from the ``scope`` config value (dict, list or legacy regex string)."""
+        if isinstance(scope, Scope):
+            return scope
+        if isinstance(scope, str):
+            return cls(include=[f're:{scope}'])
+        if isinstance(scope, (list, tuple)):
+            return cls(include=scope)
+        if isinstance(scope, dict) and (scope.get('include') or scope.get('exclude')):
+            include = scope.get('include') or ([target, f'*.{target}'] if target else [])
+            return cls(include=include, exclude=scope.get('exclude'))
+        # Nothing configured: the target and its subdomains
+        return cls(include=[target, f'*.{target}'] if target else [])
+
+    def _host_decision(self, host):
+        """(include path restrictions, exclude path restrictions) for a host; None = no rule."""
+        inc = self.include.host_paths(host)
+        if inc is None and self.include.ip_match(host):
+            inc = []
+        exc = self.exclude.host_paths(host)
+        if exc is None and self.exclude.ip_match(host):
+            exc = []
+        return inc, exc
+
+    def in_scope(self, url):
+        if '://' not in url:
+            url = 'http://' + url
+        try:
+            parts = urlsplit(url)
+            host = (parts.hostname or '').lower().rstrip('.')
+        except ValueError:
+            self.rejected += 1
+            return False
+        inc, exc = self._host(host)
+        path = parts.path or '/'
+        ok = inc is not None and (not inc or _path_match(path, inc))
+        if not ok:
+            if self.include.regex is not None and self.include.regex.search(url):
+                ok = True
+            elif self.include.count == 0:
+                ok = True
+        if ok and exc is not None and (not exc or _path_match(path, exc)):
+            ok = False
+        if ok and self.exclude.regex is not None and self.exclude.regex.search(url):
+            ok = False
+        if not ok:
+            self.rejected += 1
+        return ok
+
+    def host_in_scope(self, host):
+        """Whether any URL on ``host`` can be in scope (used before crawling)."""
+        host = host.strip().lower()
+        if '://' in host:
+            host = urlsplit(host).hostname or ''
+        host = host.rstrip('.')
+        inc, exc = self._host(host)
+        ok = inc is not None or self.include.count == 0
+        if not ok and self.include.regex is not None:
+            ok = any(self.include.regex.search(f'{s}://{host}/') for s in ('https', 'http'))
+        if ok and exc == []:
+            ok = False
+        if ok and self.exclude.regex is not None and self.exclude.regex.search(f'https://{host}/'):
+            ok = False
+        if not ok:
+            self.rejected += 1
+        return ok
+
+    def filter(self, urls):
+        return [u for u in urls if self.in_scope(u)]
+
+    def filter_hosts(self, hosts):
+        return [h for h in hosts if self.host_in_scope(h)]
@@ -0,0 +1,143 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from rich.console import Console
+from modules.proxy_manager import ProxyManager
+from modules.anti_block import AntiBlock
+from modules.http_client import HttpClient
+from modules.circuit import CircuitBreaker
+from modules.body import DEFAULT_MAX_BYTES, DEFAULT_DECODE_TYPES
+from modules.update import UpdateManager
+from modules.profiler import Profiler
+
+console = Console()
+
+
+class FairScheduler:
+    """Round-robin scan slots across targets.
+
+    At most ``capacity`` tasks run at once over all targets. When slots are
+    contended, waiting targets are served in turn, one task each, so a
+    target with a huge queue cannot starve the others.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.in_use = 0
+        self._waiters = OrderedDict()  # target -> deque of futures
+
+    @asynccontextmanager
+    async def slot(self, target):
+        await self.acquire(target)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, target):
+        if self.in_use < self.capacity and not self._waiters:
+            self.in_use += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(target, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was granted just before the cancellation landed
+                self.release()
+            raise
+
+    def release(self):
+        self.in_use -= 1
+        self._wake()
+
+    def waiting(self):
+        """Tasks queued for a slot (of any target)."""
+        return sum(len(queue) for queue in self._waiters.values())
+
+    def _wake(self):
+        while self.in_use < self.capacity and self._waiters:
+            target, queue = next(iter(self._waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(target)
+            else:
+                del self._waiters[target]
+            if fut.done():
+                continue
+            self.in_use += 1
+            fut.set_result(None)
+
+
+def max_scan_workers(config):
+    """Most scan workers one target may run: the autoscaler's ceiling, or the fixed pool size."""
+    autoscale = config.get('autoscale') or {}
+    if autoscale.get('enabled', True):
+        return max(autoscale.get('max_workers', 50), autoscale.get('min_workers', 2))
+    return config.get('concurrency', 10)
+
+
+class SharedContext:
+    """Resources shared by every target scanned in this process.
+
+    One proxy pool, AntiBlock, HTTP client (connection pool + per-host rate
+    limiter and circuit breaker), tool health check, scan scheduler and
+    profiler. A single-target run
+    builds its own; batch mode builds one and hands it to every OmniHunter.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.proxy_manager = ProxyManager(use_free=config.get('proxy', {}).get('use_free', True))
+        self.anti_block = AntiBlock(proxy_manager=self.proxy_manager)
+        http_cfg = config.get('http', {})
+        self.breaker = CircuitBreaker(config.get('circuit'))
+        self.http = HttpClient(
+            self.anti_block,
+            timeout=http_cfg.get('timeout', 10),
+            rate_limit=config.get('rate_limit', {}).get('per_host'),
+            max_body=http_cfg.get('max_body_bytes', DEFAULT_MAX_BYTES),
+            decode_types=http_cfg.get('decode_types', DEFAULT_DECODE_TYPES),
+            breaker=self.breaker
+        )
+        tools_cfg = config.get('tools', {})
+        self.update_mgr = UpdateManager(
+            config.get('tools_path', '/usr/local/bin'),
+            cache_ttl=tools_cfg.get('cache_ttl', 86400),
+            probe_timeout=tools_cfg.get('probe_timeout', 10)
+        )
+        self.scheduler = FairScheduler(config.get('total_concurrency') or max_scan_workers(config))
+        profile_cfg = config.get('profile', {})
+        self.profiler = Profiler(
+            enabled=profile_cfg.get('enabled', False),
+            sample_interval=profile_cfg.get('sample_interval', 0.01),
+            heartbeat=profile_cfg.get('heartbeat', 0.05),
+            lag_threshold=profile_cfg.get('lag_threshold', 0.1)
+        )
+        self._tools_checked = None
+
+    async def check_tools(self, update_now=False):
+        """Check tools once per process; later callers await the same result."""
+        if self._tools_checked is None:
+            self._tools_checked = asyncio.ensure_future(self._check_tools(update_now))
+        return await self._tools_checked
+
+    async def _check_tools(self, update_now):
+        console.print("[bold yellow][*] Checking tools...[/]")
+        await self.update_mgr.check_all()
+        missing = self.update_mgr.missing()
+        if missing:
+            console.print(f"[yellow][!] Missing or broken tools: {', '.join(missing)}[/]")
+            if update_now or self.config.get('update_on_start', True):
+                # Awaited here, before recon: a background install would be cut
+                # off when the run ends and could replace binaries recon runs
+                await self.update_mgr.update_missing()
+                if self.update_mgr.missing():
+                    console.print(f"[yellow][!] Still unavailable: {', '.join(self.update_mgr.missing())}[/]")
+            else:
+                console.print("[yellow][*] Run with --update-tools to install them[/]")
+        return self.update_mgr.status
+
+    async def close(self):
+        await self.http.close()
@@ -0,0 +1,294 @@
+# Error signature library – DBMS, framework and stack-trace errors.
+#
+# Signatures live in versioned packs (modules/data/signatures/*.tsv, same
+# "<tags>\t<regex>" layout as the payload packs) and are compiled once into
+# a SignatureMatcher, so a response body is scanned in one pass whatever
+# the number of signatures. Each signature carries the technology it
+# reveals: dbms hits are SQL injection evidence, every hit is a tech hint.
+# Signatures tagged ``in=header:<name>``, ``in=cookie`` or ``in=url`` are
+# passive fingerprint rules for headers, cookie names and URL paths
+# (see modules/fingerprint.py); everything else is matched against bodies.
+import re
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from pathlib import Path
+
+try:
+    from re import _parser
+except ImportError:  # Python < 3.11
+    import sre_parse as _parser
+
+_LITERAL = _parser.LITERAL
+
+BUILTIN_DIR = Path(__file__).parent / 'data' / 'signatures'
+
+VERSION_RE = re.compile(r'#\s*version:\s*(\S+)')
+
+# Shortest literal worth using as a prefilter key
+MIN_ANCHOR = 3
+
+# Separator for batch scans; hits spanning it are re-checked per body
+_BATCH_SEP = '\x00'
+
+
+class Signature:
+    __slots__ = ('id', 'tech', 'kind', 'regex', 'source', 'where')
+
+    def __init__(self, id, tech, kind, regex, source, where='body'):
+        self.id = id
+        self.tech = tech
+        self.kind = kind
+        self.regex = regex
+        self.source = source
+        self.where = where
+
+    def __repr__(self):
+        return f"Signature({self.id}, {self.tech}/{self.kind}, {self.regex!r})"
+
+
+class Hit:
+    __slots__ = ('signature', 'start', 'end', 'text')
+
+    def __init__(self, signature, start, end, text):
+        self.signature = signature
+        self.start = start
+        self.end = end
+        self.text = text
+
+    @property
+    def tech(self):
+        return self.signature.tech
+
+    @property
+    def kind(self):
+        return self.signature.kind
+
+
+class SignatureMatcher:
+    """Many signatures applied in one scan of a body.
+
+    A single regex alternation of a few hundred signatures backtracks
+    through every branch at every offset, so matching is done in two
+    stages instead: each signature is keyed by the longest literal it
+    requires, the lowercased body is checked for those literals, and only
+    signatures whose literal is present run their full regex. ``finditer``
+    yields leftmost, non-overlapping matches like a compiled pattern, so a
+    matcher can be passed wherever a regex is expected (``HttpClient.get``).
+    """
+
+    def __init__(self, signatures):
+        self.signatures = list(signatures)
+        self._signature_for = {}
+        self._anchored = defaultdict(list)   # literal -> [compiled regex]
+        self._always = []                    # no usable literal: always run
+        for sig in self.signatures:
+            regex = re.compile(sig.regex, re.I)
+            self._signature_for[regex] = sig
+            anchor = _anchor(sig.regex)
+            if len(anchor) >= MIN_ANCHOR:
+                self._anchored[anchor].append(regex)
+            else:
+                self._always.append(regex)
+
+    def candidates(self, text):
+        lowered = text.lower()
+        out = list(self._always)
+        for anchor, regexes in self._anchored.items():
+            if anchor in lowered:
+                out.extend(regexes)
+        return out
+
+    def finditer(self, text):
+        found = []
+        for regex in self.candidates(text):
+            found.extend(regex.finditer(text))
+        found.sort(key=lambda m: (m.start(), -m.end()))
+        last_end = -1
+        for m in found:
+            if m.start() >= last_end:
+                last_end = m.end()
+                yield m
+
+    def signature(self, match):
+        return self._signature_for[match.re]
+
+    def identify(self, text):
+        """The signature that matches all of ``text`` (a previously matched span)."""
+        for regex in self.candidates(text):
+            m = regex.match(text)
+            if m and m.end() == len(text):
+                return self._signature_for[regex]
+        return None
+
+
+class SignatureLibrary:
+    """All signature packs, compiled once.
+
+    ``pattern`` can be handed straight to ``HttpClient.get(match=...)`` so the
+    body is checked while it streams; ``hits()`` maps those matches back to
+    signatures. ``sql_pattern`` holds only the dbms signatures, for callers
+    that want to stop reading at the first SQL error; ``block_pattern`` the
+    WAF block page and captcha ones.
+    """
+
+    def __init__(self, dirs=None):
+        self.signatures = []
+        self.versions = {}
+        for d in [BUILTIN_DIR] + [Path(p).expanduser() for p in (dirs or [])]:
+            if d.is_dir():
+                for path in sorted(d.glob('*.tsv')):
+                    self._load(path)
+        self.kinds = {}     # tech -> kind of its first signature
+        for sig in self.signatures:
+            self.kinds.setdefault(sig.tech, sig.kind)
+        # Techs that name a database engine (SQL error or passive DB hint)
+        self.engines = frozenset(s.tech for s in self.signatures if s.kind in ('dbms', 'database'))
+        body = [s for s in self.signatures if s.where == 'body']
+        self.pattern = SignatureMatcher(body)
+        self.sql_pattern = SignatureMatcher(s for s in body if s.kind == 'dbms')
+        self.block_pattern = SignatureMatcher(s for s in body if s.kind in ('block', 'captcha'))
+        self.passive = defaultdict(list)  # where -> [(compiled regex, signature)]
+        for sig in self.signatures:
+            if sig.where != 'body':
+                # URL rules run over newline-joined paths, so $ means end of a path
+                flags = re.I | re.M if sig.where == 'url' else re.I
+                self.passive[sig.where].append((re.compile(sig.regex, flags), sig))
+
+    @property
+    def version(self):
+        return '+'.join(f"{name}@{v}" for name, v in self.versions.items())
+
+    def _load(self, path):
+        self.versions[path.stem] = 'unversioned'
+        with open(path, encoding='utf-8') as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.rstrip('\r\n')
+                if line.startswith('#'):
+                    m = VERSION_RE.match(line)
+                    if m:
+                        self.versions[path.stem] = m.group(1)
+                    continue
+                if '\t' not in line:
+                    continue
+                raw_tags, regex = line.split('\t', 1)
+                tags = dict(item.split('=', 1) for item in raw_tags.split(',') if '=' in item)
+                try:
+                    re.compile(regex)
+                except re.error as e:
+                    raise ValueError(f"{path}:{lineno}: bad signature {regex!r}: {e}") from None
+                self.signatures.append(Signature(
+                    len(self.signatures), tags.get('tech', 'unknown').lower(),
+                    tags.get('kind', 'unknown').lower(), regex, f"{path.name}:{lineno}",
+                    tags.get('in', 'body').lower()
+                ))
+
+    def _hit(self, m, offset=0):
+        return Hit(self.pattern.signature(m), m.start() - offset, m.end() - offset, m.group(0))
+
+    def scan(self, text):
+        """All signature hits in ``text`` (leftmost, non-overlapping)."""
+        return [self._hit(m) for m in self.pattern.finditer(text)]
+
+    def scan_many(self, texts):
+        """Scan several bodies with a single pass over their concatenation.
+
+        Returns one hit list per body. A hit that runs across a body boundary
+        is discarded and that body is rescanned on its own, so results match
+        ``[scan(t) for t in texts]``.
+        """
+        texts = list(texts)
+        starts, pos = [], 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 1
+        results = [[] for _ in texts]
+        spilled = set()
+        for m in self.pattern.finditer(_BATCH_SEP.join(texts)):
+            i = bisect_right(starts, m.start()) - 1
+            if m.end() > starts[i] + len(texts[i]):
+                spilled.add(i)
+                continue
+            results[i].append(self._hit(m, starts[i]))
+        for i in spilled:
+            results[i] = self.scan(texts[i])
+        return results
+
+    def match_field(self, where, value):
+        """Passive signatures (``in=<where>``) matching ``value``."""
+        return [sig for regex, sig in self.passive.get(where, ()) if regex.search(value)]
+
+    def hits(self, matches):
+        """Signature hits for ``(start, end, text)`` matches from a streamed body."""
+        out = []
+        for start, end, text in matches:
+            sig = self.pattern.identify(text)
+            if sig is not None:
+                out.append(Hit(sig, start, end, text))
+        return out
+
+
+def _anchor(regex):
+    """Longest run of literal characters at the top level of ``regex``, lowercased."""
+    best = run = ''
+    for op, arg in _parser.parse(regex):
+        if op is _LITERAL:
+            run += chr(arg)
+        else:
+            best, run = max(best, run, key=len), ''
+    return max(best, run, key=len).lower()
+
+
+def sql_errors(hits, ignore=()):
+    """Hits that are SQL error evidence, minus signatures in ``ignore`` (ids seen on the baseline)."""
+    return [h for h in hits if h.kind == 'dbms' and h.signature.id not in ignore]
+
+
+_library = None
+
+
+def configure(dirs=None):
+    global _library
+    _library = SignatureLibrary(dirs)
+    return _library
+
+
+def get_library():
+    if _library is None:
+        configure()
+    return _library
+
+
+def scan(text):
+    return get_library().scan(text)
+
+
+def bench(size_mb=8, batch=64):
+    """Scan throughput in MB/s for one large body and for a batch of small ones."""
+    lib = get_library()
+    filler = ('<div class="row"><a href="/item?id=42">Item 42</a> lorem ipsum dolor sit '
+              'amet, consectetur adipiscing elit.</div>\n')
+    body = filler * (size_mb * 1024 * 1024 // len(filler))
+    body += "You have an error in your SQL syntax; check the manual"
+    mb = len(body) / (1024 * 1024)
+    t = time.perf_counter()
+    lib.scan(body)
+    single = mb / (time.perf_counter() - t)
+    small = [body[i * 16384:(i + 1) * 16384] for i in range(batch)]
+    mb_small = sum(map(len, small)) / (1024 * 1024)
+    t = time.perf_counter()
+    for text in small:
+        lib.scan(text)
+    loop = mb_small / (time.perf_counter() - t)
+    t = time.perf_counter()
+    lib.scan_many(small)
+    batched = mb_small / (time.perf_counter() - t)
+    return {'signatures': len(lib.signatures), 'version': lib.version,
+            'single_mb_s': single, 'loop_mb_s': loop, 'batch_mb_s': batched}
+
+
+if __name__ == '__main__':
+    stats = bench()
+    print(f"{stats['signatures']} signatures ({stats['version']}): "
+          f"{stats['single_mb_s']:.1f} MB/s single body, "
+          f"{stats['loop_mb_s']:.1f} MB/s per-body loop, {stats['batch_mb_s']:.1f} MB/s batched")
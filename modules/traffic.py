@@ -0,0 +1,286 @@
+import asyncio
+import hashlib
+import json
+import secrets
+import sqlite3
+import time
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from modules.body import StreamMatcher
+from modules.circuit import classify
+from modules.http_client import Response, TargetHttpClient
+
+# Scanners whose verdict depends only on HTTP responses (packed probes too: their
+# tags are seeded from the recording); XSS (dalfox) and SSRF (out-of-band
+# callbacks) need the live target and are not replayed
+REPLAYABLE_SCANNERS = frozenset({'sqli', 'sqli_packed', 'business_logic'})
+
+# Errors re-raised on replay, by the outcome classify() gave them when recorded
+_REPLAY_ERRORS = {'timeout': asyncio.TimeoutError, 'reset': ConnectionResetError}
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        target TEXT,
+        started REAL,
+        finished REAL,
+        tag_seed TEXT
+    );
+    CREATE TABLE IF NOT EXISTS exchanges (
+        id INTEGER PRIMARY KEY,
+        run INTEGER,
+        ts REAL,
+        url TEXT,
+        final_url TEXT,
+        status INTEGER,
+        headers TEXT,
+        elapsed REAL,
+        length INTEGER,
+        fingerprint TEXT,
+        truncated INTEGER,
+        body TEXT,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS exchanges_run_url ON exchanges (run, url);
+    CREATE TABLE IF NOT EXISTS bodies (
+        hash TEXT PRIMARY KEY,
+        size INTEGER,
+        data BLOB
+    );
+    CREATE TABLE IF NOT EXISTS tasks (
+        run INTEGER,
+        endpoint TEXT,
+        params TEXT
+    );
+'''
+
+
+def _connect(path, **kwargs):
+    conn = sqlite3.connect(path, **kwargs)
+    conn.executescript(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    if 'tag_seed' not in columns:
+        # Recordings made before packed probe tags were seeded
+        conn.execute("ALTER TABLE runs ADD COLUMN tag_seed TEXT")
+    return conn
+
+
+class NotRecordedError(Exception):
+    """Raised on replay for a request the recording has no response for."""
+
+
+class RecordedHeaders:
+    """Read-only, case-insensitive headers rebuilt from a recording (like aiohttp's)."""
+
+    __slots__ = ('_items', '_lower')
+
+    def __init__(self, items):
+        self._items = [tuple(item) for item in items]
+        self._lower = defaultdict(list)
+        for name, value in self._items:
+            self._lower[name.lower()].append(value)
+
+    def get(self, name, default=None):
+        values = self._lower.get(name.lower())
+        return values[0] if values else default
+
+    def getall(self, name, default=()):
+        return list(self._lower.get(name.lower(), default))
+
+    def __getitem__(self, name):
+        values = self._lower.get(name.lower())
+        if not values:
+            raise KeyError(name)
+        return values[0]
+
+    def __contains__(self, name):
+        return name.lower() in self._lower
+
+    def items(self):
+        return list(self._items)
+
+
+class TrafficRecorder:
+    """Append-only log of a target's HTTP exchanges (``--record``).
+
+    One sqlite file per target: every request's URL and response metadata
+    goes into ``exchanges`` under the current run; decoded bodies are
+    zlib-compressed into ``bodies`` keyed by content hash, so a body seen
+    on many URLs (or in many runs) is stored once. The queued scan tasks are
+    kept too, so ``--replay`` can re-run the same work without recon; so is
+    the run's packed probe tag seed, so it sends the same tagged URLs.
+
+    ``record()`` only captures the exchange: hashing, compression and the
+    sqlite writes happen on a dedicated writer thread (like ReportWriter's),
+    in order, so the event loop never blocks on them.
+    """
+
+    def __init__(self, path, target, level=6, commit_every=200):
+        self.path = path
+        self.level = level
+        self.commit_every = commit_every
+        self.tag_seed = secrets.token_hex(8)
+        # Opened here, then used by the writer thread only
+        self.conn = _connect(path, check_same_thread=False)
+        self.run = self.conn.execute("INSERT INTO runs (target, started, tag_seed) VALUES (?, ?, ?)",
+                                     (target, time.time(), self.tag_seed)).lastrowid
+        self.conn.commit()
+        self._known = set()      # body hashes already stored
+        self._pending = 0
+        self.stats = Counter()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='traffic')
+
+    def _body(self, text):
+        data = text.encode('utf-8', 'surrogatepass')
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if digest in self._known:
+            self.stats['deduped'] += 1
+            return digest
+        self._known.add(digest)
+        compressed = zlib.compress(data, self.level)
+        cursor = self.conn.execute("INSERT OR IGNORE INTO bodies (hash, size, data) VALUES (?, ?, ?)",
+                                   (digest, len(data), compressed))
+        if cursor.rowcount:
+            self.stats['body_bytes'] += len(data)
+            self.stats['stored_bytes'] += len(compressed)
+        else:
+            self.stats['deduped'] += 1
+        return digest
+
+    def record(self, url, response=None, error=None):
+        """Log one exchange: the ``response`` to ``url``, or the ``error`` it failed with."""
+        if self.conn is None:
+            return
+        if response is not None:
+            row = [self.run, time.time(), url, response.url, response.status,
+                   json.dumps(list(response.headers.items())), response.elapsed, response.length,
+                   response.fingerprint, int(bool(response.truncated)), response.text, None]
+        else:
+            row = [self.run, time.time(), url, None, None, None, None, None, None, 0, None,
+                   f"{classify(error=error)}: {error!r}"]
+        self._executor.submit(self._write_exchange, row)
+
+    def _write_exchange(self, row):
+        try:
+            if row[10] is not None:
+                row[10] = self._body(row[10])
+            self.conn.execute('''
+                INSERT INTO exchanges (run, ts, url, final_url, status, headers, elapsed, length,
+                                       fingerprint, truncated, body, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', row)
+        except sqlite3.Error:
+            self.stats['write_errors'] += 1
+            return
+        self.stats['exchanges'] += 1
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.conn.commit()
+            self._pending = 0
+
+    def record_task(self, endpoint, params):
+        if self.conn is not None:
+            self._executor.submit(self._write_task, endpoint, json.dumps(params))
+
+    def _write_task(self, endpoint, params):
+        self.conn.execute("INSERT INTO tasks (run, endpoint, params) VALUES (?, ?, ?)",
+                          (self.run, endpoint, params))
+
+    def close(self):
+        """Wait for the writer thread to store everything, then close the file."""
+        if self.conn is None:
+            return
+        self._executor.submit(self._finish).result()
+        self._executor.shutdown(wait=True)
+        self.conn.close()
+        self.conn = None
+
+    def _finish(self):
+        self.conn.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), self.run))
+        self.conn.commit()
+
+
+class ReplayClient:
+    """HttpClient stand-in that answers from a recording, with no network access.
+
+    Requests are matched on URL; when a URL was fetched several times the
+    recorded responses are served in order (the last one repeats). Recorded
+    failures are raised again as timeouts / connection resets. ``match``
+    patterns run over the recorded body, so new signatures apply to old
+    traffic; bodies recorded with ``stop_on_match`` end at the match that
+    stopped them.
+    """
+
+    def __init__(self, path, run=None):
+        self.path = path
+        self.conn = _connect(path)
+        if run is None:
+            row = self.conn.execute("SELECT MAX(id) FROM runs").fetchone()
+            run = row[0] if row else None
+        if run is None:
+            raise ValueError(f"{path}: no recorded runs")
+        self.run = run
+        self.target, self.tag_seed = self.conn.execute(
+            "SELECT target, tag_seed FROM runs WHERE id = ?", (run,)).fetchone()
+        self.index = defaultdict(list)   # url -> recorded exchange rows, in order
+        for row in self.conn.execute('''
+                SELECT url, final_url, status, headers, elapsed, length, fingerprint, truncated, body, error
+                FROM exchanges WHERE run = ? ORDER BY id''', (run,)):
+            self.index[row[0]].append(row)
+        self.requests = Counter()
+        self.missed = Counter()
+        self._served = Counter()
+        self._bodies = OrderedDict()     # small LRU of decompressed bodies
+
+    def tasks(self):
+        """The scan tasks queued by the recorded run, as ``(endpoint, param or [params])``."""
+        return [(endpoint, json.loads(params)) for endpoint, params in self.conn.execute(
+            "SELECT endpoint, params FROM tasks WHERE run = ? ORDER BY rowid", (self.run,))]
+
+    def _body(self, digest):
+        text = self._bodies.get(digest)
+        if text is None:
+            row = self.conn.execute("SELECT data FROM bodies WHERE hash = ?", (digest,)).fetchone()
+            text = zlib.decompress(row[0]).decode('utf-8', 'surrogatepass') if row else ''
+            self._bodies[digest] = text
+            if len(self._bodies) > 64:
+                self._bodies.popitem(last=False)
+        else:
+            self._bodies.move_to_end(digest)
+        return text
+
+    async def get(self, url, timeout=None, headers=None, allow_redirects=True, match=None, stop_on_match=False):
+        self.requests[urlsplit(url).netloc] += 1
+        rows = self.index.get(url)
+        if not rows:
+            self.missed[url] += 1
+            raise NotRecordedError(url)
+        n = self._served[url]
+        self._served[url] += 1
+        final_url, status, headers_json, elapsed, length, fingerprint, truncated, body, error = rows[min(n, len(rows) - 1)][1:]
+        # Keep concurrent scanners interleaving as they would on the network
+        await asyncio.sleep(0)
+        if error is not None:
+            kind, _, message = error.partition(': ')
+            raise _REPLAY_ERRORS.get(kind, Exception)(message)
+        text = self._body(body)
+        matches = []
+        if match is not None and text:
+            matcher = StreamMatcher(match, stop_on_match=stop_on_match)
+            matcher.feed(text, final=True)
+            matches = matcher.matches
+        return Response(final_url, status, RecordedHeaders(json.loads(headers_json)), text, elapsed,
+                        length, fingerprint, bool(truncated), matches)
+
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    def for_target(self, scope=None, max_requests=None):
+        return TargetHttpClient(self, scope=scope, max_requests=max_requests, tag_seed=self.tag_seed)
+
+    async def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
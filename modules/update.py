@@ -1,14 +1,36 @@
-import subprocess
-import requests
 import asyncio
+import json
 import os
+import shlex
+import shutil
+import time
+from pathlib import Path
 from rich.console import Console
 
 console = Console()
 
+CACHE_PATH = Path(os.path.expanduser('~/.cache/omnihunter/tools.json'))
+
 class UpdateManager:
-    def __init__(self, tools_path):
+    """Tool health checks and installs.
+
+    Each tool is located on PATH (or under ``tools_path``) and probed with
+    its version command concurrently, with a timeout. Results are cached on
+    disk keyed on the binary's path and mtime, so a warm start costs a
+    ``stat`` per tool and no subprocesses. Installs never run inline with
+    the checks: ``update_missing`` is awaited separately, before recon
+    starts, so no install is cut off by the end of a run or replaces a
+    binary recon is running.
+    """
+
+    def __init__(self, tools_path, cache_ttl=86400, probe_timeout=10, cache_path=CACHE_PATH):
         self.tools_path = tools_path
+        self.cache_ttl = cache_ttl
+        self.probe_timeout = probe_timeout
+        self.cache_path = Path(cache_path)
+        self.status = {}
+        # "bin" overrides the executable looked up for the probe; "{bin}" in
+        # "cmd" is replaced with the located path.
         self.tools = {
             "subfinder": {"cmd": "subfinder -version", "repo": "projectdiscovery/subfinder", "install": "go install -v github.com/projectdiscovery/subfinder/v2/cmd/subfinder@latest"},
             "assetfinder": {"cmd": "assetfinder -version", "repo": "tomnomnom/assetfinder", "install": "go install -v github.com/tomnomnom/assetfinder@latest"},
@@ -21,7 +43,7 @@ class UpdateManager:
             "kxss": {"cmd": "kxss -h", "repo": "tomnomnom/hacks/kxss", "install": "go install -v github.com/tomnomnom/hacks/kxss@latest"},
             "Gxss": {"cmd": "Gxss -h", "repo": "KathanP19/Gxss", "install": "go install -v github.com/KathanP19/Gxss@latest"},
             "dalfox": {"cmd": "dalfox version", "repo": "hahwul/dalfox", "install": "go install -v github.com/hahwul/dalfox/v2@latest"},
-            "xsstrike": {"cmd": "python3 xsstrike.py --help", "repo": "s0md3v/XSStrike", "install": "git clone https://github.com/s0md3v/XSStrike.git"},
+            "xsstrike": {"cmd": "python3 {bin} --help", "bin": "XSStrike/xsstrike.py", "repo": "s0md3v/XSStrike", "install": "git clone https://github.com/s0md3v/XSStrike.git"},
             "sqlmap": {"cmd": "sqlmap --version", "repo": "sqlmapproject/sqlmap", "install": "git clone --depth 1 https://github.com/sqlmapproject/sqlmap.git sqlmap-dev"},
             "nuclei": {"cmd": "nuclei -version", "repo": "projectdiscovery/nuclei", "install": "go install -v github.com/projectdiscovery/nuclei/v3/cmd/nuclei@latest"},
             "ffuf": {"cmd": "ffuf -V", "repo": "ffuf/ffuf", "install": "go install -v github.com/ffuf/ffuf@latest"},
@@ -30,25 +52,107 @@ class UpdateManager:
         }
 
     async def check_all(self):
-        for name, info in self.tools.items():
-            if not self._check_tool(name):
-                console.log(f"[yellow]Updating {name}...[/]")
-                await self._update_tool(name)
+        """Probe every tool concurrently; returns {name: healthy}."""
+        cache = self._load_cache()
+        names = list(self.tools)
+        results = await asyncio.gather(*(self._check_cached(name, cache) for name in names))
+        self.status = dict(zip(names, results))
+        self._save_cache(cache)
+        return self.status
+
+    def missing(self):
+        return [name for name, ok in self.status.items() if not ok]
+
+    async def update_missing(self, names=None):
+        """Install/update tools (all missing ones by default), refresh their status.
+
+        Returns ``{name: installed}``. A cancelled install kills its
+        subprocess before the cancellation propagates.
+        """
+        results = {}
+        for name in names or self.missing():
+            console.log(f"[yellow]Updating {name}...[/]")
+            results[name] = await self._update_tool(name)
+        await self.check_all()
+        return results
+
+    def _locate(self, name):
+        info = self.tools[name]
+        exe = info.get("bin") or shlex.split(info["cmd"])[0]
+        found = shutil.which(exe) or shutil.which(exe, path=self.tools_path)
+        if found:
+            return found
+        for base in (self.tools_path, os.getcwd(), os.path.expanduser('~/tools')):
+            candidate = os.path.join(base, exe)
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    async def _check_cached(self, name, cache):
+        path = self._locate(name)
+        if not path:
+            cache.pop(name, None)
+            return False
+        mtime = os.stat(path).st_mtime
+        entry = cache.get(name)
+        if (entry and entry['path'] == path and entry['mtime'] == mtime
+                and time.time() - entry['checked'] < self.cache_ttl):
+            return entry['ok']
+        ok = await self._check_tool(name, path)
+        cache[name] = {'path': path, 'mtime': mtime, 'ok': ok, 'checked': time.time()}
+        return ok
 
-    def _check_tool(self, name):
+    async def _check_tool(self, name, path):
+        info = self.tools[name]
+        argv = shlex.split(info["cmd"].replace("{bin}", path))
+        if "{bin}" not in info["cmd"]:
+            argv[0] = path
         try:
-            cmd = self.tools[name]["cmd"]
-            subprocess.run(cmd, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-            return True
-        except:
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+        except OSError:
             return False
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=self.probe_timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            return False
+        # Many Go tools exit non-zero for -h; only "cannot execute" counts as broken
+        return proc.returncode not in (126, 127)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
 
     async def _update_tool(self, name):
         info = self.tools[name]
         install_cmd = info["install"]
-        proc = await asyncio.create_subprocess_shell(install_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        await proc.communicate()
+        proc = await asyncio.create_subprocess_shell(install_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            await proc.communicate()
+        except asyncio.CancelledError:
+            # Don't leave an install running unattended
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            console.log(f"[red]Update of {name} interrupted[/]")
+            raise
         if proc.returncode == 0:
             console.log(f"[green]{name} updated successfully[/]")
-        else:
-            console.log(f"[red]Failed to update {name}[/]")
+            return True
+        console.log(f"[red]Failed to update {name}[/]")
+        return False
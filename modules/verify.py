@@ -1,4 +1,3 @@
-import aiohttp
 import asyncio
 
 class Verifier:
@@ -12,6 +11,7 @@ class Verifier:
             return True  # Placeholder
         elif vtype == 'SQLi (time-based)':
             # Re-test time-based
+            import aiohttp
             try:
                 async with aiohttp.ClientSession() as session:
                     start = asyncio.get_event_loop().time()
@@ -5,46 +5,61 @@ Author: Your Name
 Description: Combines recon, parameter extraction, and multi-scanner vulnerability detection.
 """
 
+import time
+_STARTED = time.perf_counter()
+
 import asyncio
 import argparse
 import yaml
 import sys
 import os
 from pathlib import Path
-from datetime import datetime
+from urllib.parse import urlsplit
 from rich.console import Console
-from rich.live import Live
-from rich.layout import Layout
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from modules.update import UpdateManager
 from modules.recon import Recon
 from modules.params import ParamExtractor
-from modules.proxy_manager import ProxyManager
-from modules.anti_block import AntiBlock
 from modules.anomaly import AnomalyDetector
 from modules.notifications import NotificationManager
 from modules.console import OmniHunterUI
 from modules import scanners
 from modules.verify import Verifier
 from modules.ml import MLHeuristics
+from modules.report import ReportManager
+from modules.http_client import BudgetExceededError, track_requests
+from modules.packed import PackedProber
+from modules.discovery import ParamDiscovery
+from modules.scope import Scope
+from modules.shared import SharedContext, max_scan_workers
+from modules.fingerprint import TechProfiles
+from modules.incremental import ScanHistory
+from modules.traffic import TrafficRecorder, ReplayClient, REPLAYABLE_SCANNERS
+from modules.anti_block import AntiBlock
+from modules.autoscale import Autoscaler, WorkerPool
+from modules import payloads, signatures
 import modules.db as db
 
 console = Console()
 
+def load_config(args):
+    """Load the config file if provided."""
+    if args.config:
+        with open(args.config, 'r') as f:
+            return yaml.safe_load(f) or {}
+    return {}
+
 class OmniHunter:
-    def __init__(self, args):
+    def __init__(self, args, target=None, shared=None):
         self.args = args
+        self.batch = shared is not None
         
         # Load config file if provided
-        if args.config:
-            with open(args.config, 'r') as f:
-                self.config = yaml.safe_load(f)
-        else:
-            self.config = {}
+        self.config = load_config(args)
+        
+        # Replaying a recording: no network, the target and tasks come from the recording
+        self.replay = ReplayClient(args.replay) if getattr(args, 'replay', None) else None
         
         # Override with command line arguments
-        self.target = args.target or self.config.get('target', '')
+        self.target = target or args.target or (self.replay and self.replay.target) or self.config.get('target', '')
         if not self.target:
             console.print("[red][-] Error: No target specified. Use --target or config.yaml[/]")
             sys.exit(1)
@@ -60,7 +75,9 @@ class OmniHunter:
             'all_scanners': args.all_scanners or self.config.get('all_scanners', False),
             'output_file': args.output or self.config.get('output_file', 'omnihunter_output.txt'),
             'proxy': {
-                'use_free': not args.no_proxy if args.no_proxy else self.config.get('proxy', {}).get('use_free', True),
+                # A replay never touches the network: no free-proxy scraping either
+                'use_free': False if self.replay else (
+                    not args.no_proxy if args.no_proxy else self.config.get('proxy', {}).get('use_free', True)),
                 'max_proxies': self.config.get('proxy', {}).get('max_proxies', 50)
             },
             'update_on_start': self.config.get('update_on_start', True),
@@ -68,21 +85,70 @@ class OmniHunter:
             'anomaly': {
                 'enabled': args.anomaly_detection or self.config.get('anomaly', {}).get('enabled', True)
             },
+            'packed_probe': args.packed or self.config.get('packed_probe', False),
+            'discovery': dict(self.config.get('discovery', {}),
+                              enabled=args.discover_params or self.config.get('discovery', {}).get('enabled', False)),
+            'rate_limit': self.config.get('rate_limit', {}),
+            'report': self.config.get('report', {}),
+            'budget': self.config.get('budget', {}),
+            'record': dict(self.config.get('record', {}),
+                           enabled=args.record or self.config.get('record', {}).get('enabled', False)),
+            'incremental': dict(self.config.get('incremental', {}),
+                                enabled=args.incremental or self.config.get('incremental', {}).get('enabled', False)),
+            'profile': dict(self.config.get('profile', {}),
+                            enabled=args.profile or self.config.get('profile', {}).get('enabled', False)),
             'verbose': args.verbose or self.config.get('verbose', False),
             'debug': args.debug or self.config.get('debug', False)
         })
         
         # Initialize components
-        self.db_path = Path(f"omnihunter_{self.target.replace('.', '_')}.db")
-        db.init(self.db_path)
-        self.proxy_manager = ProxyManager(use_free=self.config['proxy']['use_free'])
-        self.anti_block = AntiBlock(proxy_manager=self.proxy_manager)
+        payloads.configure(self.config.get('payloads', {}).get('dirs'))
+        signatures.configure(self.config.get('signatures', {}).get('dirs'))
+        slug = self.target.replace('.', '_')
+        # Batch mode keeps every target's files in its own directory
+        self.output_dir = Path(self.config.get('batch', {}).get('output_dir', 'batch_results')) / slug if self.batch else Path('.')
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.output_dir / f"omnihunter_{slug}.db"
+        # A replay must not touch the target's history
+        self.db = db.Database(':memory:' if self.replay else self.db_path)
+        # Pools, proxies, rate limiters and the tool cache may be shared across targets
+        self.shared = shared or SharedContext(self.config)
+        self.proxy_manager = self.shared.proxy_manager
+        self.anti_block = self.shared.anti_block
+        self.update_mgr = self.shared.update_mgr
+        self.scheduler = self.shared.scheduler
+        self.breaker = self.shared.breaker
+        self.profiler = self.shared.profiler
+        self.parked = set()
+        self.scope = Scope.from_config(self.config.get('scope'), self.target)
+        # Scan worker count is adjusted at runtime from the target's request latency/failures
+        self.autoscaler = Autoscaler(self.config.get('autoscale'), initial=self.config.get('concurrency', 10),
+                                     scheduler=self.scheduler)
+        self.pool = None
+        record_cfg = self.config['record']
+        self.recorder = None
+        if record_cfg['enabled'] and not self.replay:
+            self.recorder = TrafficRecorder(self.output_dir / 'traffic.db', self.target,
+                                            level=record_cfg.get('compress_level', 6))
+        if self.replay:
+            self.http = self.replay.for_target(self.scope)
+            self.anti_block = AntiBlock(delay_range=(0, 0))
+        else:
+            self.http = self.shared.http.for_target(self.scope, max_requests=self.config['budget'].get('max_requests'),
+                                                    recorder=self.recorder, monitor=self.autoscaler)
         self.anomaly = AnomalyDetector(self.config.get('anomaly', {}))
+        # Per-host technology profiles, carried over from earlier runs via the DB
+        self.tech = TechProfiles(self.db, self.config.get('tech_profiles'))
+        # What earlier runs tested and found (drives --incremental and new/persisting/fixed)
+        self.history = ScanHistory(self.db, {'fingerprint': False} if self.replay else self.config['incremental'])
         self.notifier = NotificationManager(self.config.get('notifications', {}))
         self.ui = OmniHunterUI()
         self.ml = MLHeuristics(enabled=self.config.get('ml_enabled', True))
-        self.update_mgr = UpdateManager(self.config.get('tools_path', '/usr/local/bin'))
         self.verifier = Verifier()
+        self.report = ReportManager(
+            self.output_dir / (('replay_' if self.replay else '') + self.config['output_file']), self.config['report'],
+            meta={'target': self.target, 'platform': self.platform}
+        )
         self.scan_queue = asyncio.Queue()
         self.running = True
         self.results = []
@@ -90,98 +156,258 @@ class OmniHunter:
     async def run(self):
         console.print(f"[bold green][+] Starting OmniHunter scan against {self.target}[/]")
         console.print(f"[bold green][+] Platform: {self.platform}[/]")
+        self.report.open()
+        if not self.batch:
+            self.profiler.start()
         
-        # 1. Update tools if needed
-        if self.config.get('update_on_start', True):
-            console.print("[bold yellow][*] Checking for tool updates...[/]")
-            await self.update_mgr.check_all()
+        # 1. Check tools (cached, once per process); installs run on demand or in the background.
+        # A replay runs no external tools, so it neither probes nor installs them
+        if not self.replay:
+            self.profiler.phase('tools')
+            await self.shared.check_tools(update_now=self.args.update_tools)
+        if self.config.get('verbose') or self.config.get('debug'):
+            console.print(f"[dim][*] Startup took {(time.perf_counter() - _STARTED) * 1000:.0f} ms[/]")
+
+        # 2. Start real-time console (one full-screen UI can't show many targets)
+        if not self.batch:
+            self.ui.start()
+
+        # 3-4. Recon and parameter extraction (a replay takes its tasks from the recording)
+        if self.replay:
+            endpoints, tasks = self.replay_tasks()
+        else:
+            endpoints, tasks = await self.recon_phase(), None
+
+        # 5. Baseline collection
+        if self.config['anomaly']['enabled']:
+            console.print("[bold cyan][*] Collecting baseline responses...[/]")
+            self.profiler.phase('baselines')
+            await self.collect_baselines(endpoints)
+        self.report_tech(endpoints)
 
-        # 2. Start real-time console
-        self.ui.start()
+        # 5b. Compare with earlier runs: with --incremental only new, changed and stale params are queued
+        self.scan_profile = ','.join(self.scanner_names())
+        if self.history.enabled:
+            self.profiler.phase('incremental')
+            await self.history.refresh(self.http, endpoints, self.config.get('concurrency', 10))
+        if tasks is None:
+            tasks = self.plan_tasks(self.history.plan(endpoints, self.scan_profile))
+        if self.history.enabled:
+            console.print(f"[bold green][+] Incremental: {self.history.summary()}[/]")
 
+        # 6. Enqueue scan tasks
+        for endpoint, params in tasks:
+            await self.scan_queue.put((endpoint, params))
+            if self.recorder:
+                self.recorder.record_task(endpoint, params)
+        total_tasks = len(tasks)
+        
+        console.print(f"[bold green][+] Queued {total_tasks} scan tasks[/]")
+
+        # 7. Start scanner workers
+        self.profiler.phase('scan')
+        self.pool = WorkerPool(self.scanner_worker, self.scan_queue)
+        self.autoscaler.start(self.pool, self.output_dir / self.config.get('autoscale', {}).get('log', 'autoscale.jsonl'))
+        console.print(f"[bold green][+] Started {self.pool.size} scanner workers"
+                      + (f" (autoscaling {self.autoscaler.floor}-{self.autoscaler.ceiling})" if self.autoscaler.enabled else '')
+                      + "[/]")
+        
+        # Wait for all tasks to complete (or the target's time budget to run out)
+        try:
+            await asyncio.wait_for(self.scan_queue.join(), timeout=self.config['budget'].get('max_seconds'))
+        except asyncio.TimeoutError:
+            console.print(f"[yellow][!] {self.target}: time budget exhausted, "
+                          f"{self.scan_queue.qsize()} queued tasks skipped[/]")
+        
+        # Cancel workers (and tasks still parked on unhealthy hosts)
+        self.profiler.phase('finalize')
+        self.autoscaler.stop()
+        for w in self.pool.cancel() + list(self.parked):
+            w.cancel()
+        await asyncio.gather(*self.parked, return_exceptions=True)
+        if self.autoscaler.enabled:
+            console.print(f"[green][+] Autoscaler: {self.autoscaler.summary()}[/]")
+        self.report_circuits()
+        if not self.replay:
+            self.tech.save()
+            await self.report_history()
+        await self.report_traffic()
+        if self.tech.pruned:
+            pruned = ', '.join(f"{name} x{n}" for name, n in self.tech.pruned.most_common())
+            console.print(f"[green][+] Skipped scanner runs ruled out by tech profiles: {pruned}[/]")
+        
+        self.running = False
+        self.ui.stop()
+        if not self.batch:
+            await self.shared.close()
+        console.print(f"[bold green][+] Sent {self.http.total_requests()} requests to {len(self.http.requests)} hosts "
+                      f"({self.http.total_requests() / max(len(endpoints), 1):.1f} per endpoint)[/]")
+        
+        # Finalize reports
+        await self.report.close()
+        console.print("[bold green][+] Scan completed![/]")
+        console.print(f"[bold green][+] Results saved to {', '.join(map(str, self.report.paths().values()))}[/]")
+        self.db.close()
+        self.profiler.phase(None)
+        if not self.batch:
+            self.write_profile(self.profiler, self.output_dir)
+
+    async def recon_phase(self):
+        """Subdomains, live hosts, URLs and their params: ``{endpoint: [params]}`` to scan."""
         # 3. Recon phase
         console.print("[bold cyan][*] Starting reconnaissance...[/]")
-        recon = Recon(self.target, self.config)
+        self.profiler.phase('recon.subdomains')
+        recon = Recon(self.target, self.config, anti_block=self.anti_block, scope=self.scope)
         subdomains = await recon.get_subdomains()
         console.print(f"[bold green][+] Found {len(subdomains)} subdomains[/]")
         
-        live_urls = await recon.get_live_urls(subdomains)
+        self.profiler.phase('recon.live')
+        live_urls = await recon.get_live_urls(subdomains, on_record=self.tech.observe_httpx)
         console.print(f"[bold green][+] Found {len(live_urls)} live URLs[/]")
         
+        self.profiler.phase('recon.urls')
         all_urls = await recon.gather_urls(live_urls)
         all_urls = list(set(all_urls))
         console.print(f"[bold green][+] Total unique URLs: {len(all_urls)}[/]")
-        db.save_urls(all_urls)
+        self.db.save_urls(all_urls)
+        self.tech.observe_urls(all_urls)
 
         # Save URLs to file
-        with open('all_urls.txt', 'w') as f:
-            for url in all_urls:
-                f.write(f"{url}\n")
+        await self.report.write_lines(self.output_dir / 'all_urls.txt', all_urls)
         console.print("[bold green][+] URLs saved to all_urls.txt[/]")
 
         # 4. Parameter extraction
         console.print("[bold cyan][*] Extracting parameters...[/]")
-        param_extractor = ParamExtractor(all_urls, self.config.get('scope'))
+        self.profiler.phase('params')
+        param_extractor = ParamExtractor(all_urls, self.scope, self.config.get('params'))
         endpoints = param_extractor.extract()
         console.print(f"[bold green][+] Extracted {len(endpoints)} endpoints with solid parameters[/]")
-        db.save_endpoints(endpoints)
+        if param_extractor.stats:
+            st = param_extractor.stats
+            console.print(f"[bold green][+] Collapsed {st['urls_with_params']} URLs into {st['templates']} path templates: "
+                          f"~{st['raw_tasks']} param tests -> {st['tasks']} ({st['reduction']:.1f}x fewer)[/]")
+            await self.report.write_lines(
+                self.output_dir / 'templates.txt',
+                (f"{template} ({t.urls} URLs) -> {', '.join(sorted(t.params))}"
+                 for template, t in sorted(param_extractor.templates(), key=lambda item: -item[1].urls))
+            )
+        self.db.save_endpoints(endpoints)
+
+        # 4b. Hidden parameter discovery
+        if self.config['discovery']['enabled']:
+            self.profiler.phase('discovery')
+            endpoints = await self.discover_params(endpoints, live_urls)
 
         # Save endpoints to file
-        with open('endpoints.txt', 'w') as f:
-            for endpoint, params in endpoints.items():
-                f.write(f"{endpoint} -> {', '.join(params)}\n")
+        await self.report.write_lines(
+            self.output_dir / 'endpoints.txt',
+            (f"{endpoint} -> {', '.join(params)}" for endpoint, params in endpoints.items())
+        )
         console.print("[bold green][+] Endpoints saved to endpoints.txt[/]")
+        return endpoints
 
-        # 5. Baseline collection
-        if self.config['anomaly']['enabled']:
-            console.print("[bold cyan][*] Collecting baseline responses...[/]")
-            await self.collect_baselines(endpoints)
+    def plan_tasks(self, endpoints):
+        """Scan tasks for ``{endpoint: [params]}``: one per param, or one per endpoint when packed."""
+        if self.config['packed_probe']:
+            # One task per endpoint; its params share each probe request
+            return [(endpoint, list(params)) for endpoint, params in endpoints.items()]
+        return [(endpoint, param) for endpoint, params in endpoints.items() for param in params]
 
-        # 6. Enqueue scan tasks
-        total_tasks = 0
-        for endpoint, params in endpoints.items():
-            for param in params:
-                await self.scan_queue.put((endpoint, param))
-                total_tasks += 1
-        
-        console.print(f"[bold green][+] Queued {total_tasks} scan tasks[/]")
+    def replay_tasks(self):
+        """Endpoints and queued tasks of the recorded run being replayed."""
+        tasks = self.replay.tasks()
+        endpoints = {}
+        for endpoint, params in tasks:
+            endpoints.setdefault(endpoint, []).extend(params if isinstance(params, list) else [params])
+        console.print(f"[bold green][+] Replaying run {self.replay.run} of {self.replay.path}: "
+                      f"{len(tasks)} tasks, {sum(map(len, self.replay.index.values()))} recorded responses[/]")
+        return endpoints, tasks
 
-        # 7. Start scanner workers
-        workers = [asyncio.create_task(self.scanner_worker(i)) for i in range(self.config.get('concurrency', 10))]
-        console.print(f"[bold green][+] Started {len(workers)} scanner workers[/]")
-        
-        # Wait for all tasks to complete
-        await self.scan_queue.join()
-        
-        # Cancel workers
-        for w in workers:
-            w.cancel()
-        
-        self.running = False
-        self.ui.stop()
-        
-        # Save results
-        self.save_results()
-        console.print("[bold green][+] Scan completed![/]")
-        console.print(f"[bold green][+] Results saved to {self.config['output_file']}[/]")
-        db.close()
+    @staticmethod
+    def write_profile(profiler, directory):
+        """Stop ``profiler`` and write its summary and collapsed stacks to ``directory``."""
+        if not profiler.enabled:
+            return
+        profiler.stop()
+        for line in profiler.summary()[:3]:
+            console.print(f"[cyan]{line}[/]")
+        summary, folded = profiler.write(directory)
+        console.print(f"[bold green][+] Profile written to {summary} (flamegraph input: {folded})[/]")
+
+    def report_tech(self, endpoints):
+        """Print the technology profile of each host that has endpoints to scan."""
+        hosts = {urlsplit(ep).netloc.lower(): ep for ep in endpoints}
+        for host, endpoint in hosts.items():
+            profile = self.tech.profile(endpoint)
+            if not profile:
+                continue
+            techs = ', '.join(t for t, _ in sorted(profile.items(), key=lambda kv: -kv[1])[:8])
+            dbms = self.tech.dbms(endpoint)
+            dbms = dbms if isinstance(dbms, str) or dbms is None else '|'.join(sorted(dbms))
+            console.print(f"[green][+] {host}: {techs}" + (f" (DBMS: {dbms})" if dbms else '') + "[/]")
+
+    async def report_history(self):
+        """Add findings fixed since the last run to the reports and save the scan history."""
+        fixed = self.history.fixed()
+        for finding in fixed:
+            await self.report.add_finding(finding)
+        self.history.save(fixed)
+        statuses = [status for status, *_ in self.history.seen.values()]
+        if fixed or statuses:
+            console.print(f"[bold green][+] Findings: {statuses.count('new')} new, "
+                          f"{statuses.count('persisting')} persisting, {len(fixed)} fixed since last run[/]")
+
+    async def report_traffic(self):
+        """Close the traffic recorder / replay source and print what it stored or missed."""
+        if self.recorder:
+            st = self.recorder.stats
+            self.recorder.close()
+            console.print(f"[green][+] Recorded {st['exchanges']} exchanges to {self.recorder.path}: "
+                          f"{st['body_bytes'] / 1e6:.1f} MB of new bodies stored in {st['stored_bytes'] / 1e6:.1f} MB, "
+                          f"{st['deduped']} duplicate bodies[/]")
+        if self.replay:
+            missed = sum(self.replay.missed.values())
+            if missed:
+                console.print(f"[yellow][!] {missed} requests ({len(self.replay.missed)} URLs) were not in the "
+                              f"recording; detectors that changed their requests need a live run[/]")
+            await self.replay.close()
+
+    def report_circuits(self):
+        """Print hosts of this target whose circuit opened, with the work skipped on them."""
+        summary = self.breaker.summary(hosts={h.lower() for h in self.http.requests})
+        for host, info in summary.items():
+            outcomes = ', '.join(f"{k}={v}" for k, v in sorted(info['outcomes'].items()))
+            console.print(f"[yellow][!] {host}: circuit {info['state']} after {info['trips']} failed probes "
+                          f"({outcomes}); skipped {info['skipped_tasks']} tasks, "
+                          f"refused {info['refused_requests']} requests[/]")
+
+    async def discover_params(self, endpoints, live_urls):
+        """Probe endpoints for undocumented params and merge them into ``endpoints``."""
+        console.print("[bold cyan][*] Discovering hidden parameters...[/]")
+        cfg = self.config['discovery']
+        discovery = ParamDiscovery(self.http, cfg)
+        max_endpoints = cfg.get('max_endpoints', 50)
+        selected = dict(list(endpoints.items())[:max_endpoints])
+        roots = [u.rstrip('/') + '/' for u in live_urls if u.rstrip('/') + '/' not in endpoints]
+        roots = roots[:max(0, max_endpoints - len(selected))]
+        merged, new = await discovery.discover_all(selected, roots)
+        endpoints = {**endpoints, **merged}
+        self.db.save_endpoints({ep: merged[ep] for ep, _ in new})
+        stats = discovery.stats()
+        console.print(f"[bold green][+] Discovered {stats['found']} hidden params with {stats['requests']} requests "
+                      f"({stats['requests_per_param']:.1f} requests/param)[/]")
+        return endpoints
 
     async def collect_baselines(self, endpoints):
         """Send clean requests to establish baseline response characteristics."""
-        import aiohttp
         count = 0
         for endpoint, params in list(endpoints.items())[:20]:  # Limit for speed
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        endpoint, 
-                        headers=self.anti_block.get_headers(), 
-                        proxy=self.anti_block.get_proxy(),
-                        timeout=10
-                    ) as resp:
-                        text = await resp.text()
-                        self.anomaly.record_baseline(endpoint, 'GET', params, resp, text)
-                        count += 1
+                resp = await self.http.get(endpoint, timeout=10)
+                self.anomaly.record_baseline(endpoint, 'GET', params, resp, resp.text)
+                self.tech.record_baseline(endpoint, signatures.scan(resp.text), resp)
+                self.history.observe(endpoint, resp)
+                count += 1
             except Exception as e:
                 if self.config.get('debug'):
                     console.print(f"[red]Baseline error for {endpoint}: {e}[/]")
@@ -189,64 +415,168 @@ class OmniHunter:
         console.print(f"[green][+] Collected {count} baselines[/]")
 
     async def scanner_worker(self, worker_id):
-        """Worker process that runs scanners on queued items."""
-        while self.running:
-            try:
-                endpoint, param = await asyncio.wait_for(self.scan_queue.get(), timeout=1)
-            except asyncio.TimeoutError:
-                continue
-            
-            if self.config.get('verbose'):
-                console.print(f"[dim][Worker {worker_id}] Testing {endpoint} with param {param}[/]")
-            
-            # Define which scanners to run
-            scanners_to_run = []
-            
-            # Always run these
-            scanners_to_run.extend([('sqli', scanners.sqli), ('xss', scanners.xss)])
+        """Worker that runs scanners on queued items until the pool retires it."""
+        while self.running and not self.pool.retiring(worker_id):
+            # Blocks on the queue itself: a put (or a parked task coming back) wakes one worker
+            endpoint, param = await self.pool.get(worker_id)
             
-            # Add more based on config
-            if self.config.get('all_scanners', False) or self.config.get('deep_scan', False):
-                scanners_to_run.extend([
-                    ('ssrf', scanners.ssrf),
-                    ('idor', scanners.idor),
-                    ('business_logic', scanners.business_logic)
-                ])
-            
-            tasks = []
-            for scanner_name, scanner_func in scanners_to_run:
-                tasks.append(self.run_scanner(scanner_name, scanner_func, endpoint, param))
+            host = urlsplit(endpoint).netloc
+            if self.scope.in_scope(endpoint) and not self.http.exhausted and not self.breaker.admit(host):
+                # Host circuit is open: park the task without holding a worker
+                task = asyncio.create_task(self.park(host, (endpoint, param)))
+                self.parked.add(task)
+                task.add_done_callback(self.parked.discard)
+                continue
+            try:
+                await self.run_item(worker_id, endpoint, param)
+            finally:
+                self.scan_queue.task_done()
+
+    async def run_item(self, worker_id, endpoint, param):
+        """Scan one queued item whose host was admitted, and handle its findings."""
+        results = []
+        if self.scope.in_scope(endpoint) and not self.http.exhausted:
+            host = urlsplit(endpoint).netloc
+            # Scan slots are shared (and handed out fairly) across targets
+            try:
+                with track_requests() as tally:
+                    async with self.scheduler.slot(self.target):
+                        results = await self.profiler.timed(
+                            'scan_task', self.scan(worker_id, endpoint, param), label=f"{endpoint} {param}")
+                # Scanners swallow refused and failed requests; a task with any of
+                # them (or cut by the budget) is not history and stays due next run
+                if tally.complete and not self.http.exhausted:
+                    self.history.mark_scanned(endpoint, param, self.scan_profile)
+            finally:
+                self.breaker.finished(host)
+
+        for result in results:
+            if result:
+                await self.handle_finding(result)
+
+        self.ui.update_stats(scanned=self.ui.stats.get('scanned', 0) + 1)
+
+    async def park(self, host, item):
+        """Re-queue ``item`` once ``host`` recovers, or count it as skipped if it never does.
+
+        When the cooldown ends this task may be handed the host's half-open
+        probe; it then scans ``item`` itself, since a re-queued item would
+        not take the probe along to the worker that picks it up.
+        """
+        try:
+            if not (await self.breaker.wait(host) and self.running):
+                self.breaker.skip(host)
+                self.breaker.finished(host)
+            elif self.breaker.probing(host):
+                await self.run_item('probe', *item)
+            else:
+                await self.scan_queue.put(item)
+        except asyncio.CancelledError:
+            self.breaker.skip(host)
+            raise
+        finally:
+            self.scan_queue.task_done()
+
+    async def scan(self, worker_id, endpoint, param):
+        """Fingerprint the endpoint for the scan history, then run ``scan_task``."""
+        try:
+            await self.history.fingerprint(self.http, endpoint)
+        except Exception as e:
+            # Counted in the task's tally; the scanners still run
+            if self.config.get('debug'):
+                console.print(f"[red]Fingerprint error for {endpoint}: {e}[/]")
+        return await self.scan_task(worker_id, endpoint, param)
+
+    async def scan_task(self, worker_id, endpoint, param):
+        if isinstance(param, list):
+            return await self.scan_endpoint_packed(endpoint, param)
+        if self.config.get('verbose'):
+            console.print(f"[dim][Worker {worker_id}] Testing {endpoint} with param {param}[/]")
+        tasks = [self.run_scanner(name, func, endpoint, param)
+                 for name, func in self.scanners_for(param, endpoint=endpoint)]
+        return await asyncio.gather(*tasks)
+
+    def scanner_names(self, packed=False, endpoint=None):
+        """Names of the scanners to run for a single param (packed mode drops those already packed).
+
+        With an ``endpoint``, scanners the host's technology profile rules
+        out (e.g. SQLi against static hosting) are dropped.
+        """
+        names = []
+
+        # Always run these
+        if not packed:
+            names.append('sqli')
+        names.append('xss')
+
+        # Add more based on config
+        if self.config.get('all_scanners', False) or self.config.get('deep_scan', False):
+            names.extend(['ssrf', 'business_logic'])
+        if endpoint is not None:
+            names = [n for n in names if self.tech.applicable(n, endpoint)]
+        if self.replay:
+            names = [n for n in names if n in REPLAYABLE_SCANNERS]
+        return names
+
+    def scanners_for(self, param, packed=False, endpoint=None):
+        """``(name, scan function)`` for each scanner of ``scanner_names()``."""
+        return [(name, getattr(scanners, name)) for name in self.scanner_names(packed, endpoint)]
+
+    async def scan_endpoint_packed(self, endpoint, params):
+        """Run packed scanners once for the whole endpoint, then per-param scanners.
+
+        A tagged reflection probe decides which params are worth handing to
+        the XSS scanner at all.
+        """
+        if self.config.get('verbose'):
+            console.print(f"[dim][Packed] Testing {endpoint} with params {', '.join(params)}[/]")
+        results = []
+        if self.tech.applicable('sqli_packed', endpoint):
+            results = await self.run_scanner('sqli_packed', scanners.sqli_packed, endpoint, params) or []
+        try:
+            reflected = await PackedProber(self.http).reflected_params(endpoint, params)
+        except Exception:
+            reflected = set(params)
+        tasks = []
+        for param in params:
+            for name, func in self.scanners_for(param, packed=True, endpoint=endpoint):
+                if name == 'xss' and param not in reflected:
+                    continue
+                tasks.append(self.run_scanner(name, func, endpoint, param))
+        results.extend(await asyncio.gather(*tasks))
+        return results
+
+    async def handle_finding(self, result):
+        """Verify a scanner result and record it everywhere."""
+        # Replayed findings can't be re-tested without the network
+        verified = True if self.replay else await self.verifier.verify(result)
+        if verified:
+            result['verified'] = True
+            result['platform'] = self.platform
+            result['status'] = self.history.finding_status(result)
+            self.db.save_finding(result)
+            if not self.replay:
+                self.notifier.notify_finding(result)
+            self.ui.add_finding(result)
+            self.results.append(result)
             
-            results = await asyncio.gather(*tasks)
+            # Stream to every report format immediately
+            await self.report.add_finding(result)
             
-            for result in results:
-                if result:
-                    # Verify the finding
-                    verified = await self.verifier.verify(result)
-                    if verified:
-                        result['verified'] = True
-                        result['platform'] = self.platform
-                        db.save_finding(result)
-                        self.notifier.notify_finding(result)
-                        self.ui.add_finding(result)
-                        self.results.append(result)
-                        
-                        # Save to output file immediately
-                        with open(self.config['output_file'], 'a') as f:
-                            f.write(f"[{datetime.now()}] {result['type']} - {result['url']}\n")
-                        
-                        console.print(f"[bold red][!] Verified {result['type']} at {result['url']}[/]")
-                        
-                        if self.args.pause_on_find:
-                            input("[?] Press Enter to continue...")
+            console.print(f"[bold red][!] Verified {result['type']} at {result['url']}[/]")
             
-            self.scan_queue.task_done()
-            self.ui.update_stats(scanned=self.ui.stats.get('scanned', 0) + 1)
+            if self.args.pause_on_find:
+                input("[?] Press Enter to continue...")
 
     async def run_scanner(self, scanner_name, scanner_func, endpoint, param, **kwargs):
         """Run a single scanner and return result."""
         try:
-            result = await scanner_func(endpoint, param, self.anti_block, **kwargs)
+            kwargs.setdefault('http', self.http)
+            kwargs.setdefault('anomaly', self.anomaly)
+            kwargs.setdefault('hints', self.tech)
+            kwargs.setdefault('dbms', self.tech.dbms(endpoint))
+            result = await self.profiler.timed(
+                scanner_name, scanner_func(endpoint, param, self.anti_block, **kwargs))
             if result and self.config.get('debug'):
                 console.print(f"[dim][Debug] {scanner_name} found: {result}[/]")
             return result
@@ -256,20 +586,79 @@ class OmniHunter:
             return None
 
     def save_results(self):
-        """Save all results to various formats."""
-        # Text output
-        with open(self.config['output_file'], 'w') as f:
-            f.write(f"OmniHunter Scan Results for {self.target}\n")
-            f.write(f"Date: {datetime.now()}\n")
-            f.write(f"Platform: {self.platform}\n")
-            f.write("=" * 50 + "\n\n")
-            
-            for result in self.results:
-                f.write(f"Type: {result['type']}\n")
-                f.write(f"URL: {result['url']}\n")
-                f.write(f"Confidence: {result.get('confidence', 'N/A')}%\n")
-                f.write(f"Verified: {result.get('verified', False)}\n")
-                f.write("-" * 30 + "\n")
+        """Finalize reports synchronously (used when the event loop was interrupted)."""
+        self.running = False
+        self.report.close_sync()
+
+class BatchRunner:
+    """Scan many targets in one process.
+
+    Tool checks, the proxy pool, the HTTP connection pool and per-host rate
+    limiters are shared; each target still gets its own scope, DB, reports
+    and request/time budget. Scan slots are handed out round-robin across
+    targets by the shared FairScheduler.
+    """
+
+    def __init__(self, args, targets):
+        self.args = args
+        self.targets = targets
+        self.config = load_config(args)
+        batch_cfg = self.config.get('batch', {})
+        self.max_parallel = batch_cfg.get('max_parallel_targets', 4)
+        self.config['concurrency'] = args.threads or self.config.get('concurrency', 10)
+        self.config['total_concurrency'] = (batch_cfg.get('total_concurrency')
+                                            or max_scan_workers(self.config) * self.max_parallel)
+        self.config.setdefault('proxy', {})['use_free'] = False if args.no_proxy else self.config.get('proxy', {}).get('use_free', True)
+        self.config['profile'] = dict(self.config.get('profile', {}),
+                                      enabled=args.profile or self.config.get('profile', {}).get('enabled', False))
+        self.hunters = []
+
+    @staticmethod
+    def read_targets(path):
+        targets = []
+        with open(path) as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line and line not in targets:
+                    targets.append(line)
+        return targets
+
+    async def run(self):
+        shared = SharedContext(self.config)
+        shared.profiler.start()
+        shared.profiler.phase('tools')
+        await shared.check_tools(update_now=self.args.update_tools)
+        sem = asyncio.Semaphore(self.max_parallel)
+
+        async def scan_target(target):
+            async with sem:
+                hunter = None
+                try:
+                    hunter = OmniHunter(self.args, target=target, shared=shared)
+                    self.hunters.append(hunter)
+                    await hunter.run()
+                except Exception as e:
+                    # One broken target must not take the whole batch down
+                    console.print(f"[red][!] {target}: {e}[/]")
+                    if hunter is not None:
+                        hunter.save_results()
+
+        console.print(f"[bold green][+] Batch mode: {len(self.targets)} targets, "
+                      f"{self.max_parallel} in parallel[/]")
+        try:
+            await asyncio.gather(*(scan_target(t) for t in self.targets))
+        finally:
+            await shared.close()
+            shared.profiler.phase(None)
+            output_dir = Path(self.config.get('batch', {}).get('output_dir', 'batch_results'))
+            output_dir.mkdir(parents=True, exist_ok=True)
+            OmniHunter.write_profile(shared.profiler, output_dir)
+        console.print(f"[bold green][+] Batch completed: {shared.http.total_requests()} requests "
+                      f"over {len(self.targets)} targets[/]")
+
+    def save_results(self):
+        for hunter in self.hunters:
+            hunter.save_results()
 
 def main():
     parser = argparse.ArgumentParser(
@@ -281,19 +670,33 @@ Examples:
   python3 omnihunter.py --target example.com --platform hackerone --all-scanners
   python3 omnihunter.py --config config.yaml --target example.com --threads 20
   python3 omnihunter.py --target example.com --deep --output results.txt
+  python3 omnihunter.py --config config.yaml --targets-file programs.txt
+  python3 omnihunter.py --target example.com --record
+  python3 omnihunter.py --replay traffic.db
         """
     )
     
     # Main arguments
     parser.add_argument('--config', help='Path to configuration file')
     parser.add_argument('--target', help='Target domain to scan (e.g., example.com)')
+    parser.add_argument('--targets-file', help='File with one target per line; scans all of them in one process')
     parser.add_argument('--platform', default='unknown', help='Bug bounty platform (hackerone, bugcrowd, etc.)')
     
     # Scan options
     parser.add_argument('--all-scanners', action='store_true', help='Enable all vulnerability scanners')
     parser.add_argument('--deep', action='store_true', help='Deep scan mode (more thorough)')
-    parser.add_argument('--threads', type=int, help='Number of concurrent threads (default: 10)')
+    parser.add_argument('--threads', type=int,
+                        help='Initial number of scan workers (default: 10; autoscaled within autoscale bounds)')
     parser.add_argument('--no-proxy', action='store_true', help='Disable proxy rotation')
+    parser.add_argument('--update-tools', action='store_true', help='Install missing/broken tools before scanning')
+    parser.add_argument('--discover-params', action='store_true', help='Discover hidden parameters with batched wordlist probing')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only scan params that are new, changed or stale since the last run of this target')
+    parser.add_argument('--record', action='store_true',
+                        help='Record every HTTP exchange to <output dir>/traffic.db for --replay')
+    parser.add_argument('--replay', metavar='TRAFFIC_DB',
+                        help='Re-run the HTTP-based detectors over a recorded run, without network access')
+    parser.add_argument('--packed', action='store_true', help='Packed probing: test all params of an endpoint per request')
     
     # Feature toggles
     parser.add_argument('--ml-enabled', action='store_true', help='Enable ML heuristics')
@@ -303,6 +706,8 @@ Examples:
     parser.add_argument('--output', '-o', default='omnihunter_results.txt', help='Output file for results')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
     parser.add_argument('--debug', action='store_true', help='Debug mode')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the run: event loop stalls, per-phase stack samples, scanner timings')
     
     # Interactive options
     parser.add_argument('--pause-on-find', action='store_true', help='Pause when a finding is discovered')
@@ -310,18 +715,20 @@ Examples:
     args = parser.parse_args()
     
     # Validate arguments
-    if not args.target and not args.config:
+    if not args.target and not args.config and not args.targets_file and not args.replay:
         parser.print_help()
-        console.print("\n[red][-] Error: Either --target or --config must be provided[/]")
+        console.print("\n[red][-] Error: Either --target, --targets-file or --config must be provided[/]")
         sys.exit(1)
     
     # Run the scanner
-    hunter = OmniHunter(args)
+    if args.targets_file:
+        hunter = BatchRunner(args, BatchRunner.read_targets(args.targets_file))
+    else:
+        hunter = OmniHunter(args)
     try:
         asyncio.run(hunter.run())
     except KeyboardInterrupt:
         console.print("\n[yellow][!] Scan interrupted by user[/]")
-        hunter.running = False
         hunter.save_results()
         sys.exit(0)
     except Exception as e:
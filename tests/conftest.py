@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.body import StreamMatcher
+from modules.circuit import classify
+from modules.http_client import Response, TargetHttpClient
+
+
+class FakeHttp:
+    """HttpClient stand-in answering from ``handler(url) -> (status, text)``; no network.
+
+    The handler may raise (e.g. asyncio.TimeoutError) to fail a request. With
+    a ``breaker``, requests are checked and their outcomes recorded like
+    HttpClient does.
+    """
+
+    def __init__(self, handler, elapsed=0.01, breaker=None):
+        self.handler = handler
+        self.elapsed = elapsed
+        self.breaker = breaker
+        self.requests = Counter()
+        self.urls = []
+
+    async def get(self, url, timeout=None, headers=None, allow_redirects=True, match=None, stop_on_match=False):
+        host = url.split('/')[2]
+        if self.breaker is not None:
+            self.breaker.check(host)
+        self.urls.append(url)
+        self.requests[host] += 1
+        await asyncio.sleep(0)
+        try:
+            status, text = self.handler(url)
+        except Exception as e:
+            if self.breaker is not None:
+                self.breaker.record(host, classify(error=e))
+            raise
+        matches = ()
+        if match is not None:
+            matcher = StreamMatcher(match, stop_on_match=stop_on_match)
+            matcher.feed(text, final=True)
+            matches = matcher.matches
+        response = Response(url, status, {'Content-Type': 'text/html'}, text, self.elapsed, matches=matches)
+        if self.breaker is not None:
+            self.breaker.record(host, classify(response))
+        return response
+
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    def for_target(self, scope=None, max_requests=None, recorder=None, monitor=None):
+        return TargetHttpClient(self, scope=scope, max_requests=max_requests, recorder=recorder, monitor=monitor)
+
+    async def close(self):
+        pass
+
+
+def make_args(**overrides):
+    args = dict(config=None, target='example.com', targets_file=None, platform='unknown',
+                all_scanners=False, deep=False, threads=None, no_proxy=True, update_tools=False,
+                discover_params=False, incremental=False, record=False, replay=None, packed=False,
+                ml_enabled=False, anomaly_detection=False, output='results.txt', verbose=False,
+                debug=False, profile=False, pause_on_find=False)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+@pytest.fixture
+def make_hunter(tmp_path, monkeypatch):
+    """OmniHunter wired to a FakeHttp and a temp output dir, with recon replaced by ``endpoints``."""
+    import omnihunter
+    from modules import scanners
+    from modules.shared import SharedContext
+
+    async def no_xss(endpoint, param, anti_block, **kwargs):
+        return None
+
+    # dalfox is an external binary
+    monkeypatch.setattr(scanners, 'xss', no_xss)
+
+    def build(handler, endpoints, config=None, **args):
+        config = dict(config or {})
+        config.setdefault('proxy', {'use_free': False})
+        config.setdefault('batch', {'output_dir': str(tmp_path)})
+        config.setdefault('autoscale', {'enabled': False})
+        config.setdefault('report', {'formats': ['jsonl']})
+        monkeypatch.setattr(omnihunter, 'load_config', lambda _: dict(config))
+        shared = SharedContext(config)
+        shared.http = FakeHttp(handler, breaker=shared.breaker)
+        shared.anti_block.delay_range = (0, 0)
+
+        async def no_tools(update_now=False):
+            return {}
+
+        shared.check_tools = no_tools
+        hunter = omnihunter.OmniHunter(make_args(**args), shared=shared)
+
+        async def recon_phase():
+            return {endpoint: list(params) for endpoint, params in endpoints.items()}
+
+        hunter.recon_phase = recon_phase
+        return hunter
+
+    return build
@@ -0,0 +1,52 @@
+import asyncio
+
+from modules.autoscale import HOLD, UP, Autoscaler
+from modules.shared import FairScheduler, SharedContext
+
+
+class _Pool:
+    def __init__(self, size, queued):
+        self.size = size
+        self.queue = asyncio.Queue()
+        for i in range(queued):
+            self.queue.put_nowait(i)
+
+    def busy(self):
+        return self.size
+
+    def resize(self, n):
+        self.size = n
+
+
+def _metrics(rps):
+    return {'rps': rps, 'requests': 100, 'p95': 0.05, 'error_rate': 0.0, 'loop_lag': 0.0, 'rss_mb': None}
+
+
+def test_scheduler_has_a_slot_for_every_autoscaled_worker():
+    config = {'proxy': {'use_free': False}, 'concurrency': 4}
+    assert SharedContext(config).scheduler.capacity == 50
+    assert SharedContext(dict(config, autoscale={'max_workers': 80})).scheduler.capacity == 80
+    assert SharedContext(dict(config, autoscale={'enabled': False})).scheduler.capacity == 4
+    # An explicit (batch) total stays the cap, and the autoscaler's ceiling with it
+    scheduler = SharedContext(dict(config, total_concurrency=12)).scheduler
+    assert scheduler.capacity == 12
+    assert Autoscaler({'max_workers': 50}, initial=4, scheduler=scheduler).ceiling == 12
+
+
+def test_no_growth_while_tasks_wait_for_a_slot():
+    async def main():
+        scheduler = FairScheduler(4)
+        scaler = Autoscaler({'min_samples': 1}, initial=2, scheduler=scheduler)
+        scaler.pool = _Pool(2, queued=10)
+        assert scaler.step(_metrics(100))['action'] == UP
+
+        for target in 'abab':
+            await scheduler.acquire(target)
+        waiter = asyncio.create_task(scheduler.acquire('c'))
+        await asyncio.sleep(0)
+        decision = scaler.step(_metrics(200))
+        assert decision['action'] == HOLD and 'scan slot' in decision['reason']
+        scheduler.release()
+        await waiter
+
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+import re
+
+from modules.body import StreamMatcher
+
+PATTERN = re.compile(r'SQL syntax|ORA-\d+|error \d+')
+TEXT = 'x' * 37 + 'You have an error in your SQL syntax near ORA-01756 and error 1234.' + 'y' * 20
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _run(chunks, **kwargs):
+    matcher = StreamMatcher(PATTERN, **kwargs)
+    for i, chunk in enumerate(chunks):
+        matcher.feed(chunk, final=i == len(chunks) - 1)
+    return matcher.matches
+
+
+def test_every_split_point_gives_the_whole_text_matches():
+    expected = [(m.start(), m.end(), m.group(0)) for m in PATTERN.finditer(TEXT)]
+    assert [t for _, _, t in expected] == ['SQL syntax', 'ORA-01756', 'error 1234']
+    for cut in range(1, len(TEXT)):
+        assert _run([TEXT[:cut], TEXT[cut:]], overlap=16) == expected, cut
+
+
+def test_tiny_chunks_report_each_match_once():
+    expected = [(m.start(), m.end(), m.group(0)) for m in PATTERN.finditer(TEXT)]
+    for size in (1, 2, 3, 7):
+        assert _run(_chunks(TEXT, size), overlap=16) == expected, size
+
+
+def test_match_growing_over_the_boundary_is_reported_whole():
+    # 'error 12' matches at the end of the first chunk but continues in the second
+    assert _run(['an error 12', '34 here']) == [(3, 13, 'error 1234')]
+
+
+def test_stop_on_match_ignores_later_chunks():
+    matcher = StreamMatcher(PATTERN, stop_on_match=True)
+    matcher.feed('an ORA-0175')
+    matcher.feed('6 then SQL syntax')
+    assert matcher.done and matcher.matches == [(3, 12, 'ORA-01756')]
+    matcher.feed('error 1', final=True)
+    assert len(matcher.matches) == 1
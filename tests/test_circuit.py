@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from modules.circuit import CLOSED, DEAD, FAILURES, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, classify
+from modules.http_client import Response
+
+
+def _response(status, text=''):
+    return Response('https://example.com/', status, {}, text, 0.1)
+
+
+def test_classify():
+    assert classify(_response(200, 'Sorry, you have been blocked')) == 'ok'
+    assert classify(_response(403, '<h1>Sorry, you have been blocked</h1>')) == 'blocked'
+    assert classify(_response(503, '<title>Just a moment...</title>')) == 'captcha'
+    assert classify(_response(429)) == 'blocked'
+    assert classify(_response(403)) == 'ok'
+    assert classify(error=TimeoutError()) == 'timeout'
+    assert classify(error=ConnectionResetError()) == 'reset'
+    assert classify(error=ValueError()) == 'error'
+    assert {'blocked', 'captcha', 'timeout', 'reset'} <= FAILURES
+
+
+def test_open_cooldown_half_open_closed():
+    async def main():
+        breaker = CircuitBreaker({'failures': 3, 'cooldown': 0.05})
+        host = 'example.com'
+        for _ in range(3):
+            breaker.record(host, 'timeout')
+        circuit = breaker.circuit(host)
+        assert circuit.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.check(host)
+        assert not breaker.admit(host)
+
+        # A parked task waits out the cooldown and is handed the probe (awaited
+        # directly, like park() does: wait_for() would run it in another task)
+        assert await breaker.wait(host)
+        assert circuit.state == HALF_OPEN and breaker.probing(host)
+        # Nobody else gets in while the probe runs
+        assert not breaker.admit(host)
+        breaker.check(host)
+        breaker.record(host, 'ok')
+        assert circuit.state == CLOSED and circuit.cooldown == 0.05
+        breaker.finished(host)
+        assert breaker.admit(host)
+
+    asyncio.run(main())
+
+
+def test_failed_probe_reopens_with_backoff_then_dies():
+    async def main():
+        breaker = CircuitBreaker({'failures': 1, 'cooldown': 0.01, 'max_trips': 2})
+        host = 'example.com'
+        breaker.record(host, 'reset')
+        circuit = breaker.circuit(host)
+        assert await breaker.wait(host)
+        breaker.record(host, 'timeout')
+        assert (circuit.state, circuit.trips, circuit.cooldown) == (OPEN, 1, 0.02)
+        assert await breaker.wait(host)
+        breaker.record(host, 'timeout')
+        assert circuit.state == DEAD
+        assert not await breaker.wait(host)
+
+    asyncio.run(main())
+
+
+def test_undecided_probe_hands_over_to_next_waiter():
+    async def main():
+        breaker = CircuitBreaker({'failures': 1, 'cooldown': 0.01})
+        host = 'example.com'
+        breaker.record(host, 'timeout')
+        assert await breaker.wait(host)
+        first = asyncio.current_task()
+        second = asyncio.create_task(breaker.wait(host))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        # The probe ended without a request (e.g. every scanner was pruned)
+        breaker.finished(host)
+        assert await asyncio.wait_for(second, 1)
+        assert breaker.circuit(host).prober is second and breaker.circuit(host).prober is not first
+
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+import asyncio
+import html
+from urllib.parse import parse_qs, urlsplit
+
+from conftest import FakeHttp
+from modules.discovery import ParamDiscovery
+from modules.packed import PackedProber
+
+NAMES = [f"name{i}" for i in range(40)] + ['debug']
+
+
+def _discovery(tmp_path, handler, **config):
+    wordlist = tmp_path / 'params.txt'
+    wordlist.write_text('\n'.join(NAMES) + '\n')
+    return ParamDiscovery(FakeHttp(handler), dict(config, wordlist=str(wordlist)))
+
+
+def _page(url, extra=''):
+    return 200, '<html>\n<body>Welcome to the shop</body>\n' + extra + '</html>'
+
+
+def test_hidden_param_is_isolated_and_confirmed(tmp_path):
+    def handler(url):
+        if 'debug' in parse_qs(urlsplit(url).query):
+            return _page(url, '<pre>debug: sql=SELECT * FROM items, cache=miss, node=web-3</pre>\n')
+        return _page(url)
+
+    discovery = _discovery(tmp_path, handler)
+    assert asyncio.run(discovery.discover('https://example.com/shop')) == ['debug']
+
+
+def test_long_query_noise_is_not_reported(tmp_path):
+    def handler(url):
+        # The full batch trips a URL length limit that no smaller request does
+        if len(url) > 400:
+            return 414, 'URI Too Long'
+        return _page(url)
+
+    discovery = _discovery(tmp_path, handler)
+    assert asyncio.run(discovery.discover('https://example.com/shop')) == []
+
+
+def _echo_page(url, extra=''):
+    # Canonical link and pagination echo the full request URL, every tag included
+    echo = html.escape(url)
+    return _page(url, f'<link rel="canonical" href="{echo}">\n<a href="{echo}&amp;page=2">next</a>\n' + extra)
+
+
+def test_page_echoing_its_url_reports_no_reflections(tmp_path):
+    names = [f"name{i}" for i in range(400)]
+    wordlist = tmp_path / 'params.txt'
+    wordlist.write_text('\n'.join(names) + '\n')
+    http = FakeHttp(_echo_page)
+    discovery = ParamDiscovery(http, {'wordlist': str(wordlist)})
+    assert asyncio.run(discovery.discover('https://example.com/shop')) == []
+    # Decided by the diff alone: no per-name confirmation requests
+    assert http.total_requests() < 10
+
+
+def test_page_echoing_its_url_still_finds_behaviour_changes(tmp_path):
+    def handler(url):
+        if 'debug' in parse_qs(urlsplit(url).query):
+            return _echo_page(url, '<pre>debug: sql=SELECT * FROM items, cache=miss, node=web-3</pre>\n')
+        return _echo_page(url)
+
+    discovery = _discovery(tmp_path, handler)
+    assert asyncio.run(discovery.discover('https://example.com/shop')) == ['debug']
+
+
+def test_bisect_tests_both_halves():
+    tested = []
+
+    async def test(subset):
+        tested.append(list(subset))
+        return 'c' in subset
+
+    prober = PackedProber(FakeHttp(lambda url: (200, '')))
+    assert asyncio.run(prober.bisect(['a', 'b', 'c', 'd'], test)) == ['c']
+    assert ['c', 'd'] in tested and ['c'] in tested and ['d'] in tested
+
+
+def test_bisect_drops_signal_no_half_reproduces():
+    async def test(subset):
+        return False
+
+    prober = PackedProber(FakeHttp(lambda url: (200, '')))
+    assert asyncio.run(prober.bisect(['a', 'b', 'c', 'd'], test)) == []
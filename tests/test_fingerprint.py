@@ -0,0 +1,68 @@
+import time
+
+from modules.db import Database
+from modules.fingerprint import DAY, TechProfiles
+
+
+def test_earlier_runs_decay_and_expire(tmp_path):
+    db = Database(tmp_path / 'target.db')
+    now = time.time()
+    db.save_tech_profiles([
+        ('example.com', 'mysql', 'dbms', 50, 'old error', now - 90 * DAY),
+        ('example.com', 'postgresql', 'dbms', 10, 'new error', now - DAY),
+        ('example.com', 'php', 'language', 5, 'x-powered-by', now - 200 * DAY),
+    ])
+    tech = TechProfiles(db)
+    profile = tech.profile('https://example.com/')
+    # Three half-lives: 50 -> 6.25, outvoted by what the last run saw
+    assert round(profile['mysql'], 2) == 6.25
+    assert 'php' not in profile
+    assert tech.dbms('https://example.com/') == 'postgresql'
+
+
+def test_save_does_not_decay_twice(tmp_path):
+    db = Database(tmp_path / 'target.db')
+    now = time.time()
+    db.save_tech_profiles([('example.com', 'mysql', 'dbms', 8, 'error', now - 30 * DAY)])
+    TechProfiles(db).save()
+    TechProfiles(db).save()
+    # Not seen again: stored as it was, so each load decays it from last_seen once
+    (_, _, _, hits, _, last_seen), = db.load_tech_profiles()
+    assert hits == 8 and abs(last_seen - (now - 30 * DAY)) < 1
+    assert round(TechProfiles(db).profile('example.com')['mysql'], 3) == 4
+
+    tech = TechProfiles(db)
+    tech._add('example.com', 'mysql', 'dbms', 'error again')
+    tech.save()
+    # Seen this run: the decayed history plus the new observation, as of now
+    (_, _, _, hits, _, last_seen), = db.load_tech_profiles()
+    assert round(hits, 3) == 5 and last_seen == tech.now
+
+
+def test_legacy_rows_load_with_their_default_timestamp(tmp_path):
+    db = Database(tmp_path / 'target.db')
+    db.cursor.execute("INSERT INTO tech_profile (host, tech, kind, hits, evidence) "
+                      "VALUES ('example.com', 'mysql', 'dbms', 3, 'error')")
+    (_, _, _, hits, _, last_seen), = db.load_tech_profiles()
+    assert hits == 3 and abs(last_seen - time.time()) < 60
+
+
+def test_save_deletes_expired_rows(tmp_path):
+    db = Database(tmp_path / 'target.db')
+    now = time.time()
+    db.save_tech_profiles([
+        ('example.com', 'mysql', 'dbms', 5, 'error', now - DAY),
+        ('example.com', 'php', 'language', 5, 'x-powered-by', now - 200 * DAY),
+    ])
+    db.cursor.execute("INSERT INTO tech_profile (host, tech, kind, hits, evidence, last_seen) "
+                      "VALUES ('example.com', 'iis', 'server', 2, 'server', '2020-01-01 00:00:00')")
+    TechProfiles(db).save()
+    assert [row[1] for row in db.load_tech_profiles()] == ['mysql']
+
+
+def test_faded_engine_no_longer_picks_the_dbms(tmp_path):
+    db = Database(tmp_path / 'target.db')
+    # One observation four half-lives ago: weight 1/16, below min_weight
+    db.save_tech_profiles([('example.com', 'mssql', 'dbms', 1, 'error', time.time() - 120 * DAY)])
+    assert TechProfiles(db).dbms('https://example.com/') is None
+    assert TechProfiles(db, {'min_weight': 0}).dbms('https://example.com/') == 'mssql'
@@ -0,0 +1,60 @@
+import asyncio
+
+from aiohttp import web
+
+from modules.anti_block import AntiBlock
+from modules.circuit import CircuitBreaker
+from modules.header_profiles import PROFILES, _ACCEPT_ENCODING
+from modules.http_client import HttpClient
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_block_page_rotates_header_profile():
+    agents = []
+
+    async def handler(request):
+        agents.append(request.headers['User-Agent'])
+        if len(agents) == 1:
+            return web.Response(status=403, text='<h1>Sorry, you have been blocked</h1>', content_type='text/html')
+        return web.Response(text='ok', content_type='text/html')
+
+    async def main():
+        runner, base = await _serve(handler)
+        http = HttpClient(AntiBlock(delay_range=(0, 0)), breaker=CircuitBreaker())
+        try:
+            first = await http.get(base + '/')
+            second = await http.get(base + '/')
+        finally:
+            await http.close()
+            await runner.cleanup()
+        return first, second, http
+
+    first, second, http = asyncio.run(main())
+    assert (first.status, second.status) == (403, 200)
+    assert agents[0] != agents[1]
+    host = next(iter(http.requests))
+    assert http.breaker.circuit(host).outcomes == {'blocked': 1, 'ok': 1}
+
+
+def test_accept_encoding_only_offers_decodable_codings():
+    try:
+        import brotli  # noqa: F401
+        decodable = True
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            decodable = True
+        except ImportError:
+            decodable = False
+    assert ('br' in _ACCEPT_ENCODING) == decodable
+    assert all(p.headers['Accept-Encoding'] == _ACCEPT_ENCODING for p in PROFILES)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+
+from modules import scanners
+from modules.db import Database
+
+
+def _plain(url):
+    return 200, '<html><body>Product page</body></html>'
+
+
+def _findings(tmp_path):
+    path = next(tmp_path.rglob('results.jsonl'))
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_package_exports_scanners():
+    assert callable(scanners.sqli)
+    assert callable(scanners.sqli_packed)
+    assert not hasattr(scanners, 'idor')
+
+
+def test_run_scans_every_task(make_hunter, tmp_path):
+    hunter = make_hunter(_plain, {'https://example.com/item': ['id', 'q']})
+    asyncio.run(hunter.run())
+    assert hunter.scan_profile == 'sqli,xss'
+    assert {u.split('?')[0] for u in hunter.shared.http.urls} == {'https://example.com/item'}
+    assert len(hunter.history.scanned) == 2
+
+
+def test_run_marks_only_fully_tested_params(make_hunter):
+    def handler(url):
+        if 'q=' in url:
+            raise asyncio.TimeoutError()
+        return _plain(url)
+
+    endpoints = {f"https://example.com/p{i}": ['id', 'q'] for i in range(3)}
+    hunter = make_hunter(handler, endpoints, config={'circuit': {'enabled': False}})
+    asyncio.run(hunter.run())
+    # Payloads for q timed out (and were swallowed by the scanners): q stays due
+    assert set(hunter.history.scanned) == {(ep, 'id') for ep in endpoints}
+
+
+def test_run_fingerprints_every_scanned_endpoint(make_hunter):
+    endpoints = {f"https://example.com/p{i}": ['id', 'q'] for i in range(25)}
+    hunter = make_hunter(_plain, endpoints, config={'anomaly': {'enabled': False}})
+    asyncio.run(hunter.run())
+    # One clean request per endpoint, shared by its tasks; none needed baselines
+    clean = [u for u in hunter.shared.http.urls if '?' not in u]
+    assert sorted(clean) == sorted(endpoints)
+    state = Database(hunter.db_path).load_scan_state()
+    assert len(state) == 50 and all(fingerprint for _, _, fingerprint, _, _ in state)
+
+
+def test_run_reports_sqli_error(make_hunter, tmp_path):
+    def handler(url):
+        if "'" in url or '%27' in url:
+            return 500, 'You have an error in your SQL syntax; check the manual that corresponds to your MySQL server'
+        return _plain(url)
+
+    hunter = make_hunter(handler, {'https://example.com/item': ['id']})
+    asyncio.run(hunter.run())
+    findings = _findings(tmp_path)
+    assert [(f['type'], f['param']) for f in findings] == [('SQLi (error)', 'id')]
+
+
+def _sql_error_on(param):
+    from urllib.parse import parse_qs, urlsplit
+
+    def handler(url):
+        value = parse_qs(urlsplit(url).query).get(param, [''])[0]
+        if "'" in value:
+            return 500, 'You have an error in your SQL syntax; check the manual that corresponds to your MySQL server'
+        return _plain(url)
+    return handler
+
+
+def test_packed_run_finds_sqli_with_fewer_requests(make_hunter, tmp_path):
+    endpoints = {'https://example.com/item': ['id', 'q', 'sort', 'page']}
+    single = make_hunter(_sql_error_on('sort'), endpoints)
+    asyncio.run(single.run())
+    (tmp_path / 'single').mkdir()
+    for path in tmp_path.glob('example_com'):
+        path.rename(tmp_path / 'single' / path.name)
+
+    packed = make_hunter(_sql_error_on('sort'), endpoints, packed=True)
+    asyncio.run(packed.run())
+    findings = _findings(tmp_path / 'example_com')
+    assert [(f['type'], f['param']) for f in findings] == [('SQLi (error)', 'sort')]
+    assert 'packed probe' in findings[0]['details']
+    assert packed.shared.http.total_requests() < single.shared.http.total_requests()
+
+
+def test_run_survives_host_outage(make_hunter):
+    """Open -> cooldown -> half-open probe -> closed, through the real workers."""
+    outage = {'until': None}
+
+    def handler(url):
+        if outage['until'] is None:
+            outage['until'] = time.monotonic() + 0.3
+        if time.monotonic() < outage['until']:
+            raise asyncio.TimeoutError()
+        return _plain(url)
+
+    endpoints = {f"https://example.com/p{i}": ['id', 'q'] for i in range(6)}
+    hunter = make_hunter(handler, endpoints,
+                         config={'circuit': {'failures': 3, 'cooldown': 0.1}, 'anomaly': {'enabled': False}})
+    asyncio.run(asyncio.wait_for(hunter.run(), 20))
+    circuit = hunter.breaker.circuit('example.com')
+    assert circuit.state == 'closed'
+    assert circuit.outcomes['timeout'] >= 3 and circuit.outcomes['ok']
+    assert hunter.scan_queue.qsize() == 0 and not hunter.parked
+
+
+def test_packed_run_replays_from_recording(make_hunter, tmp_path):
+    endpoints = {'https://example.com/item': ['id', 'q', 'sort', 'page']}
+    recorder = make_hunter(_sql_error_on('sort'), endpoints, packed=True, record=True)
+    asyncio.run(recorder.run())
+    recorded = _findings(tmp_path)
+
+    def offline(url):
+        raise AssertionError(f"replay went to the network: {url}")
+
+    hunter = make_hunter(offline, {}, packed=True, replay=str(recorder.recorder.path))
+
+    async def no_tools(update_now=False):
+        raise AssertionError("replay checked tools")
+
+    hunter.shared.check_tools = no_tools
+    asyncio.run(hunter.run())
+    assert not hunter.replay.missed
+    assert not hunter.shared.proxy_manager.use_free
+    replayed = [json.loads(line) for line in next(tmp_path.rglob('replay_results.jsonl')).read_text().splitlines()]
+    assert [(f['type'], f['param']) for f in replayed] == [(f['type'], f['param']) for f in recorded]
+    assert ('SQLi (error)', 'sort') in [(f['type'], f['param']) for f in replayed]
@@ -0,0 +1,50 @@
+from modules.params import ParamExtractor, segment_type
+
+
+def test_scheme_and_host_case_share_a_template():
+    urls = [f"{base}/product/{i}?id={i}" for i, base in
+            enumerate(['https://example.com', 'HTTPS://Example.COM', 'https://EXAMPLE.com', 'Https://example.COM'])]
+    extractor = ParamExtractor(urls, config={'representatives': 10})
+    endpoints = extractor.extract()
+    assert list(extractor.roots) == ['https://example.com']
+    assert extractor.stats['templates'] == 1
+    assert all(ep.startswith('https://example.com/product/') for ep in endpoints)
+
+
+def test_segment_types():
+    assert segment_type('product') is None
+    assert segment_type('123') == '{int}'
+    assert segment_type('123.json') == '{int}.json'
+    assert segment_type('0f8fad5b-d9cb-469f-a165-70867728950e') == '{uuid}'
+    assert segment_type('2024-03-01') == '{date}'
+    assert segment_type('9e107d9d372bb6826bd81d3542a419d6') == '{hash}'
+    assert segment_type('blue-cotton-shirt-xl-42') == '{slug}'
+    assert segment_type('about-us') is None
+
+
+def test_id_paths_collapse_to_representatives():
+    urls = [f"https://example.com/product/{i}/view?id={i}" for i in range(1000)]
+    extractor = ParamExtractor(urls, config={'representatives': 3})
+    endpoints = extractor.extract()
+    assert extractor.stats['templates'] == 1
+    assert extractor.stats['raw_tasks'] == 1000 and extractor.stats['tasks'] == 3
+    # The smallest endpoints, whatever the URL order
+    assert sorted(endpoints) == sorted(ParamExtractor(list(reversed(urls))).extract())
+    assert sorted(endpoints) == ['https://example.com/product/0/view', 'https://example.com/product/1/view',
+                                 'https://example.com/product/10/view']
+
+
+def test_many_literals_become_a_variable_segment():
+    urls = [f"https://example.com/shop/{w}?id=1" for w in
+            (f"item{chr(97 + i % 26)}{chr(97 + i // 26)}" for i in range(60))]
+    # Plain names are literals at first; past max_literals the position is learned to be variable
+    extractor = ParamExtractor(urls, config={'max_literals': 10, 'representatives': 2})
+    extractor.extract()
+    assert extractor.stats['templates'] == 1 and extractor.stats['tasks'] == 2
+
+
+def test_few_busy_directories_stay_apart():
+    urls = [f"https://example.com/{d}/list?page={i}" for d in ('admin', 'api', 'blog') for i in range(200)]
+    extractor = ParamExtractor(urls, config={'max_literals': 2, 'representatives': 1})
+    endpoints = extractor.extract()
+    assert sorted(endpoints) == [f"https://example.com/{d}/list" for d in ('admin', 'api', 'blog')]
@@ -0,0 +1,43 @@
+from modules.payloads import PayloadCorpus, get_sqli_payloads, param_context
+
+
+def test_param_context():
+    assert param_context('user_id') == 'numeric'
+    assert param_context('product') is None
+    assert param_context('product', '123') == 'numeric'
+    assert param_context('q', 'shoes') == 'string'
+
+
+def test_unknown_context_keeps_numeric_probe_per_engine():
+    payloads = get_sqli_payloads('time_based', ctx=param_context('product'))
+    # The baseline time-based probes are all still sent
+    for probe in ("1 AND SLEEP(5)", "' OR SLEEP(5)-- -", "'; WAITFOR DELAY '00:00:05'--", "1'; SELECT pg_sleep(5)--"):
+        assert probe in payloads
+    assert len(payloads) == len(set(payloads))
+
+
+def test_known_context_keeps_one_probe_per_engine():
+    numeric = get_sqli_payloads('time_based', ctx='numeric')
+    assert numeric[0] == '1 AND SLEEP(5)'
+    assert not any(p.startswith("'") for p in numeric)
+    assert len(get_sqli_payloads('time_based', ctx='string')) == 5
+
+
+def test_known_dbms_gets_every_variant():
+    mysql = get_sqli_payloads('time_based', dbms='mysql', ctx='string')
+    assert len(mysql) == 3
+    assert all('SLEEP' in p for p in mysql)
+
+
+def test_plausible_dbms_set_narrows_engines():
+    payloads = get_sqli_payloads('time_based', dbms={'postgresql', 'mssql'}, ctx='numeric')
+    assert payloads == ["1; WAITFOR DELAY '00:00:05'--", '1 AND 1=(SELECT 1 FROM pg_sleep(5))']
+
+
+def test_extra_pack_dirs_and_txt_wordlists(tmp_path):
+    (tmp_path / 'sqli.tsv').write_text("technique=time_based,dbms=h2,ctx=numeric\t1 AND SLEEP_H2(5)\n")
+    (tmp_path / 'lfi.txt').write_text("# comment\n../../etc/passwd\n\n..%2f..%2fetc%2fpasswd\n")
+    corpus = PayloadCorpus([str(tmp_path)])
+    assert corpus.select('sqli', technique='time_based', dbms='h2') == ('1 AND SLEEP_H2(5)',)
+    assert corpus.select('lfi') == ('../../etc/passwd', '..%2f..%2fetc%2fpasswd')
+    assert corpus.select('lfi', encoding='url', limit=1) == ('..%2F..%2Fetc%2Fpasswd',)
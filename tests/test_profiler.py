@@ -0,0 +1,32 @@
+import asyncio
+
+from modules.profiler import Profiler
+
+
+def test_stop_restores_the_previous_task_factory():
+    created = []
+
+    def factory(loop, coro, **kwargs):
+        created.append(coro)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.set_task_factory(factory)
+        profiler = Profiler(enabled=True)
+        profiler.start()
+        profiler.phase('scan')
+        # Chained while profiling: the earlier factory still creates the task
+        task = asyncio.create_task(asyncio.sleep(0))
+        await task
+        assert task._omh_phase[0] == 'scan' and len(created) == 1
+        profiler.stop()
+        assert loop.get_task_factory() is factory
+
+        loop.set_task_factory(None)
+        profiler = Profiler(enabled=True)
+        profiler.start()
+        profiler.stop()
+        assert loop.get_task_factory() is None
+
+    asyncio.run(run())
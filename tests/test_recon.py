@@ -0,0 +1,119 @@
+import asyncio
+import os
+import stat
+import struct
+import sys
+
+from modules.anti_block import AntiBlock
+from modules.dns_resolver import DNSResolver, HostFilter
+from modules.recon import Recon, read_lines
+
+ZONE = {
+    'www.example.com': '10.0.0.1',
+    'api.example.com': '10.0.0.2',
+    'mail.example.com': '10.0.0.3',
+    'cdn1.example.com': '10.0.0.50',
+    'cdn2.example.com': '10.0.0.50',
+    'cdn3.example.com': '10.0.0.50',
+}
+WILDCARD = ('wild.example.com', '10.0.0.99')
+
+
+class StubDNS(asyncio.DatagramProtocol):
+    """Authoritative-ish answers for ZONE and *.WILDCARD; NXDOMAIN for the rest."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.queries += 1
+        qid = struct.unpack('>H', data[:2])[0]
+        offset, labels = 12, []
+        while data[offset]:
+            labels.append(data[offset + 1:offset + 1 + data[offset]].decode())
+            offset += 1 + data[offset]
+        question = data[12:offset + 5]
+        name = '.'.join(labels).lower()
+        ip = ZONE.get(name) or (WILDCARD[1] if name.endswith('.' + WILDCARD[0]) else None)
+        if ip is None:
+            reply = struct.pack('>HHHHHH', qid, 0x8183, 1, 0, 0, 0) + question
+        else:
+            answer = struct.pack('>HHHIH', 0xC00C, 1, 1, 60, 4) + bytes(int(b) for b in ip.split('.'))
+            reply = struct.pack('>HHHHHH', qid, 0x8180, 1, 1, 0, 0) + question + answer
+        self.transport.sendto(reply, addr)
+
+
+async def _stub_dns():
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(StubDNS, local_addr=('127.0.0.1', 0))
+    return transport, protocol, transport.get_extra_info('sockname')
+
+
+def _hosts():
+    return (list(ZONE) + ['gone.example.com']
+            + [f"host{i}.{WILDCARD[0]}" for i in range(200)])
+
+
+def test_host_filter_prunes_against_stub_dns():
+    async def main():
+        transport, server, addr = await _stub_dns()
+        try:
+            resolver = DNSResolver(nameservers=[addr], timeout=1)
+            host_filter = HostFilter(resolver, 'example.com', max_per_answer=2)
+            kept = [host async for host in host_filter.filter(_hosts())]
+        finally:
+            transport.close()
+        return kept, host_filter.stats, resolver
+
+    kept, stats, resolver = asyncio.run(main())
+    assert {'www.example.com', 'api.example.com', 'mail.example.com'} <= set(kept)
+    assert len([h for h in kept if h.startswith('cdn')]) == 2
+    assert stats == {'input': 207, 'unresolved': 1, 'wildcard': 200, 'collapsed': 1, 'kept': 5}
+    # Each name once, plus two random-label probes per parent zone
+    assert resolver.queries == 207 + 2 * 2
+
+
+def test_read_lines_skips_oversized_line():
+    async def main():
+        stream = asyncio.StreamReader(limit=64)
+        stream.feed_data(b'first\n' + b'x' * 500 + b'\nsecond\n' + b'y' * 100)
+        stream.feed_data(b'z' * 100 + b'\nthird')
+        stream.feed_eof()
+        return [line async for line in read_lines(stream)]
+
+    assert asyncio.run(main()) == [b'first\n', b'second\n', b'third']
+
+
+def test_live_urls_survive_oversized_httpx_line(tmp_path, monkeypatch):
+    # A stub httpx: one JSON record per input host, with a >1 MB record in between
+    httpx = tmp_path / 'httpx'
+    httpx.write_text(
+        f"#!{sys.executable}\n"
+        "import json, sys\n"
+        "for i, host in enumerate(sys.stdin):\n"
+        "    host = host.strip()\n"
+        "    if i == 1:\n"
+        "        print(json.dumps({'url': 'https://huge.example.com', 'body': 'a' * (2 << 20)}))\n"
+        "    print(json.dumps({'url': 'https://' + host, 'status_code': 200}), flush=True)\n"
+    )
+    httpx.chmod(httpx.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    async def main():
+        transport, _, addr = await _stub_dns()
+        try:
+            recon = Recon('example.com', {'dns': {'nameservers': [list(addr)], 'timeout': 1}},
+                          anti_block=AntiBlock())
+            records = []
+            live = await recon.get_live_urls(_hosts(), on_record=records.append)
+        finally:
+            transport.close()
+        return live, records
+
+    live, records = asyncio.run(main())
+    # Recon carries on past the oversized record: every other resolved host is live
+    assert sorted(live) == sorted(f"https://{host}" for host in ZONE)
+    assert [r['url'] for r in records] == live
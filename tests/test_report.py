@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import pytest
+
+from modules.report import ReportManager
+
+
+def test_finding_reaches_disk_before_close(tmp_path):
+    report = ReportManager(tmp_path / 'out.txt', {'formats': ['text', 'jsonl'], 'buffer_size': 500})
+
+    async def scan():
+        report.open()
+        await report.add_finding({'type': 'SQLi (error)', 'url': 'https://example.com/?id=1', 'param': 'id'})
+        # The process could die here: the finding must already be in the .part files
+        partial = (tmp_path / 'out.jsonl.part').read_text()
+        assert json.loads(partial)['param'] == 'id'
+        assert 'SQLi (error)' in (tmp_path / 'out.txt.part').read_text()
+        await report.close()
+
+    asyncio.run(scan())
+    assert not (tmp_path / 'out.jsonl.part').exists()
+    assert json.loads((tmp_path / 'out.jsonl').read_text())['url'] == 'https://example.com/?id=1'
+
+
+def test_write_lines_is_atomic(tmp_path):
+    report = ReportManager(tmp_path / 'out.txt')
+    count = asyncio.run(report.write_lines(tmp_path / 'urls.txt', (f"https://example.com/{i}" for i in range(1200))))
+    assert count == 1200
+    assert len((tmp_path / 'urls.txt').read_text().splitlines()) == 1200
+    assert not (tmp_path / 'urls.txt.part').exists()
+
+
+def test_output_name_with_a_format_suffix_gets_one_file_per_format(tmp_path):
+    for name in ('results.jsonl', 'x.csv', 'plain'):
+        out = tmp_path / name
+        report = ReportManager(out, {'formats': ['text', 'jsonl', 'csv']})
+        paths = report.paths()
+        assert len(set(paths.values())) == 3
+        assert paths['text'] == out.with_suffix('.txt') and paths['jsonl'] == out.with_suffix('.jsonl')
+
+        async def scan():
+            report.open()
+            await report.add_finding({'type': 'XSS', 'url': 'https://example.com/?q=1', 'param': 'q'})
+            await report.close()
+
+        asyncio.run(scan())
+        assert json.loads(paths['jsonl'].read_text())['param'] == 'q'
+        assert 'XSS' in paths['text'].read_text() and 'XSS' in paths['csv'].read_text()
+
+
+def test_side_file_may_not_overwrite_a_report(tmp_path):
+    report = ReportManager(tmp_path / 'endpoints.txt')
+    with pytest.raises(ValueError, match='text report'):
+        asyncio.run(report.write_lines(tmp_path / 'endpoints.txt', ['x']))
@@ -0,0 +1,54 @@
+from modules.scope import Scope
+
+
+def test_default_scope_is_target_and_subdomains():
+    scope = Scope.from_config(None, 'example.com')
+    assert scope.in_scope('https://example.com/')
+    assert scope.in_scope('https://a.b.example.com/x?y=1')
+    assert not scope.in_scope('https://example.com.evil.net/')
+    assert not scope.in_scope('https://notexample.com/')
+
+
+def test_host_is_normalised():
+    scope = Scope.from_config(None, 'example.com')
+    assert scope.in_scope('https://EXAMPLE.com.:443/')
+    assert scope.in_scope('api.Example.COM./v1')
+    assert scope.host_in_scope('WWW.example.com.')
+    assert scope.host_in_scope('https://www.example.com./')
+
+
+def test_path_prefix_matches_on_segment_boundaries():
+    scope = Scope(include=['api.other.com/v2', 'example.com/static/'])
+    assert scope.in_scope('https://api.other.com/v2')
+    assert scope.in_scope('https://api.other.com/v2/users?id=1')
+    assert not scope.in_scope('https://api.other.com/v2x')
+    assert not scope.in_scope('https://api.other.com/')
+    assert scope.in_scope('https://example.com/static/app.js')
+    assert scope.in_scope('https://example.com/static')
+    assert not scope.in_scope('https://example.com/staticfiles/a')
+
+
+def test_wildcard_excludes_apex():
+    scope = Scope(include=['*.example.com'])
+    assert scope.in_scope('https://www.example.com/')
+    assert not scope.in_scope('https://example.com/')
+
+
+def test_exclusions():
+    scope = Scope(include=['example.com', '*.example.com'],
+                  exclude=['admin.example.com', 'example.com/logout', 're:\\.pdf$'])
+    assert not scope.in_scope('https://admin.example.com/')
+    assert not scope.host_in_scope('admin.example.com')
+    assert not scope.in_scope('https://example.com/logout')
+    assert not scope.in_scope('https://example.com/logout/now')
+    assert scope.in_scope('https://example.com/logouts')
+    assert not scope.in_scope('https://www.example.com/file.pdf')
+    assert scope.rejected == 5
+
+
+def test_cidr_and_regex_rules():
+    scope = Scope(include=['10.0.0.0/8', 're:^https://legacy\\.'])
+    assert scope.in_scope('http://10.1.2.3:8080/')
+    assert not scope.in_scope('http://11.1.2.3/')
+    assert scope.in_scope('https://legacy.corp.net/x')
+    assert Scope.from_config('.*\\.example\\.com.*').in_scope('https://a.example.com/')
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+
+from modules.shared import SharedContext
+from modules.update import UpdateManager
+
+
+def _tool(tmp_path, name, body='exit 0'):
+    """An executable that logs each run to ``<name>.runs`` before running ``body``."""
+    path = tmp_path / name
+    path.write_text(f"#!/bin/sh\necho run >> {tmp_path / (name + '.runs')}\n{body}\n")
+    path.chmod(0o755)
+    return path
+
+
+def _runs(tmp_path, name):
+    try:
+        return len((tmp_path / (name + '.runs')).read_text().splitlines())
+    except OSError:
+        return 0
+
+
+def _manager(tmp_path, names, **kwargs):
+    manager = UpdateManager(str(tmp_path), cache_path=tmp_path / 'cache' / 'tools.json', **kwargs)
+    manager.tools = {name: {'cmd': f'{name} -version', 'install': 'false'} for name in names}
+    return manager
+
+
+def test_cache_hit_skips_the_probe(tmp_path):
+    _tool(tmp_path, 'omh-tool-a')
+    assert asyncio.run(_manager(tmp_path, ['omh-tool-a']).check_all()) == {'omh-tool-a': True}
+    # A new process (new manager) with the same path, mtime and a fresh entry runs nothing
+    assert asyncio.run(_manager(tmp_path, ['omh-tool-a']).check_all()) == {'omh-tool-a': True}
+    assert _runs(tmp_path, 'omh-tool-a') == 1
+
+
+def test_changed_mtime_or_expired_entry_probes_again(tmp_path):
+    path = _tool(tmp_path, 'omh-tool-b')
+    asyncio.run(_manager(tmp_path, ['omh-tool-b']).check_all())
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    asyncio.run(_manager(tmp_path, ['omh-tool-b']).check_all())
+    assert _runs(tmp_path, 'omh-tool-b') == 2
+    asyncio.run(_manager(tmp_path, ['omh-tool-b'], cache_ttl=0).check_all())
+    assert _runs(tmp_path, 'omh-tool-b') == 3
+
+
+def test_probes_run_concurrently_within_the_timeout(tmp_path):
+    names = [f'omh-slow-{i}' for i in range(4)]
+    for name in names:
+        _tool(tmp_path, name, 'sleep 0.6')
+    _tool(tmp_path, 'omh-hang', 'sleep 30')
+    manager = _manager(tmp_path, names + ['omh-hang'], probe_timeout=1)
+    start = time.monotonic()
+    status = asyncio.run(manager.check_all())
+    # One timeout plus a little: sequential probes would take 4 x 0.6 + 1 seconds
+    assert time.monotonic() - start < 2.0
+    assert status == {**{name: True for name in names}, 'omh-hang': False}
+    assert manager.missing() == ['omh-hang']
+
+
+def test_missing_tools_are_installed_before_check_tools_returns(tmp_path):
+    manager = _manager(tmp_path, ['omh-new'])
+    target = tmp_path / 'omh-new'
+    manager.tools['omh-new']['install'] = f"printf '#!/bin/sh\\nexit 0\\n' > {target} && chmod +x {target}"
+    shared = SharedContext({'proxy': {'use_free': False}})
+    shared.update_mgr = manager
+
+    async def main():
+        status = await shared.check_tools()
+        # Nothing left running in the background once the check returns
+        others = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return status, others
+
+    status, others = asyncio.run(main())
+    assert status == {'omh-new': True} and not others
+
+
+def test_cancelled_install_kills_its_subprocess(tmp_path):
+    manager = _manager(tmp_path, ['omh-slow-install'])
+    pid_file = tmp_path / 'install.pid'
+    manager.tools['omh-slow-install']['install'] = f"echo $$ > {pid_file}; exec sleep 30"
+
+    async def main():
+        task = asyncio.create_task(manager.update_missing(['omh-slow-install']))
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    pid = int(pid_file.read_text())
+    try:
+        os.kill(pid, 0)
+        alive = True
+    except ProcessLookupError:
+        alive = False
+    assert not alive